@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: bench_auth.py
+@time: 2026/10/20 3:30 下午
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.mock_nexus import MockNexus, USERNAME, PASSWORD  # noqa: E402
+from utils.auth import NexusAuth, BASIC, SESSION  # noqa: E402
+
+LOGGER = logging.getLogger("bench")
+
+
+def measure(nexus: MockNexus, mode: str, threads: int, count: int):
+    """
+    以指定认证方式并发发起HEAD请求
+    :param nexus: MockNexus类 模拟Nexus
+    :param mode: str 认证方式
+    :param threads: int 并发数
+    :param count: int 请求数
+    :return: tuple (每秒请求数, 密码校验次数, 登录次数)
+    """
+    auth = NexusAuth(nexus.url, USERNAME, PASSWORD, mode=mode, logger=LOGGER)
+    path, = [p for p in nexus.repositories["src"].files if p.endswith(".jar")]
+    url = f"{nexus.url}/repository/src/{path}"
+    checks, logins = nexus.password_checks, nexus.logins
+
+    def head(_):
+        requests.head(url, auth=auth).raise_for_status()
+
+    start = time.perf_counter()
+    with ThreadPool(threads) as pool:
+        pool.map(head, range(count))
+    elapsed = time.perf_counter() - start
+    return count / elapsed, nexus.password_checks - checks, nexus.logins - logins
+
+
+def run(auth_cost: float = 0.02, cores: int = 2, threads: int = 16, count: int = 200):
+    """
+    比较basic及session认证在服务端密码哈希开销下的吞吐量
+    :param auth_cost: float 每次校验密码的耗时(秒)
+    :param cores: int 服务端可同时校验密码的请求数
+    :param threads: int 并发数
+    :param count: int 每种认证方式的请求数
+    :return: dict {认证方式: (每秒请求数, 密码校验次数, 登录次数)}
+    """
+    nexus = MockNexus(auth_cost=auth_cost, auth_cores=cores).start()
+    try:
+        nexus.populate("src", count=1)
+        return {mode: measure(nexus, mode, threads, count) for mode in (BASIC, SESSION)}
+    finally:
+        nexus.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark basic against session authentication.")
+    parser.add_argument("--cost", type=float, default=0.02, help="The seconds of one password check.")
+    parser.add_argument("--cores", type=int, default=2, help="The password checks running at once.")
+    parser.add_argument("-t", "--threads", type=int, default=16, help="The concurrent requests.")
+    parser.add_argument("-n", "--count", type=int, default=200, help="The requests per mode.")
+    args = parser.parse_args()
+    results = run(args.cost, args.cores, args.threads, args.count)
+    print(f"{'':8} {'req/s':>8} {'checks':>7} {'logins':>7}")
+    for mode, (rate, checks, logins) in results.items():
+        print(f"{mode:8} {rate:8.1f} {checks:7} {logins:7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: bench_pickle.py
+@time: 2026/10/20 10:30 上午
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.auth import NexusAuth  # noqa: E402
+from utils.classes import Nexus  # noqa: E402
+
+API_URL = "http://nexus:8081/service/rest/"
+LOGGER = logging.getLogger("bench")
+
+
+def listing(count: int):
+    """
+    生成与组件列表接口相同结构的数据, 每个组件包含jar, pom及其sha1
+    :param count: int 组件数
+    :return: list
+    """
+    items = []
+    for i in range(count):
+        group, name, version = f"org.example.g{i % 7}", f"artifact-{i}", f"1.{i}.0"
+        assets = []
+        for extension in ("jar", "jar.sha1", "pom", "pom.sha1"):
+            path = f"{group.replace('.', '/')}/{name}/{version}/{name}-{version}.{extension}"
+            assets.append({
+                "downloadUrl": f"http://nexus:8081/repository/maven-releases/{path}",
+                "path": path,
+                "id": f"bWF2ZW4tcmVsZWFzZXM6{i:08d}{extension}",
+                "repository": "maven-releases",
+                "format": "maven2",
+                "checksum": {"sha1": "a" * 40, "md5": "b" * 32, "sha256": "c" * 64, "sha512": "d" * 128},
+                "contentType": "application/java-archive",
+                "lastModified": "2021-04-08T07:39:00.000+00:00",
+                "lastDownloaded": None,
+                "uploader": "deployment",
+                "uploaderIp": "10.0.0.1",
+                "fileSize": 1024 * (i + 1),
+                "blobCreated": "2021-04-08T07:39:00.000+00:00",
+            })
+        items.append({"id": f"bWF2ZW4tcmVsZWFzZXM6{i:08d}", "repository": "maven-releases",
+                      "format": "maven2", "group": group, "name": name, "version": version,
+                      "assets": assets})
+    return items
+
+
+class LegacyComponent(object):
+    """改动前的组件: 以__dict__整体序列化, 包含认证信息, 日志记录器及完整的列表数据"""
+
+    def __init__(self, id: str, api_url: str, auth=None, logger=None, **kwargs):
+        self.id = id
+        self.api_url = api_url
+        self.auth = auth
+        self.info_api_url = api_url + f"v1/components/{id}"
+        self.logger = logger
+        self.kwargs = kwargs
+        self.headers = kwargs.get("headers", Nexus.HEADERS)
+        self._info = None
+        self._directory = None
+
+    @property
+    def assets(self):
+        return [Nexus.Asset(**d, api_url=self.api_url, auth=self.auth, logger=self.logger)
+                for d in self.kwargs["assets"]]
+
+
+def measure(tasks: list, rounds: int):
+    """
+    测量父进程序列化及子进程反序列化并访问资源的耗时
+    :param tasks: list 每个任务的参数元组
+    :param rounds: int 重复次数
+    :return: tuple (平均字节数, 序列化微秒, 反序列化微秒)
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        blobs = [pickle.dumps(task, pickle.HIGHEST_PROTOCOL) for task in tasks]
+    dumped = time.perf_counter()
+    for _ in range(rounds):
+        for blob in blobs:
+            for asset in pickle.loads(blob)[0].assets:
+                asset.download_url
+    loaded = time.perf_counter()
+    per_task = 1e6 / rounds / len(tasks)
+    return (sum(len(b) for b in blobs) / len(blobs),
+            (dumped - start) * per_task, (loaded - dumped) * per_task)
+
+
+def run(count: int = 500, rounds: int = 20):
+    """
+    比较改动前后每个任务的序列化开销
+    改动前每个任务携带组件及迁移参数(目标存储库, 排除列表, 临时目录, 日志记录器), 改动后只携带组件
+    :param count: int 组件数
+    :param rounds: int 重复次数
+    :return: dict {名称: (平均字节数, 序列化微秒, 反序列化微秒)}
+    """
+    auth = NexusAuth("http://nexus:8081", "deployment", "secret", logger=LOGGER)
+    Nexus._credentials[API_URL] = auth
+    items = listing(count)
+    target = Nexus.Repository(
+        "maven-hosted", "maven2", "hosted", "http://target:8081/service/rest/",
+        auth=auth, logger=LOGGER, url="http://target:8081/repository/maven-hosted")
+    args = (target, ["md5", "sha1", "sha256", "sha512"], "/tmp/nexus-migrate", LOGGER)
+    legacy = [(LegacyComponent(**item, api_url=API_URL, auth=auth, logger=LOGGER), *args)
+              for item in items]
+    current = [(Nexus.Component(**item, api_url=API_URL, auth=auth, logger=LOGGER),)
+               for item in items]
+    return {"legacy": measure(legacy, rounds), "current": measure(current, rounds)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-task pickling cost.")
+    parser.add_argument("-n", "--count", type=int, default=500, help="The number of components.")
+    parser.add_argument("-r", "--rounds", type=int, default=20, help="The number of rounds.")
+    args = parser.parse_args()
+    results = run(args.count, args.rounds)
+    print(f"{'':8} {'bytes/task':>10} {'dump us':>8} {'load us':>8} {'total us':>9}")
+    for name, (size, dump, load) in results.items():
+        print(f"{name:8} {size:10.0f} {dump:8.1f} {load:8.1f} {dump + load:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: conftest.py
+@time: 2026/10/20 9:00 上午
+"""
+
+import logging
+import os
+import sys
+
+import pytest
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def log_directory(tmp_path_factory):
+    """未指定日志记录器的实例使用Log单例, 日志写入临时目录而不是当前目录"""
+    from utils.classes import Log
+    Log(name="tests", directory=str(tmp_path_factory.mktemp("log")))
+
+
+@pytest.fixture
+def logger():
+    """不启动日志监听进程的日志记录器"""
+    return logging.getLogger("tests")
+
+
+@pytest.fixture
+def mock_nexus():
+    """启动模拟Nexus, 可多次调用创建多个实例"""
+    from tests.mock_nexus import MockNexus
+    started = []
+
+    def start(**kwargs):
+        nexus = MockNexus(**kwargs).start()
+        started.append(nexus)
+        return nexus
+    yield start
+    for nexus in started:
+        nexus.stop()
+
+
+@pytest.fixture
+def maven_config(tmp_path):
+    """写入maven.yaml, 返回路径"""
+    def write(**overrides):
+        conf = {
+            "settings": "settings.xml",
+            "snapshot_id": "snapshots",
+            "excludes": ["md5", "sha1", "sha256", "sha512"],
+            "tmp_dir": str(tmp_path / "assets"),
+            "pom_url_mapping": {"http://old.nexus/repository/src/": "http://new.nexus/repository/dst/"},
+            "workers": {"max_rss": 0, "max_fds": 0},
+        }
+        conf.update(overrides)
+        path = tmp_path / "maven.yaml"
+        path.write_text(yaml.safe_dump(conf), encoding="utf-8")
+        return str(path)
+    return write
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: mock_nexus.py
+@time: 2026/10/20 11:00 上午
+"""
+
+import base64
+import hashlib
+import json
+import re
+import secrets
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+PAGE_SIZE = 10
+USERNAME = "admin"
+PASSWORD = "admin123"
+
+POM = """<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <modelVersion>4.0.0</modelVersion>
+  <groupId>{group}</groupId>
+  <artifactId>{name}</artifactId>
+  <version>{version}</version>
+  <url>http://old.nexus/repository/src/</url>
+</project>
+"""
+
+
+def content(path: str, size: int):
+    """
+    生成确定的资源内容
+    :param path: str 资源路径
+    :param size: int 字节数
+    :return: bytes
+    """
+    seed = hashlib.sha256(path.encode("utf-8")).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+class MockRepository(object):
+    """模拟存储库"""
+
+    def __init__(
+            self,
+            name: str,
+            type: str = "hosted",
+            policy: str = "RELEASE"):
+        self.name = name
+        self.type = type
+        self.policy = policy
+        # 组件ID -> 组件, 路径 -> 内容
+        self.components = {}
+        self.files = {}
+
+    def add(self, group: str, name: str, version: str, assets: dict):
+        """
+        添加组件
+        :param group: str 组ID
+        :param name: str 名称
+        :param version: str 版本
+        :param assets: dict 拓展名 -> 内容
+        :return: str 组件ID
+        """
+        id = base64.urlsafe_b64encode(f"{self.name}:{group}:{name}:{version}".encode()).decode()
+        self.components[id] = {"group": group, "name": name, "version": version, "paths": []}
+        for extension, data in assets.items():
+            path = f"{group.replace('.', '/')}/{name}/{version}/{name}-{version}.{extension}"
+            self.files[path] = data
+            self.components[id]["paths"].append(path)
+        return id
+
+
+class MockNexus(object):
+    """模拟Nexus, 实现迁移用到的REST接口"""
+
+    def __init__(
+            self,
+            require_auth: bool = True,
+            auth_cost: float = 0.0,
+            auth_cores: int = 2,
+            download_cores: int = 64):
+        """
+        初始化
+        :param require_auth: bool 是否要求认证
+        :param auth_cost: float 每次校验密码的耗时(秒), 模拟密码哈希的CPU开销
+        :param auth_cores: int 可同时校验密码的请求数, 模拟服务端的CPU核数
+        :param download_cores: int 可同时处理的下载请求数, 与download_delay一起模拟服务端饱和
+        """
+        self.require_auth = require_auth
+        self.auth_cost = auth_cost
+        self._cores = threading.BoundedSemaphore(max(1, auth_cores))
+        self._download_cores = threading.BoundedSemaphore(max(1, download_cores))
+        self.repositories = {}
+        self.sessions = set()
+        self.requests = []
+        self.uploads = []
+        self.password_checks = 0
+        self.logins = 0
+        # 行为开关
+        self.ignore_range = False
+        self.fail_uploads = {}
+        # 资源路径 -> 下载时返回的内容或状态码, 列表中的校验和不变
+        self.downloads = {}
+        # 每次下载占用一个download_cores的耗时(秒)
+        self.download_delay = 0.0
+        # 存储库名称 -> 每次上传的耗时(秒)
+        self.upload_delay = {}
+        # (存储库名称, 完成时间)
+        self.upload_times = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def repository(self, name: str, **kwargs):
+        """
+        创建或返回存储库
+        :param name: str 存储库名称
+        :param kwargs: 参考MockRepository
+        :return: MockRepository类
+        """
+        if name not in self.repositories:
+            self.repositories[name] = MockRepository(name, **kwargs)
+        return self.repositories[name]
+
+    def populate(self, name: str = "src", count: int = 5, jar_size: int = 1024, policy: str = "RELEASE"):
+        """
+        生成包含jar, pom及sha1的组件
+        :param name: str 存储库名称
+        :param count: int 组件数
+        :param jar_size: int jar的字节数
+        :param policy: str 版本策略
+        :return: MockRepository类
+        """
+        repository = self.repository(name, policy=policy)
+        for i in range(count):
+            group, artifact, version = f"org.example.g{i % 2}", f"artifact-{i}", f"1.{i}"
+            jar = content(f"{group}:{artifact}:{version}", jar_size)
+            pom = POM.format(group=group, name=artifact, version=version).encode("utf-8")
+            repository.add(group, artifact, version, {
+                "jar": jar, "pom": pom, "jar.sha1": hashlib.sha1(jar).hexdigest().encode()})
+        return repository
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def config(self, **kwargs):
+        """
+        返回config.ini中Nexus配置段对应的参数
+        :return: dict
+        """
+        return dict(address="127.0.0.1", port=self.port, protocol="http",
+                    username=USERNAME, password=PASSWORD, **kwargs)
+
+    def asset(self, repository: MockRepository, path: str):
+        data = repository.files[path]
+        return {
+            "id": base64.urlsafe_b64encode(f"{repository.name}:{path}".encode()).decode(),
+            "path": path,
+            "downloadUrl": f"{self.url}/repository/{repository.name}/{path}",
+            "repository": repository.name,
+            "format": "maven2",
+            "checksum": {"sha1": hashlib.sha1(data).hexdigest(), "md5": hashlib.md5(data).hexdigest()},
+            "fileSize": len(data),
+            "lastModified": "2021-04-08T07:39:00.000+00:00",
+        }
+
+    def component(self, repository: MockRepository, id: str):
+        component = repository.components[id]
+        return {
+            "id": id, "repository": repository.name, "format": "maven2",
+            "group": component["group"], "name": component["name"], "version": component["version"],
+            "assets": [self.asset(repository, path) for path in component["paths"]],
+        }
+
+    def info(self, repository: MockRepository):
+        data = {
+            "name": repository.name, "format": "maven2", "type": repository.type, "online": True,
+            "url": f"{self.url}/repository/{repository.name}",
+            "storage": {"blobStoreName": "default", "strictContentTypeValidation": True},
+            "maven": {"versionPolicy": repository.policy, "layoutPolicy": "STRICT"},
+        }
+        return data
+
+    def upload(self, repository: MockRepository, content_type: str, body: bytes):
+        """
+        解析上传组件的表单, 写入存储库
+        :return: int 状态码
+        """
+        message = BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body)
+        fields, files = {}, {}
+        for part in message.get_payload():
+            name = part.get_param("name", header="content-disposition")
+            filename = part.get_filename()
+            data = part.get_payload(decode=True)
+            if filename:
+                files[name] = (filename, data)
+            else:
+                fields[name] = data.decode("utf-8")
+        time.sleep(self.upload_delay.get(repository.name, 0))
+        with self._lock:
+            self.uploads.append((repository.name, fields, files))
+            failures = self.fail_uploads.get(repository.name, 0)
+            if failures:
+                self.fail_uploads[repository.name] = failures - 1
+                return 500
+        group, name, version = (fields.get(f"maven2.{key}") for key in ("groupId", "artifactId", "version"))
+        assets = {}
+        for key, (filename, data) in files.items():
+            extension = fields.get(f"{key}.extension") or filename.rsplit(".", 1)[-1]
+            assets[extension] = data
+        repository.add(group, name, version, assets)
+        with self._lock:
+            self.upload_times.append((repository.name, time.perf_counter()))
+        return 204
+
+
+def _handler(nexus: MockNexus):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def reply(self, status: int, body=b"", content_type: str = "application/json", headers: dict = None):
+            if isinstance(body, (dict, list)):
+                body = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def authenticated(self):
+            cookie = self.headers.get("Cookie", "")
+            session = re.search(r"NXSESSIONID=(\w+)", cookie)
+            if session and session.group(1) in nexus.sessions:
+                if self.command not in ("GET", "HEAD"):
+                    token = re.search(r"NX-ANTI-CSRF-TOKEN=(\w+)", cookie)
+                    if not token or self.headers.get("NX-ANTI-CSRF-TOKEN") != token.group(1):
+                        self.reply(403, {"message": "CSRF"})
+                        return False
+                return True
+            header = self.headers.get("Authorization", "")
+            if header.startswith("Basic "):
+                with nexus._lock:
+                    nexus.password_checks += 1
+                if nexus.auth_cost:
+                    with nexus._cores:
+                        time.sleep(nexus.auth_cost)
+                if base64.b64decode(header[6:]).decode("utf-8") == f"{USERNAME}:{PASSWORD}":
+                    return True
+            if not nexus.require_auth:
+                return True
+            self.reply(401, b"")
+            return False
+
+        def body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+            nexus.requests.append((self.command, parts.path, self.headers.get("Range"),
+                                   self.headers.get("User-Agent")))
+            if not self.authenticated():
+                return
+            path = parts.path
+            if path == "/service/rest/v1/repositories":
+                return self.reply(200, [{"name": r.name, "format": "maven2", "type": r.type,
+                                         "url": f"{nexus.url}/repository/{r.name}"}
+                                        for r in nexus.repositories.values()])
+            match = re.fullmatch(r"/service/rest/v1/repositories/maven/(\w+)/([\w.-]+)", path)
+            if match:
+                repository = nexus.repositories.get(match.group(2))
+                if repository is None:
+                    return self.reply(404, b"Repository not found", "text/plain")
+                return self.reply(200, nexus.info(repository))
+            if path in ("/service/rest/v1/components", "/service/rest/v1/search"):
+                repository = nexus.repositories[query["repository"]]
+                ids = list(repository.components)
+                for key in ("group", "name", "version"):
+                    if key in query:
+                        pattern = re.escape(query[key]).replace(r"\*", ".*")
+                        ids = [i for i in ids if re.fullmatch(pattern, repository.components[i][key])]
+                start = int(query.get("continuationToken", 0))
+                page = ids[start:start + PAGE_SIZE]
+                token = str(start + PAGE_SIZE) if start + PAGE_SIZE < len(ids) else None
+                return self.reply(200, {"items": [nexus.component(repository, i) for i in page],
+                                        "continuationToken": token})
+            match = re.fullmatch(r"/service/rest/v1/components/([\w=-]+)", path)
+            if match:
+                for repository in nexus.repositories.values():
+                    if match.group(1) in repository.components:
+                        return self.reply(200, nexus.component(repository, match.group(1)))
+                return self.reply(404, b"Component not found", "text/plain")
+            match = re.fullmatch(r"/repository/([\w.-]+)/(.+)", path)
+            if match and match.group(1) in nexus.repositories:
+                data = nexus.repositories[match.group(1)].files.get(match.group(2))
+                data = nexus.downloads.get(match.group(2), data)
+                if data is None or isinstance(data, int):
+                    return self.reply(data or 404, b"Not Found", "text/plain")
+                if nexus.download_delay:
+                    with nexus._download_cores:
+                        time.sleep(nexus.download_delay)
+                headers = {"Accept-Ranges": "bytes"}
+                value = self.headers.get("Range")
+                if value and not nexus.ignore_range:
+                    start, end = value.split("=", 1)[1].split("-")
+                    start, end = int(start), int(end) if end else len(data) - 1
+                    end = min(end, len(data) - 1)
+                    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+                    return self.reply(206, data[start:end + 1], "application/octet-stream", headers)
+                return self.reply(200, data, "application/octet-stream", headers)
+            self.reply(404, b"Not Found", "text/plain")
+
+        def do_POST(self):
+            parts = urlsplit(self.path)
+            query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+            nexus.requests.append((self.command, parts.path, None, self.headers.get("User-Agent")))
+            body = self.body()
+            if parts.path == "/service/rapture/session":
+                fields = {key: base64.b64decode(values[0]).decode("utf-8")
+                          for key, values in parse_qs(body.decode("utf-8")).items()}
+                if (fields.get("username"), fields.get("password")) != (USERNAME, PASSWORD):
+                    return self.reply(403, b"")
+                session = secrets.token_hex(16)
+                with nexus._lock:
+                    nexus.sessions.add(session)
+                    nexus.logins += 1
+                return self.reply(204, headers={"Set-Cookie": f"NXSESSIONID={session}; Path=/; HttpOnly"})
+            if not self.authenticated():
+                return
+            if parts.path == "/service/rest/v1/components":
+                repository = nexus.repositories.get(query.get("repository"))
+                if repository is None or repository.type != "hosted":
+                    return self.reply(400, b"Repository is not hosted", "text/plain")
+                return self.reply(nexus.upload(repository, self.headers["Content-Type"], body))
+            self.reply(404, b"Not Found", "text/plain")
+
+    return Handler
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_audit.py
+@time: 2026/10/21 10:00 上午
+"""
+
+from utils.classes import Nexus
+from utils.functions import audit_maven2_repository
+from utils.shard import Shard
+
+
+def test_target_selected_like_source(mock_nexus, maven_config, logger):
+    source, target = mock_nexus(), mock_nexus()
+    source.populate("src", count=8)
+    # 目标中有相同的组件, 也有被过滤及属于其他分片的组件
+    target.populate("dst", count=8)
+    src_repo = Nexus(**source.config(), logger=logger).repository("src")
+    dst_repo = Nexus(**target.config(), logger=logger).repository("dst")
+    config = maven_config(filters={"include": {"group": ["org.example.g0"]}})
+
+    for index in range(2):
+        auditor = audit_maven2_repository(
+            src_repo, dst_repo, config, shard=Shard(index, 2), logger=logger)
+        assert auditor.clean
+        assert auditor.counts["source"] == auditor.counts["target"] == auditor.counts["matched"]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_auth.py
+@time: 2026/10/20 3:30 下午
+"""
+
+import logging
+
+from benchmarks import bench_auth
+from utils.auth import NexusAuth
+from utils.classes import Nexus, Log
+from utils.functions import migrate_maven2_repository
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_worker_logins_reach_parent_report(mock_nexus, maven_config, logger):
+    source, target = mock_nexus(), mock_nexus()
+    source.populate("src", count=6)
+    target.repository("dst")
+    src_repo = Nexus(**source.config(auth_mode="session"), logger=logger).repository("src")
+    dst_repo = Nexus(**target.config(auth_mode="session"), logger=logger).repository("dst")
+    before = NexusAuth.stats["logins"], source.logins + target.logins
+
+    # 先创建Log单例的记录器, 之后创建进程池时不再替换其处理器
+    Log().logger
+    records, level = Records(), logger.level
+    logger.addHandler(records)
+    logger.setLevel(logging.INFO)
+    try:
+        migrate_maven2_repository(src_repo, dst_repo, maven_config(), processes=2, logger=logger)
+    finally:
+        logger.removeHandler(records)
+        logger.setLevel(level)
+
+    assert len(target.repositories["dst"].components) == 6
+    # 工作进程中的登录计入主进程的统计
+    workers = source.logins + target.logins - before[1]
+    assert workers >= 2 and NexusAuth.stats["logins"] - before[0] == workers
+    assert any(m.startswith(f"认证: 登录 {NexusAuth.stats['logins']},") for m in records.messages)
+    # 登录后不再逐个请求校验密码
+    assert target.password_checks == 0
+
+
+def test_session_benchmark_skips_password_checks():
+    results = bench_auth.run(auth_cost=0.001, count=20)
+    assert results["basic"][1] == 20
+    assert results["session"][1:] == (0, 1)
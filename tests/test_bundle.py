@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_bundle.py
+@time: 2026/10/21 2:00 下午
+"""
+
+import io
+import os
+
+import pytest
+import requests
+
+from utils.bundle import Bundle, BundleWriter
+from utils.classes import Nexus
+from utils.exceptions import BundleChecksumError
+from utils.functions import export_maven2_repository
+
+
+@pytest.fixture
+def source(mock_nexus, logger):
+    """返回模拟Nexus及其中的源存储库"""
+    nexus = mock_nexus()
+    nexus.populate("src", count=4)
+    return nexus, Nexus(**nexus.config(), logger=logger).repository("src")
+
+
+def jars(repository):
+    return sorted((asset for getter in repository.iter_component_getter
+                   for component in getter.components for asset in component.assets
+                   if asset.name.endswith(".jar")), key=lambda asset: asset.path)
+
+
+def test_copy_to_raises_on_error_status(source):
+    nexus, repository = source
+    asset = jars(repository)[0]
+    nexus.downloads[asset.path] = 500
+    with pytest.raises(requests.exceptions.HTTPError):
+        asset.copy_to(io.BytesIO())
+
+
+def test_writer_rejects_checksum_mismatch(source, tmp_path):
+    nexus, repository = source
+    bad, good = jars(repository)[:2]
+    nexus.downloads[bad.path] = b"tampered"
+    writer = BundleWriter(str(tmp_path), "000", 1024 * 1024)
+    with pytest.raises(BundleChecksumError):
+        writer.write(bad)
+    # 失败的资源不占用分块文件
+    path, sha1, size, chunk, offset = writer.write(good)
+    writer.close()
+    assert offset == 0 and sha1 == good.sha1
+    assert os.path.getsize(tmp_path / chunk) == size
+
+
+def test_export_continues_after_failed_components(source, maven_config, tmp_path, logger):
+    nexus, repository = source
+    bad = jars(repository)[:2]
+    nexus.downloads[bad[0].path] = b"tampered"
+    nexus.downloads[bad[1].path] = 404
+
+    bundle, failed = export_maven2_repository(
+        repository, maven_config(), str(tmp_path / "bundle"), processes=2, logger=logger)
+
+    assert failed == 2
+    entries = list(Bundle(str(tmp_path / "bundle"), logger=logger).entries())
+    assert len(entries) == 2
+    exported = {asset[0] for entry in entries for asset in entry["assets"]}
+    assert not exported & {asset.path for asset in bad}
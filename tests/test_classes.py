@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_classes.py
+@time: 2026/10/20 9:00 上午
+"""
+
+import pickle
+
+from benchmarks import bench_pickle
+from utils.auth import NexusAuth
+from utils.classes import Nexus, ComponentRecord, AssetRecord
+
+
+def test_repository_prefers_kwargs(logger):
+    repo = Nexus.Repository(
+        "src", "maven2", "hosted", "http://nexus/service/rest/",
+        logger=logger, url="http://nexus/repository/src")
+    repo._info = {"url": "http://other/repository/src"}
+    assert repo.url == "http://nexus/repository/src"
+
+
+def test_repository_missing_key_is_none(logger):
+    repo = Nexus.Repository("src", "maven2", "hosted", "http://nexus/service/rest/", logger=logger)
+    repo._info = {"name": "src", "online": True}
+    assert repo.url is None
+    assert repo.online is True
+
+
+def listing_item():
+    return {"id": "c1", "repository": "src", "format": "maven2", "group": "org.g", "name": "a",
+            "version": "1.0", "assets": [{
+                "id": "a1", "path": "org/g/a/1.0/a-1.0.jar", "repository": "src", "format": "maven2",
+                "downloadUrl": "http://nexus:8081/repository/src/org/g/a/1.0/a-1.0.jar",
+                "checksum": {"sha1": "f" * 40}, "fileSize": 10, "uploader": "admin",
+                "lastModified": "2021-01-01T10:00:00.000+00:00"}]}
+
+
+def test_component_pickles_as_slim_record(logger):
+    auth = NexusAuth("http://nexus:8081", "admin", "secret", logger=logger)
+    Nexus._credentials["http://nexus:8081/service/rest/"] = auth
+    component = Nexus.Component(
+        **listing_item(), api_url="http://nexus:8081/service/rest/", auth=auth, logger=logger)
+    blob = pickle.dumps(component)
+    assert b"secret" not in blob and b"uploader" not in blob
+    restored = pickle.loads(blob)
+    assert restored.auth is auth
+    assert (restored.group, restored.name, restored.version) == ("org.g", "a", "1.0")
+    assert restored.record == component.record
+    asset, = restored.assets
+    assert (asset.download_url, asset.sha1, asset.size) == (
+        "http://nexus:8081/repository/src/org/g/a/1.0/a-1.0.jar", "f" * 40, 10)
+    # 已创建资源实例后再次序列化
+    assert pickle.loads(pickle.dumps(restored)).record == component.record
+    assert pickle.loads(pickle.dumps(asset)).record == asset.record
+
+
+def test_record_round_trip(logger):
+    component = Nexus.Component(
+        **listing_item(), api_url="http://nexus:8081/service/rest/", logger=logger)
+    record = component.record
+    assert isinstance(record, ComponentRecord) and isinstance(record.assets[0], AssetRecord)
+    rebuilt = Nexus.Component.from_record(component.api_url, record, logger=logger)
+    assert rebuilt.record == record
+
+
+def test_pickle_benchmark_payload_is_smaller():
+    results = bench_pickle.run(count=20, rounds=1)
+    assert results["current"][0] < results["legacy"][0]
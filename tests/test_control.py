@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_control.py
+@time: 2026/10/21 7:00 下午
+"""
+
+import logging
+import os
+import signal
+import threading
+import time
+
+from utils.classes import Nexus
+from utils.control import Controller, Checkpoint
+from utils.functions import migrate_maven2_repository
+
+SIGNALS = [signal.SIGUSR1, signal.SIGUSR2, signal.SIGTERM]
+
+
+class Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def acquire_async(controller):
+    """在线程中调用acquire, 返回线程及结果列表"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(controller.acquire()), daemon=True)
+    thread.start()
+    return thread, result
+
+
+def test_pause_blocks_until_resume(logger):
+    controller = Controller(2, logger=logger)
+    controller.pause()
+    thread, result = acquire_async(controller)
+    time.sleep(0.2)
+    assert thread.is_alive() and controller.in_flight == 0
+
+    controller.command("resume")
+    thread.join(2)
+    assert result == [True] and controller.in_flight == 1
+
+
+def test_resize_limits_in_flight(logger):
+    controller = Controller(1, maximum=3, logger=logger)
+    assert controller.acquire()
+    thread, result = acquire_async(controller)
+    time.sleep(0.2)
+    # 已达并发数时阻塞
+    assert thread.is_alive()
+
+    assert controller.command("resize +1")["limit"] == 2
+    thread.join(2)
+    assert result == [True] and controller.in_flight == 2
+    # 超出上限时按上限生效
+    assert controller.command("resize 10")["limit"] == 3
+    assert controller.command("resize -5")["limit"] == 1
+
+
+def test_drain_stops_dispatch(logger):
+    controller = Controller(1, logger=logger)
+    assert controller.acquire()
+    thread, result = acquire_async(controller)
+    time.sleep(0.2)
+
+    controller.command("drain")
+    thread.join(2)
+    assert result == [False] and controller.in_flight == 1
+    assert not controller.acquire()
+
+
+def test_signals_apply_in_dispatch_loop(logger):
+    controller = Controller(1, maximum=3, logger=logger)
+    previous = {signum: signal.getsignal(signum) for signum in SIGNALS}
+    records = Records()
+    logger.addHandler(records)
+    level = logger.level
+    logger.setLevel(logging.INFO)
+    try:
+        controller.install_signals()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        os.kill(os.getpid(), signal.SIGUSR2)
+        # 信号处理函数不调整并发, 也不输出日志
+        assert controller.limit == 1 and not records.messages
+
+        assert controller.acquire()
+        assert controller.limit == 2 and len(records.messages) == 3
+
+        os.kill(os.getpid(), signal.SIGTERM)
+        assert not controller.draining
+        assert not controller.acquire()
+        assert controller.draining and records.messages[-1].startswith("开始排空")
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+        logger.removeHandler(records)
+        logger.setLevel(level)
+
+
+def test_checkpoint_resume(mock_nexus, maven_config, tmp_path, logger):
+    source, target = mock_nexus(), mock_nexus()
+    source.populate("src", count=5)
+    target.repository("dst")
+    src_repo = Nexus(**source.config(), logger=logger).repository("src")
+    dst_repo = Nexus(**target.config(), logger=logger).repository("dst")
+    config = maven_config()
+    path = str(tmp_path / "checkpoint")
+
+    # 排空后不再派发, 检查点为空
+    controller = Controller(2, logger=logger)
+    controller.drain()
+    checkpoint = Checkpoint(path, logger=logger)
+    assert migrate_maven2_repository(
+        src_repo, dst_repo, config, controller=controller, checkpoint=checkpoint,
+        logger=logger) == (False, 0)
+    checkpoint.close()
+    assert not target.uploads
+
+    # 模拟上次运行已完成两个组件
+    keys = [f"org.example.g{i % 2}:artifact-{i}:1.{i}" for i in range(2)]
+    checkpoint = Checkpoint(path, logger=logger)
+    for key in keys:
+        checkpoint.done(key)
+    checkpoint.close()
+
+    checkpoint = Checkpoint(path, logger=logger)
+    assert set(keys) == checkpoint.completed
+    assert migrate_maven2_repository(
+        src_repo, dst_repo, config, controller=Controller(2, logger=logger),
+        checkpoint=checkpoint, logger=logger) == (True, 0)
+    checkpoint.close()
+
+    # 检查点中的组件被跳过
+    assert len(target.uploads) == 3
+    assert len(Checkpoint(path, logger=logger).completed) == 5
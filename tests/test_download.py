@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_download.py
+@time: 2026/10/20 2:00 下午
+"""
+
+import os
+
+import pytest
+
+from utils.classes import Nexus
+
+JAR_SIZE = 64 * 1024
+
+
+@pytest.fixture
+def jar(mock_nexus, logger, monkeypatch):
+    """返回模拟Nexus及其中一个超过分段阈值的jar资源"""
+    monkeypatch.setattr(Nexus.Asset, "RANGE_THRESHOLD", 4 * 1024)
+    source = mock_nexus()
+    source.populate("src", count=1, jar_size=JAR_SIZE)
+    repo = Nexus(**source.config(), logger=logger).repository("src")
+    component, = [c for getter in repo.iter_component_getter for c in getter.components]
+    asset, = [a for a in component.assets if a.name.endswith(".jar")]
+    return source, asset
+
+
+def ranges(nexus):
+    return [r[2] for r in nexus.requests if r[1].endswith(".jar")]
+
+
+def test_download_in_ranges(jar, tmp_path):
+    source, asset = jar
+    path = asset.download(str(tmp_path), parts=4)
+    assert os.path.getsize(path) == JAR_SIZE
+    assert open(path, "rb").read() == source.repositories["src"].files[asset.path]
+    assert sorted(ranges(source)) == sorted(
+        f"bytes={start}-{start + JAR_SIZE // 4 - 1}" for start in range(0, JAR_SIZE, JAR_SIZE // 4))
+    assert not os.path.exists(f"{path}.part.json")
+
+
+def test_download_falls_back_without_range_support(jar, tmp_path):
+    source, asset = jar
+    source.ignore_range = True
+    path = asset.download(str(tmp_path), parts=4)
+    assert open(path, "rb").read() == source.repositories["src"].files[asset.path]
+    # 第一个非206响应后停止分段, 只重新发起一次单连接下载, 不消耗重试次数
+    assert ranges(source)[-1] == "bytes=0-"
+    assert len(ranges(source)) <= 5
+    assert not os.path.exists(f"{path}.part") and not os.path.exists(f"{path}.part.json")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_fanout.py
+@time: 2026/10/20 3:00 下午
+"""
+
+import multiprocessing
+
+import pytest
+
+from utils.classes import Nexus
+from utils.control import Checkpoint
+from utils.fanout import Tracker
+from utils.functions import migrate_maven2_repository
+
+
+@pytest.fixture
+def nexuses(mock_nexus, logger):
+    """返回源, 主目标及副本目标的模拟Nexus, 以及对应的存储库实例"""
+    source, primary, replica = mock_nexus(), mock_nexus(), mock_nexus()
+    source.populate("src", count=5)
+    primary.repository("dst")
+    replica.repository("dr")
+    repositories = (
+        Nexus(**source.config(), logger=logger).repository("src"),
+        Nexus(**primary.config(), logger=logger).repository("dst"),
+        Nexus(**replica.config(), logger=logger).repository("dr"),
+    )
+    return (source, primary, replica), repositories
+
+
+def migrate(repositories, config, checkpoint, logger, processes=2):
+    src_repo, dst_repo, dr_repo = repositories
+    return migrate_maven2_repository(
+        src_repo, dst_repo, config, processes=processes, checkpoint=checkpoint,
+        replicas=[("dr", dr_repo)], logger=logger)
+
+
+def uploads(nexus, name):
+    return [upload for upload in nexus.uploads if upload[0] == name]
+
+
+def test_replica_failure_fails_component(nexuses, maven_config, tmp_path, logger):
+    (_, primary, replica), repositories = nexuses
+    config = maven_config(fanout={"retries": 0})
+    replica.fail_uploads["dr"] = 1
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint"), logger=logger)
+
+    # 副本目标失败的组件计入失败数
+    assert migrate(repositories, config, checkpoint, logger) == (True, 1)
+    checkpoint.close()
+
+    assert len(primary.repositories["dst"].components) == 5
+    assert len(replica.repositories["dr"].components) == 4
+    # 副本目标失败的组件不记入检查点
+    assert len(checkpoint.completed) == 4
+
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint"), logger=logger)
+    assert migrate(repositories, config, checkpoint, logger) == (True, 0)
+    checkpoint.close()
+
+    assert len(replica.repositories["dr"].components) == 5
+    assert len(checkpoint.completed) == 5
+    assert len(uploads(replica, "dr")) == 6
+
+
+def test_primary_failure_skips_replicas(nexuses, maven_config, tmp_path, logger):
+    (_, primary, replica), repositories = nexuses
+    primary.fail_uploads["dst"] = 1
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint"), logger=logger)
+
+    migrate(repositories, maven_config(fanout={"retries": 0}), checkpoint, logger)
+    checkpoint.close()
+
+    assert len(primary.repositories["dst"].components) == 4
+    assert len(replica.repositories["dr"].components) == 4
+    # 主目标失败的组件不会分发至副本目标
+    assert len(uploads(replica, "dr")) == 4
+    assert len(checkpoint.completed) == 4
+
+
+def test_slow_replica_does_not_stall_primary(nexuses, maven_config, tmp_path, logger):
+    (_, primary, replica), repositories = nexuses
+    replica.upload_delay["dr"] = 0.3
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint"), logger=logger)
+
+    migrate(repositories, maven_config(fanout={"buffer": 10, "retries": 0}), checkpoint, logger,
+            processes=1)
+    checkpoint.close()
+
+    # 单个工作进程中主目标不等待副本目标, 副本目标完成第二个组件前主目标已全部完成
+    primary_times = [t for name, t in primary.upload_times if name == "dst"]
+    replica_times = [t for name, t in replica.upload_times if name == "dr"]
+    assert len(primary_times) == len(replica_times) == 5
+    assert primary_times[-1] < replica_times[1]
+    # 副本目标完成后才记入检查点
+    assert len(checkpoint.completed) == 5
+
+
+def test_tracker_completes_after_all_targets():
+    class Target(object):
+        def __init__(self, name):
+            self.name = name
+
+    done, failed = [], []
+    results = multiprocessing.Queue()
+    tracker = Tracker([Target("primary"), Target("dr"), Target("dr2")], results,
+                      done.append, lambda key, error: failed.append((key, error))).start()
+    # 副本目标的结果可能早于主目标的成功回调到达
+    results.put(("a", "dr", None))
+    tracker.record("a", "primary")
+    results.put(("a", "dr2", None))
+    tracker.record("b", "primary")
+    results.put(("b", "dr", "UploadComponentError: 500"))
+    results.put(("b", "dr2", None))
+    tracker.record("c", "primary")
+    results.put(("c", "dr", None))
+    tracker.finish()
+
+    assert done == ["a"]
+    assert failed == [("b", "[dr] UploadComponentError: 500"), ("c", "目标['dr2']未完成")]
+    assert tracker.failures == 2
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_filters.py
+@time: 2026/10/21 9:00 上午
+"""
+
+from utils.classes import Nexus
+from utils.functions import _select_components
+from utils.shard import Shard
+
+
+def test_snapshot_policy_applies_before_shard(mock_nexus, logger):
+    source = mock_nexus()
+    repository = source.repository("snapshots", policy="SNAPSHOT")
+    for base in ["1.0", "2.0"]:
+        for build in range(1, 7):
+            version = f"{base}-20210401.1010{build:02d}-{build}"
+            repository.add("org.example", "artifact", version, {"jar": version.encode()})
+    repo = Nexus(**source.config(), logger=logger).repository("snapshots")
+    yml = {"snapshot_policy": {"keep": "latest", "latest": 1}}
+    selected = [
+        component.version
+        for index in range(3)
+        for component in _select_components(repo, yml, Shard(index, 3), logger)]
+    # 各基础版本在所有分片中共保留一个最新构建
+    assert sorted(selected) == ["1.0-20210401.101006-6", "2.0-20210401.101006-6"]
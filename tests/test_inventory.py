@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_inventory.py
+@time: 2026/10/21 8:00 下午
+"""
+
+import gzip
+
+import pytest
+
+from utils.classes import Nexus
+from utils.functions import migrate_maven2_repository
+from utils.inventory import Inventory, InventoryRepository, MAGIC
+
+
+@pytest.fixture
+def source(mock_nexus, logger):
+    """返回包含5个组件的模拟Nexus及源存储库实例"""
+    nexus = mock_nexus()
+    nexus.populate("src", count=5)
+    return nexus, Nexus(**nexus.config(), logger=logger).repository("src")
+
+
+def listed(repository):
+    return sorted((component.record for getter in repository.iter_component_getter
+                   for component in getter.components), key=lambda record: record.id)
+
+
+def listings(nexus):
+    return [r for r in nexus.requests if r[1] == "/service/rest/v1/components"]
+
+
+def test_save_round_trip(source, tmp_path, logger):
+    nexus, repository = source
+    inventory = Inventory(str(tmp_path / "src.inv"), logger=logger)
+    footer = inventory.save(repository)
+
+    files = nexus.repositories["src"].files
+    assert footer == {"components": 5, "assets": 15,
+                      "bytes": sum(len(data) for data in files.values())}
+    with gzip.open(inventory.path, "rb") as f:
+        assert f.read(len(MAGIC)) == MAGIC
+    # 重新打开后读取的记录与列出的记录相同, 包括省略的下载地址
+    inventory = Inventory(inventory.path, logger=logger)
+    assert inventory.header["repository"] == "src"
+    assert sorted(inventory.records(), key=lambda record: record.id) == listed(repository)
+    assert inventory.footer == footer
+
+
+def test_refresh_reports_changes(source, tmp_path, logger):
+    nexus, repository = source
+    inventory = Inventory(str(tmp_path / "src.inv"), logger=logger)
+    # 快照不存在时直接保存
+    assert "added" not in inventory.refresh(repository)
+
+    mock = nexus.repositories["src"]
+    removed = next(id for id, c in mock.components.items() if c["name"] == "artifact-0")
+    del mock.components[removed]
+    changed = next(c for c in mock.components.values() if c["name"] == "artifact-1")
+    jar = next(path for path in changed["paths"] if path.endswith(".jar"))
+    mock.files[jar] = b"rebuilt"
+    mock.add("org.example.g0", "artifact-new", "1.0", {"jar": b"new"})
+
+    footer = inventory.refresh(repository)
+    assert (footer["added"], footer["changed"], footer["removed"]) == (1, 1, 1)
+    assert footer["components"] == 5
+    assert sorted(inventory.records(), key=lambda record: record.id) == listed(repository)
+
+
+def test_query_and_aggregate(source, tmp_path, logger):
+    _, repository = source
+    inventory = Inventory(str(tmp_path / "src.inv"), logger=logger)
+    inventory.save(repository)
+
+    assert sorted(r.name for r in inventory.query(group="*.g0")) == \
+        ["artifact-0", "artifact-2", "artifact-4"]
+    assert [r.version for r in inventory.query(name="artifact-3", version="1.*")] == ["1.3"]
+    # 资源条件仅保留匹配的资源
+    jars = list(inventory.query(extension="jar", min_size=1024))
+    assert len(jars) == 5
+    assert all(len(r.assets) == 1 and r.assets[0].path.endswith(".jar") for r in jars)
+    # 模拟Nexus的资源修改时间为 2021-04-08T07:39:00
+    assert len(list(inventory.query(modified_after="2021-04-08"))) == 5
+    assert not list(inventory.query(modified_after="2021-04-09"))
+    assert not list(inventory.query(modified_before="2021-04-08"))
+
+    groups = inventory.aggregate(inventory.query(), by="group")
+    assert sorted(groups) == ["org.example.g0", "org.example.g1"]
+    assert groups["org.example.g0"][:2] == [3, 9]
+    extensions = inventory.aggregate(inventory.query(), by="extension")
+    assert extensions["jar"] == [5, 5, 5 * 1024]
+    assert extensions["sha1"][:2] == [5, 5]
+
+
+def test_inventory_repository_replaces_listing(source, mock_nexus, maven_config, tmp_path, logger):
+    nexus, repository = source
+    target = mock_nexus()
+    target.repository("dst")
+    dst_repo = Nexus(**target.config(), logger=logger).repository("dst")
+    inventory = Inventory(str(tmp_path / "src.inv"), logger=logger)
+    inventory.save(repository)
+    before = len(listings(nexus))
+
+    src_repo = InventoryRepository(inventory, repository)
+    assert src_repo.name == "src"
+    assert migrate_maven2_repository(
+        src_repo, dst_repo, maven_config(), processes=2, logger=logger) == (True, 0)
+
+    # 组件来自快照, 不再调用列表接口
+    assert len(listings(nexus)) == before
+    assert len(target.repositories["dst"].components) == 5
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_lifecycle.py
+@time: 2026/10/21 6:00 下午
+"""
+
+import os
+import time
+
+from utils.exceptions import WorkerLostError
+from utils.lifecycle import WorkerPool
+
+
+def pid():
+    return os.getpid()
+
+
+def crash_once(marker: str):
+    """首次执行时进程异常退出, 重新派发后成功"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(9)
+    return "ok"
+
+
+def crash():
+    os._exit(9)
+
+
+def run(pool, func, args_list):
+    """提交任务并等待完成, 返回 (结果, 异常)"""
+    results, errors = [], []
+    for args in args_list:
+        pool.apply_async(func, args, callback=results.append, error_callback=errors.append)
+    pool.close()
+    pool.join()
+    return results, errors
+
+
+def test_recycle_on_max_tasks(logger):
+    pool = WorkerPool(1, max_tasks=2, logger=logger)
+    results, errors = run(pool, pid, [()] * 5)
+
+    assert not errors and len(results) == 5
+    # 每个工作进程处理2个任务后由新进程替换
+    assert [results.count(p) for p in dict.fromkeys(results)] == [2, 2, 1]
+    assert pool.events["recycled"] >= 2
+
+
+def test_recycle_on_max_rss(logger):
+    pool = WorkerPool(1, max_rss=1, logger=logger)
+    results, errors = run(pool, pid, [()] * 3)
+
+    assert not errors and len(set(results)) == 3
+    assert pool.events["recycled"] >= 2
+    assert pool.peak_rss > 0
+
+
+def test_requeue_after_crash(tmp_path, logger):
+    pool = WorkerPool(1, retries=2, logger=logger)
+    results, errors = run(pool, crash_once, [(str(tmp_path / "marker"),)])
+
+    assert results == ["ok"] and not errors
+    assert pool.events["died"] == 1 and pool.events["requeued"] == 1
+
+
+def test_worker_lost_after_retries(logger):
+    pool = WorkerPool(1, retries=1, logger=logger)
+    results, errors = run(pool, crash, [()])
+
+    assert not results
+    error, = errors
+    assert isinstance(error, WorkerLostError)
+    # 首次派发及1次重试
+    assert pool.events["died"] == 2 and pool.events["requeued"] == 1
+
+
+def test_terminate_and_join(logger):
+    pool = WorkerPool(2, logger=logger)
+    results, errors = [], []
+    for _ in range(4):
+        pool.apply_async(time.sleep, (30,), callback=results.append, error_callback=errors.append)
+    processes = [worker.process for worker in pool._workers]
+    start = time.monotonic()
+    pool.terminate()
+    pool.join()
+
+    assert time.monotonic() - start < 10
+    assert not any(process.is_alive() for process in processes)
+    # 终止时丢弃未完成的任务, 不执行回调
+    assert not results and not errors
+    assert pool.events["died"] == 0
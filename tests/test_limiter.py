@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_limiter.py
+@time: 2026/10/20 10:00 上午
+"""
+
+import time
+
+import pytest
+
+from utils.limiter import Limiter, NO_LIMIT, endpoint, parse_rate
+
+
+@pytest.fixture
+def registry():
+    saved = (dict(Limiter._registry), dict(Limiter._endpoints))
+    Limiter._registry.clear()
+    Limiter._endpoints.clear()
+    yield Limiter
+    Limiter._registry.clear()
+    Limiter._endpoints.clear()
+    Limiter._registry.update(saved[0])
+    Limiter._endpoints.update(saved[1])
+
+
+def test_parse_rate():
+    assert parse_rate("10M") == 10 * 1024 ** 2
+    assert parse_rate("512KiB") == 512 * 1024
+    assert parse_rate("") == 0
+    assert parse_rate(5) == 5
+
+
+def test_endpoint_uses_effective_port():
+    assert endpoint("http://Nexus:80/service/rest/") == ("http", "nexus", 80)
+    assert endpoint("http://nexus/repository/a/b.jar") == ("http", "nexus", 80)
+    assert endpoint("https://nexus/repository/a/b.jar") == ("https", "nexus", 443)
+    assert endpoint("http://nexus:8081/x") == ("http", "nexus", 8081)
+    assert endpoint(None) is None
+
+
+def test_default_port_download_url_is_limited(registry):
+    limiter = Limiter(bytes_per_second="1M")
+    registry.register("https://nexus:443/service/rest/", limiter)
+    assert registry.get("https://nexus/repository/src/g/a/1/a-1.jar") is limiter
+    assert registry.get("http://nexus/repository/src/g/a/1/a-1.jar") is NO_LIMIT
+
+
+def test_port_prefix_does_not_match_other_port(registry):
+    limiter = Limiter(requests_per_second=10)
+    registry.register("http://a:80/service/rest/", limiter)
+    assert registry.get("http://a:8081/repository/src/x.jar") is NO_LIMIT
+    assert registry.get("http://a/repository/src/x.jar") is limiter
+
+
+def test_install_rebuilds_endpoints(registry):
+    limiter = Limiter(requests_per_second=10)
+    registry.install({"http://a:8081/service/rest/": limiter})
+    assert registry.get("http://A:8081/repository/src/x.jar") is limiter
+
+
+def test_bucket_throttles_transfer():
+    limiter = Limiter(bytes_per_second=100 * 1024)
+    start = time.perf_counter()
+    # 桶容量为1秒的令牌, 超出部分按速率等待
+    limiter.transfer(100 * 1024)
+    limiter.transfer(30 * 1024)
+    assert time.perf_counter() - start >= 0.25
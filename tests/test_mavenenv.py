@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_mavenenv.py
+@time: 2026/10/20 4:00 下午
+"""
+
+import os
+import socket
+import subprocess
+import sys
+
+from utils.classes import Nexus
+from utils.functions import plan_maven2_repository
+from utils.mavenenv import MavenEnvironment
+
+
+def environment(root, logger):
+    env = MavenEnvironment("settings.xml", root=str(root), logger=logger)
+    os.makedirs(os.path.join(env.plugins, "org", "apache"), exist_ok=True)
+    return env
+
+
+def test_client_deploys_online(tmp_path, logger):
+    options = environment(tmp_path, logger).client().options
+    assert "-o" not in options and "-nsu" in options
+    assert not [option for option in options if option.startswith("-Daether.offline")]
+
+
+def test_clean_keeps_other_runs(tmp_path, logger):
+    env, other = environment(tmp_path, logger), environment(tmp_path, logger)
+    other.run = f"{socket.gethostname()}-{os.getppid()}"
+    other.workers = os.path.join(os.path.dirname(env.workers), other.run)
+    mine, theirs = env.repository(), other.repository()
+
+    env.clean()
+
+    assert not os.path.exists(mine) and os.path.isdir(theirs)
+
+
+def test_reap_only_exited_runs_on_this_host(tmp_path, logger):
+    env = environment(tmp_path, logger)
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    workers = os.path.dirname(env.workers)
+    host = socket.gethostname()
+    runs = {"exited": f"{host}-{process.pid}", "running": f"{host}-{os.getppid()}",
+            "remote": "other-host-1"}
+    for run in runs.values():
+        os.makedirs(os.path.join(workers, run))
+
+    assert env.reap() == [runs["exited"]]
+    assert sorted(os.listdir(workers)) == sorted([runs["running"], runs["remote"]])
+
+
+def test_plan_does_not_prepare_maven(mock_nexus, maven_config, tmp_path, logger, monkeypatch):
+    prepared = []
+    monkeypatch.setattr(MavenEnvironment, "prepare", lambda self: prepared.append(self) or False)
+    source = mock_nexus()
+    source.populate("snapshots", count=2, policy="SNAPSHOT")
+    source.repository("dst", policy="SNAPSHOT")
+    (tmp_path / "settings.xml").write_text("<settings/>", encoding="utf-8")
+    nexus = Nexus(**source.config(), logger=logger)
+    config = maven_config(maven_client={"root": str(tmp_path / "maven-env")})
+
+    planner = plan_maven2_repository(
+        nexus.repository("snapshots"), nexus.repository("dst"), config, probes=0, logger=logger)
+
+    assert planner is not None and not prepared
+    assert not os.path.exists(tmp_path / "maven-env")
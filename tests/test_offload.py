@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_offload.py
+@time: 2026/10/21 9:00 下午
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+
+from tests.mock_nexus import POM as POM_TEMPLATE
+from utils.classes import Nexus, File, POM
+from utils.functions import migrate_maven2_repository
+from utils.offload import Offloader, HYBRID, replace_pom
+
+MAPPING = {"http://old.nexus/repository/src/": "http://new.nexus/repository/dst/"}
+SHM_DIRECTORY = "/dev/shm"
+
+
+def shared_segments():
+    """当前存在的共享内存段"""
+    if not os.path.isdir(SHM_DIRECTORY):
+        return set()
+    return {name for name in os.listdir(SHM_DIRECTORY) if name.startswith("psm_")}
+
+
+def pom(version="1.0"):
+    return POM_TEMPLATE.format(group="org.example", name="artifact", version=version).encode("utf-8")
+
+
+@pytest.fixture
+def offloader(logger):
+    offloader = Offloader(2, logger=logger).start()
+    yield offloader
+    offloader.close()
+
+
+def test_shared_memory_digest(offloader, tmp_path):
+    data = os.urandom(256 * 1024)
+    before = shared_segments()
+
+    digests = offloader.digests(io.BytesIO(data), ["md5", "sha1"])
+    assert digests == {"md5": hashlib.md5(data).hexdigest(), "sha1": hashlib.sha1(data).hexdigest()}
+    # 内存中的数据经共享内存传递, 用完后释放
+    assert offloader.tasks == 1 and offloader.shared == len(data)
+    assert shared_segments() == before
+
+    # 磁盘上的文件只传递路径
+    path = tmp_path / "artifact.jar"
+    path.write_bytes(data)
+    assert offloader.digests(str(path), ["sha1"]) == {"sha1": hashlib.sha1(data).hexdigest()}
+    assert offloader.tasks == 2 and offloader.shared == len(data)
+
+
+def test_pom_rewrite(offloader, tmp_path):
+    expected = io.BytesIO(pom())
+    POM(expected).replace("url", MAPPING)
+    expected = expected.getvalue()
+    assert b"http://new.nexus/repository/dst/" in expected
+
+    f = io.BytesIO(pom())
+    offloader.replace_pom(f, "url", MAPPING)
+    assert f.tell() == 0 and f.getvalue() == expected
+    assert offloader.shared == len(pom())
+
+    path = tmp_path / "artifact-1.0.pom"
+    path.write_bytes(pom())
+    offloader.replace_pom(str(path), "url", MAPPING)
+    assert path.read_bytes() == expected
+
+
+def test_install_routes_module_calls(offloader, tmp_path):
+    path = tmp_path / "artifact.jar"
+    path.write_bytes(b"content")
+    Offloader.install(offloader)
+    try:
+        replace_pom(io.BytesIO(pom()), "url", MAPPING)
+        assert File(str(path)).digests(["md5"]) == {"md5": hashlib.md5(b"content").hexdigest()}
+        assert offloader.tasks == 2
+    finally:
+        Offloader.install(None)
+    # 未安装时在当前进程中执行
+    replace_pom(io.BytesIO(pom()), "url", MAPPING)
+    assert offloader.tasks == 2
+
+
+def test_hybrid_migrate(mock_nexus, maven_config, logger):
+    source, target = mock_nexus(), mock_nexus()
+    source.populate("src", count=5)
+    target.repository("dst")
+    src_repo = Nexus(**source.config(), logger=logger).repository("src")
+    dst_repo = Nexus(**target.config(), logger=logger).repository("dst")
+
+    assert migrate_maven2_repository(
+        src_repo, dst_repo, maven_config(), processes=4, executor=HYBRID,
+        cpu_processes=2, logger=logger) == (True, 0)
+
+    repository = target.repositories["dst"]
+    assert len(repository.components) == 5
+    poms = [data for path, data in repository.files.items() if path.endswith(".pom")]
+    assert len(poms) == 5
+    # POM在CPU进程池中替换地址
+    assert all(b"http://new.nexus/repository/dst/" in data and b"old.nexus" not in data for data in poms)
+    # 结束后卸载, 之后的调用在当前进程中执行
+    assert Offloader.current() is None and File.offloader is None
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_planner.py
+@time: 2026/10/21 4:00 下午
+"""
+
+import pytest
+
+from utils.classes import Nexus
+from utils.planner import Planner
+
+
+def test_speedup_interpolates_and_saturates(logger):
+    planner = Planner(logger=logger)
+    planner.speedups = {1: 1.0, 4: 3.0}
+    planner.latency, planner.download_rate = 0.01, 1024 * 1024
+    planner.costs = [(3, 1024 * 1024)] * 100
+
+    assert planner.speedup(2) == pytest.approx(1 + 2 / 3)
+    assert planner.speedup(64) == 3.0
+    # 超过最高探测级别时不再线性外推
+    assert planner.predict(64) == planner.predict(4)
+    assert planner.predict(1) == pytest.approx(planner.predict(4) * 3)
+
+
+def test_fit_latency_and_rate():
+    latency, rate = Planner._fit([(size, 0.1 + size / 1000) for size in [0, 500, 2000]])
+    assert latency == pytest.approx(0.1) and rate == pytest.approx(1000)
+    # 大小相同时无法测量带宽
+    assert Planner._fit([(100, 0.2), (100, 0.4)]) == (pytest.approx(0.3), None)
+
+
+@pytest.mark.parametrize("cores, saturated", [(1, True), (64, False)])
+def test_probe_measures_saturation(mock_nexus, logger, cores, saturated):
+    source = mock_nexus(download_cores=cores)
+    source.populate("src", count=3)
+    source.download_delay = 0.05
+    repository = Nexus(**source.config(), logger=logger).repository("src")
+    planner = Planner(["md5", "sha1"], probes=3, levels=[1, 4], logger=logger)
+    planner.inventory(c for getter in repository.iter_component_getter for c in getter.components)
+    planner.probe()
+
+    assert planner.latency >= 0.05
+    if saturated:
+        # 服务端同时只处理一个下载, 增加并发没有收益
+        assert planner.speedups[4] < 1.5
+        assert planner.predict(64) > planner.predict(1) / 1.5
+    else:
+        assert planner.speedups[4] > 2.5
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_recording.py
+@time: 2026/10/21 10:00 下午
+"""
+
+import gzip
+import hashlib
+import json
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+
+import pytest
+import requests
+
+from tests.mock_nexus import USERNAME, PASSWORD
+from utils.classes import Nexus
+from utils.exceptions import RecordingFormatError
+from utils.functions import migrate_maven2_repository
+from utils.recording import Recorder, Replayer, BASE_PLACEHOLDER, RECORDING_VERSION
+
+
+def config(url: str):
+    """本机服务地址对应的Nexus参数"""
+    parts = urlsplit(url)
+    return dict(address=parts.hostname, port=parts.port, protocol=parts.scheme,
+                username=USERNAME, password=PASSWORD)
+
+
+def entries(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def recording(mock_nexus, maven_config, tmp_path, logger):
+    """经录制代理迁移源存储库, 返回源及录制文件路径"""
+    source, target = mock_nexus(), mock_nexus()
+    source.populate("src", count=5, jar_size=4096)
+    target.repository("dst")
+    path = str(tmp_path / "src.rec")
+    recorder = Recorder(path, source.url, logger=logger).start()
+    try:
+        src_repo = Nexus(**config(recorder.url), logger=logger).repository("src")
+        dst_repo = Nexus(**target.config(), logger=logger).repository("dst")
+        assert migrate_maven2_repository(
+            src_repo, dst_repo, maven_config(), processes=2, logger=logger) == (True, 0)
+    finally:
+        recorder.close()
+    assert len(target.repositories["dst"].components) == 5
+    return source, path
+
+
+def test_recording_format(recording):
+    source, path = recording
+    header, *rows = entries(path)
+    assert header["version"] == RECORDING_VERSION and header["upstream"] == source.url
+
+    listings = [row for row in rows if urlsplit(row["path"]).path == "/service/rest/v1/components"]
+    assert listings and all(row["kind"] == "json" and row["status"] == 200 for row in listings)
+    # JSON中的源地址替换为占位符
+    body = listings[0]["body"]
+    assert BASE_PLACEHOLDER + "/repository/src/" in body and source.url not in body
+
+    blobs = [row for row in rows if row["kind"] == "blob" and row["path"].startswith("/repository/src/")]
+    assert len({row["path"] for row in blobs}) == 10
+    files = source.repositories["src"].files
+    for row in blobs:
+        # 只记录大小, 不记录内容
+        assert "body" not in row
+        assert row["total"] == len(files[urlsplit(row["path"]).path[len("/repository/src/"):]])
+        assert row["elapsed"] >= row["ttfb"] >= 0
+
+
+def test_placeholder_checksums_and_range(recording, logger):
+    _, path = recording
+    replayer = Replayer(path, latency=0, logger=logger).start()
+    try:
+        response = requests.get(f"{replayer.url}/service/rest/v1/components?repository=src")
+        assert response.status_code == 200
+        assets = [asset for item in response.json()["items"] for asset in item["assets"]]
+        assert len(assets) == 15
+        for asset in assets:
+            assert asset["downloadUrl"].startswith(replayer.url)
+            if asset["path"].endswith(".sha1"):
+                # 迁移时排除, 未录制
+                continue
+            data = requests.get(asset["downloadUrl"]).content
+            # 占位内容与原始内容等长, 列表中的校验和为占位内容的摘要
+            assert len(data) == asset["fileSize"]
+            assert asset["checksum"] == {"sha1": hashlib.sha1(data).hexdigest(),
+                                         "md5": hashlib.md5(data).hexdigest()}
+            if asset["path"].endswith(".pom"):
+                ElementTree.fromstring(data)
+
+        jar = next(asset for asset in assets if asset["path"].endswith(".jar"))
+        full = requests.get(jar["downloadUrl"]).content
+        response = requests.get(jar["downloadUrl"], headers={"Range": "bytes=1000-2999"})
+        assert response.status_code == 206
+        assert response.headers["Content-Range"] == f"bytes 1000-2999/{len(full)}"
+        assert response.content == full[1000:3000]
+        response = requests.get(jar["downloadUrl"], headers={"Range": "bytes=4000-"})
+        assert response.content == full[4000:]
+    finally:
+        result = replayer.close()
+    assert result["misses"] == 0
+
+
+def test_replay_migrate_to_sink(recording, maven_config, tmp_path, logger):
+    _, path = recording
+    results = str(tmp_path / "replay.jsonl")
+    for _ in range(2):
+        replayer = Replayer(path, latency=0, sinks=["dst"], results=results, logger=logger).start()
+        try:
+            src_repo = Nexus(**config(replayer.url), logger=logger).repository("src")
+            dst_repo = Nexus(**config(replayer.url), logger=logger).repository("dst")
+            assert migrate_maven2_repository(
+                src_repo, dst_repo, maven_config(), processes=2, logger=logger) == (True, 0)
+        finally:
+            result = replayer.close()
+        # 不依赖任何Nexus, 上传由回放服务接收
+        assert result["uploads"] == 5 and result["misses"] == 0
+    with open(results, "r", encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+
+def test_unsupported_version(tmp_path, logger):
+    path = str(tmp_path / "old.rec")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"version": RECORDING_VERSION + 1}) + "\n")
+    with pytest.raises(RecordingFormatError):
+        Replayer(path, logger=logger).load()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_replicator.py
+@time: 2026/10/21 11:00 上午
+"""
+
+import threading
+import time
+
+from utils.classes import Nexus
+from utils.replicator import Replicator
+
+
+def snapshots(repository, base, builds, day="20210401"):
+    """添加基础版本的多个时间戳构建, 返回版本列表"""
+    versions = []
+    for build in builds:
+        version = f"{base}-{day}.1010{build:02d}-{build}"
+        repository.add("org.example", "artifact", version, {"jar": version.encode()})
+        versions.append(version)
+    return versions
+
+
+def replicator(source, target, logger, **kwargs):
+    src_repo = Nexus(**source.config(), logger=logger).repository("src")
+    dst_repo = Nexus(**target.config(), logger=logger).repository("dst")
+    submitted = []
+    return Replicator(src_repo, dst_repo, submitted.append, debounce=0, reconcile_delay=0,
+                      partitions=4, logger=logger, **kwargs), submitted
+
+
+def pending(replicator):
+    return sorted(key[2] for key in replicator._pending)
+
+
+def test_reconcile_snapshots_by_base_version(mock_nexus, tmp_path, logger):
+    source, target = mock_nexus(), mock_nexus()
+    src = source.repository("src", policy="SNAPSHOT")
+    dst = target.repository("dst", policy="SNAPSHOT")
+    snapshots(src, "1.0", [1, 2, 3])
+    new = snapshots(src, "2.0", [1])
+    # 目标中1.0的构建由Maven客户端重新部署, 时间戳及构建号与源不同
+    snapshots(dst, "1.0", [1], day="20260101")
+    sync, _ = replicator(source, target, logger, tmp_dir=str(tmp_path))
+
+    assert sync.reconcile() == 1
+    assert pending(sync) == new
+
+    # 重新部署之后源产生的新构建需要同步
+    newer = snapshots(src, "1.0", [4], day="20270101")
+    snapshots(dst, "2.0", [1], day="20260101")
+    sync._pending.clear()
+    assert sync.reconcile() == 1
+    assert pending(sync) == newer
+
+
+def test_reconcile_applies_filters_and_policy(mock_nexus, logger):
+    source, target = mock_nexus(), mock_nexus()
+    src = source.repository("src", policy="SNAPSHOT")
+    target.repository("dst", policy="SNAPSHOT")
+    latest = snapshots(src, "1.0", [1, 2, 3])[-1:]
+    src.add("org.other", "artifact", "1.0-20210401.101001-1", {"jar": b"other"})
+    sync, _ = replicator(
+        source, target, logger,
+        filters={"include": {"group": ["org.example"]}},
+        snapshot_policy={"keep": "latest", "latest": 1})
+
+    assert sync.reconcile() == 1
+    assert pending(sync) == latest
+
+
+def test_events_outside_filters_are_skipped(mock_nexus, logger):
+    source, target = mock_nexus(), mock_nexus()
+    src = source.populate("src", count=4)
+    target.repository("dst")
+    sync, submitted = replicator(
+        source, target, logger, filters={"include": {"group": ["org.example.g0"]}})
+    thread = threading.Thread(target=sync.dispatch, daemon=True)
+    thread.start()
+    try:
+        for id, component in src.components.items():
+            sync.receive({"repositoryName": "src", "action": "CREATED",
+                          "component": {"componentId": id, **{
+                              key: component[key] for key in ("group", "name", "version")}}})
+        deadline = time.monotonic() + 10
+        while sync.replicated + sync.skipped < 4 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        sync.stop()
+        thread.join(5)
+
+    assert sync.status()["skipped"] == 2
+    assert sorted(component.group for component in submitted) == ["org.example.g0"] * 2
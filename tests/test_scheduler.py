@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_scheduler.py
+@time: 2026/10/21 5:00 下午
+"""
+
+import pytest
+
+from utils.scheduler import maven_version_key
+
+# 以下用例取自Maven的ComparableVersionTest, 每组按从小到大排列
+VERSIONS_QUALIFIER = [
+    "1-alpha2snapshot", "1-alpha2", "1-alpha-123", "1-beta-2", "1-beta123", "1-m2", "1-m11", "1-rc",
+    "1-cr2", "1-rc123", "1-SNAPSHOT", "1", "1-sp", "1-sp2", "1-sp123", "1-abc", "1-def", "1-pom-1",
+    "1-1-snapshot", "1-1", "1-2", "1-123"]
+VERSIONS_NUMBER = [
+    "2.0", "2-1", "2.0.a", "2.0.0.a", "2.0.2", "2.0.123", "2.1.0", "2.1-a", "2.1b", "2.1-c", "2.1-1",
+    "2.1.0.1", "2.2", "2.123", "11.a2", "11.a11", "11.b2", "11.b11", "11.m2", "11.m11", "11", "11.a",
+    "11b", "11c", "11m"]
+ORDERED = [
+    ("1", "2"), ("1.5", "2"), ("1", "2.5"), ("1.0", "1.1"), ("1.1", "1.2"), ("1.0.0", "1.1"),
+    ("1.0.1", "1.1"), ("1.1", "1.2.0"), ("1.0-alpha-1", "1.0"), ("1.0-alpha-1", "1.0-alpha-2"),
+    ("1.0-alpha-1", "1.0-beta-1"), ("1.0-beta-1", "1.0-SNAPSHOT"), ("1.0-SNAPSHOT", "1.0"),
+    ("1.0-alpha-1-SNAPSHOT", "1.0-alpha-1"), ("1.0", "1.0-1"), ("1.0-1", "1.0-2"), ("1.0.0", "1.0-1"),
+    ("2.0-1", "2.0.1"), ("2.0.1-klm", "2.0.1-lmn"), ("2.0.1", "2.0.1-xyz"), ("2.0.1", "2.0.1-123"),
+    ("2.0.1-xyz", "2.0.1-123")]
+EQUAL = [
+    ("1", "1.0"), ("1", "1.0.0"), ("1.0", "1.0.0"), ("1", "1-0"), ("1", "1.0-0"), ("1.0", "1.0-0"),
+    ("1a", "1-a"), ("1a", "1.0-a"), ("1a", "1.0.0-a"), ("1.0a", "1-a"), ("1.0.0a", "1-a"),
+    ("1x", "1-x"), ("1x", "1.0-x"), ("1x", "1.0.0-x"), ("1.0x", "1-x"), ("1.0.0x", "1-x"),
+    ("1ga", "1"), ("1release", "1"), ("1final", "1"), ("1cr", "1rc"),
+    ("1a1", "1-alpha-1"), ("1b2", "1-beta-2"), ("1m3", "1-milestone-3"),
+    ("1X", "1x"), ("1A", "1a"), ("1GA", "1"), ("1RELeaSE", "1"), ("1FinaL", "1"), ("1Cr", "1Rc"),
+    ("1m3", "1MILESTONE3")]
+
+
+def pairs(versions):
+    return list(zip(versions, versions[1:]))
+
+
+@pytest.mark.parametrize("lower, higher", pairs(VERSIONS_QUALIFIER) + pairs(VERSIONS_NUMBER) + ORDERED)
+def test_versions_order(lower, higher):
+    assert maven_version_key(lower) < maven_version_key(higher)
+    assert maven_version_key(higher) > maven_version_key(lower)
+    assert maven_version_key(lower) != maven_version_key(higher)
+
+
+@pytest.mark.parametrize("left, right", EQUAL)
+def test_versions_equal(left, right):
+    assert maven_version_key(left) == maven_version_key(right)
+
+
+def test_sorted_matches_maven():
+    shuffled = VERSIONS_QUALIFIER[::2] + VERSIONS_QUALIFIER[1::2]
+    assert sorted(shuffled, key=maven_version_key) == VERSIONS_QUALIFIER
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_shard.py
+@time: 2026/10/20 9:30 上午
+"""
+
+import socket
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from utils.shard import Shard, Coordinator, CoordinatorClient
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def serve(tmp_path, logger):
+    """启动协调器服务, 返回(协调器, 地址)"""
+    def start(total=2, ttl=60, attempts=3):
+        coordinator = Coordinator(
+            str(tmp_path / "coordinator.db"), total=total, ttl=ttl, attempts=attempts, logger=logger)
+        port = free_port()
+        threading.Thread(target=coordinator.serve, args=("127.0.0.1", port), daemon=True).start()
+        url = f"http://127.0.0.1:{port}"
+        for _ in range(50):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        return coordinator, url
+    return start
+
+
+def state(coordinator, shard):
+    return [s for s in coordinator.status() if s["shard"] == shard][0]
+
+
+def test_shard_partition_is_stable():
+    class C:
+        group, name, version = "org.g", "a", "1.0"
+    assert Shard.bucket(C, 16) == Shard.bucket(C, 16)
+    owners = [i for i in range(4) if Shard(i, 4).owns(C)]
+    assert len(owners) == 1
+
+
+def test_interval_follows_server_ttl(serve, logger):
+    coordinator, url = serve(ttl=1.5)
+    client = CoordinatorClient(url, owner="a", logger=logger)
+    shard = client.acquire()
+    assert client.ttl == 1.5
+    assert client.heartbeat_interval == pytest.approx(0.5)
+    # 工作时间超过有效期, 后台续约保持租约
+    time.sleep(2.5)
+    assert coordinator.acquire("b") == 1
+    assert client.flush() is True
+    assert not client.lost
+    client.release()
+    assert state(coordinator, shard.index)["state"] == Coordinator.DONE
+
+
+def test_interval_not_below_ttl_falls_back(serve, logger):
+    _, url = serve(ttl=3)
+    client = CoordinatorClient(url, owner="a", interval=10, logger=logger)
+    client.acquire()
+    assert client.heartbeat_interval == pytest.approx(1)
+    client.release()
+
+
+def test_lost_lease_stops_shard(serve, logger):
+    coordinator, url = serve(total=1)
+    client = CoordinatorClient(url, owner="a", logger=logger)
+    shard = client.acquire()
+    # 模拟续约不及时, 租约过期后转交其他节点
+    with sqlite3.connect(coordinator.path) as conn:
+        conn.execute("UPDATE leases SET expires = 0")
+    assert coordinator.acquire("b") == shard.index
+    client.complete("g:a:1")
+    assert client.flush() is False
+    assert client.lost
+    client.release()
+    # 失效的节点不能把新持有者的分片标记为完成
+    assert state(coordinator, shard.index)["state"] == Coordinator.LEASED
+    assert state(coordinator, shard.index)["owner"] == "b"
+
+
+def test_failed_components_are_retried(serve, logger):
+    coordinator, url = serve(total=1)
+    client = CoordinatorClient(url, owner="a", logger=logger)
+    shard = client.acquire()
+    client.complete("g:a:1")
+    client.fail("g:a:2", "RequestException: boom")
+    client.release(completed=True)
+    status = state(coordinator, shard.index)
+    assert status["state"] == Coordinator.PENDING
+    assert (status["failed"], status["attempts"]) == (1, 1)
+    assert coordinator.failures(shard.index) == {"g:a:2": "RequestException: boom"}
+
+    other = CoordinatorClient(url, owner="b", logger=logger)
+    assert other.acquire().index == shard.index
+    assert other.completed() == {"g:a:1"}
+    other.complete("g:a:2")
+    other.release(completed=True)
+    status = state(coordinator, shard.index)
+    assert (status["state"], status["failed"]) == (Coordinator.DONE, 0)
+
+
+def test_failed_shard_gives_up_after_attempts(serve, logger):
+    coordinator, url = serve(total=1, attempts=2)
+    client = CoordinatorClient(url, owner="a", logger=logger)
+    for _ in range(2):
+        assert client.acquire() is not None
+        client.fail("g:a:2", "boom")
+        client.release(completed=True)
+    assert state(coordinator, 0)["state"] == Coordinator.FAILED
+    assert client.acquire() is None
+
+
+def test_drain_keeps_lease(serve, logger):
+    coordinator, url = serve(total=1)
+    client = CoordinatorClient(url, owner="a", logger=logger)
+    client.acquire()
+    client.fail("g:a:2", "boom")
+    client.release(completed=False)
+    assert state(coordinator, 0)["state"] == Coordinator.LEASED
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: test_trace.py
+@time: 2026/10/21 3:00 下午
+"""
+
+import threading
+
+from utils.trace import Span, Tracer
+
+
+def test_sampling_is_per_thread(tmp_path):
+    tracer = Tracer(str(tmp_path / "trace.json"), sample=0)
+    entered, leave = threading.Event(), threading.Event()
+    inside = []
+
+    def component():
+        with tracer.task("component"):
+            inside.append(tracer.span("download", "download"))
+            entered.set()
+            leave.wait(5)
+
+    thread = threading.Thread(target=component)
+    thread.start()
+    try:
+        assert entered.wait(5)
+        # 其他线程中未采样的组件不影响当前线程
+        assert isinstance(tracer.span("listing", "listing"), Span)
+        assert not isinstance(inside[0], Span)
+    finally:
+        leave.set()
+        thread.join(5)
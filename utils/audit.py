@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: audit.py
+@time: 2026/10/19 11:20 下午
+"""
+
+__version__ = (0, 0, 3)
+__update_str__ = "分区文件的读写提取为Spill类, 供对账复用"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import hashlib
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import zlib
+from multiprocessing.pool import ThreadPool
+from shutil import rmtree
+
+import requests
+
+from utils.auth import NexusAuth
+from utils.classes import File, Log
+from utils.limiter import Limiter
+
+DEFAULT_PARTITIONS = 64
+DEFAULT_SAMPLE = 0
+SOURCE = "source"
+TARGET = "target"
+
+
+class Spill(object):
+    """分区临时文件"""
+
+    def __init__(self, directory: str, name: str, partitions: int = DEFAULT_PARTITIONS, width: int = 1):
+        """
+        初始化
+        每行按前width列组成的键的哈希写入分区文件, 之后逐个分区读回, 内存占用与单个分区成正比
+        :param directory: str 临时目录
+        :param name: str 文件名前缀, 同一目录中的多个Spill需不同
+        :param partitions: int 分区数
+        :param width: int 组成键的列数
+        """
+        self.directory = directory
+        self.name = name
+        self.partitions = max(1, partitions)
+        self.width = width
+        self.count = 0
+        self._files = []
+
+    def __str__(self):
+        return f"<{self.__doc__} Name={self.name} Partitions={self.partitions} Count={self.count}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __enter__(self):
+        self._files = [open(self.path(i), "w", encoding="utf-8") for i in range(self.partitions)]
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for f in self._files:
+            f.close()
+        self._files = []
+
+    def path(self, index: int):
+        return os.path.join(self.directory, f"{self.name}-{index:04d}.tsv")
+
+    def key(self, row: list):
+        return "\t".join(row[:self.width])
+
+    def write(self, row: list):
+        """
+        写入一行, 列中不能包含制表符及换行符
+        :param row: list 列
+        :return: None
+        """
+        key = self.key(row)
+        self._files[zlib.crc32(key.encode("utf-8")) % self.partitions].write("\t".join(row) + "\n")
+        self.count += 1
+
+    def read(self, index: int):
+        """
+        读取一个分区
+        :param index: int 分区序号
+        :return: generator (键, 列)
+        """
+        with open(self.path(index), "r", encoding="utf-8") as f:
+            for line in f:
+                row = line.rstrip("\n").split("\t")
+                yield self.key(row), row
+
+
+class Auditor(object):
+    """迁移结果审计"""
+
+    MISSING = "missing"
+    EXTRA = "extra"
+    MISMATCH = "mismatch"
+    CORRUPT = "corrupt"
+    ISSUES = [MISSING, EXTRA, MISMATCH, CORRUPT]
+
+    def __init__(
+            self,
+            partitions: int = DEFAULT_PARTITIONS,
+            sample: int = DEFAULT_SAMPLE,
+            excludes: list = None,
+            skip_checksum: list = None,
+            report: str = None,
+            tmp_dir: str = None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        两侧的资源按键的哈希写入各自的分区文件, 逐个分区建立源的哈希表并用目标探测, 内存占用与单个分区成正比
+        :param partitions: int 分区数, 资源数除以分区数即单个分区在内存中的行数
+        :param sample: int 随机抽样下载两侧内容并比对的资源数, 0为不抽样
+        :param excludes: list 不参与审计的拓展名, 与迁移的excludes一致
+        :param skip_checksum: list 仅比对存在性, 不比对校验和的拓展名, 例如迁移时被修改的pom
+        :param report: str 可选, 问题明细的输出路径(JSON Lines)
+        :param tmp_dir: str 分区文件的临时目录
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.partitions = max(1, partitions)
+        self.sample = sample
+        self.excludes = excludes if excludes else []
+        self.skip_checksum = skip_checksum if skip_checksum else []
+        self.report_path = report
+        self.tmp_dir = tmp_dir
+        self.logger = logger if logger else Log().logger
+        self.counts = {SOURCE: 0, TARGET: 0, "matched": 0}
+        self.counts.update({issue: 0 for issue in self.ISSUES})
+        self.samples = []
+        self._seen = 0
+        self._auth = {}
+        self._report = None
+
+    def __str__(self):
+        return f"<{self.__doc__} Partitions={self.partitions} Sample={self.sample}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def clean(self):
+        """
+        是否没有发现任何问题
+        :return: bool
+        """
+        return not any(self.counts[issue] for issue in self.ISSUES)
+
+    def _spill(self, side: str, components, directory: str):
+        """
+        将一侧的资源按分区写入临时文件, 每行: 组ID, 名称, 版本, 路径, 大小, sha1, md5, 下载地址
+        :param side: str SOURCE或TARGET
+        :param components: Iterable 组件
+        :param directory: str 临时目录
+        :return: None
+        """
+        with Spill(directory, side, self.partitions, width=4) as spill:
+            for component in components:
+                for asset in component.assets:
+                    if asset.extension in self.excludes:
+                        continue
+                    checksum = getattr(asset, "checksum", None) or {}
+                    row = [component.group or "", component.name or "", component.version or "",
+                           asset.path or "", str(asset.size if asset.size is not None else ""),
+                           checksum.get("sha1") or "", checksum.get("md5") or "",
+                           # 本地目录源没有下载地址, 使用文件路径
+                           getattr(asset, "download_url", None) or getattr(asset, "file", "") or ""]
+                    spill.write(row)
+                    if spill.count % 100000 == 0:
+                        self.logger.info(f"已列出{side}资源{spill.count}个")
+        self.counts[side] = spill.count
+
+    def enumerate(self, source, target, directory: str):
+        """
+        并行列出两侧的组件并写入分区文件
+        :param source: Iterable 源组件
+        :param target: Iterable 目标组件
+        :param directory: str 临时目录
+        :return: None
+        """
+        errors = []
+
+        def spill(side, components):
+            try:
+                self._spill(side, components, directory)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=spill, args=(SOURCE, source)),
+                   threading.Thread(target=spill, args=(TARGET, target))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        self.logger.info(f"列出完成: 源资源 {self.counts[SOURCE]}, 目标资源 {self.counts[TARGET]}")
+
+    def _issue(self, issue: str, row: list, detail: dict = None):
+        """
+        记录问题
+        :param issue: str 问题类型
+        :param row: list 资源行
+        :param detail: dict 附加信息
+        :return: None
+        """
+        self.counts[issue] += 1
+        if self._report is not None:
+            item = {"issue": issue, "group": row[0], "name": row[1], "version": row[2],
+                    "path": row[3]}
+            item.update(detail or {})
+            self._report.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    def _compare(self, source: list, target: list):
+        """
+        比对校验和, 依次使用sha1, md5及大小
+        :param source: list 源资源行
+        :param target: list 目标资源行
+        :return: dict 不一致时的明细, 一致时为None
+        """
+        if source[3].split(".")[-1] in self.skip_checksum:
+            return None
+        for index, name in [(5, "sha1"), (6, "md5"), (4, "size")]:
+            if source[index] and target[index]:
+                if source[index] != target[index]:
+                    return {"field": name, SOURCE: source[index], TARGET: target[index]}
+                return None
+        return None
+
+    def _reservoir(self, source: list, target: list):
+        """
+        蓄水池抽样, 在所有匹配的资源中等概率抽取
+        :param source: list 源资源行
+        :param target: list 目标资源行
+        :return: None
+        """
+        if not self.sample or source[3].split(".")[-1] in self.skip_checksum:
+            return
+        self._seen += 1
+        if len(self.samples) < self.sample:
+            self.samples.append((source, target))
+        else:
+            index = random.randrange(self._seen)
+            if index < self.sample:
+                self.samples[index] = (source, target)
+
+    def join(self, directory: str):
+        """
+        逐个分区进行哈希连接: 源分区建立哈希表, 目标分区逐行探测
+        :param directory: str 临时目录
+        :return: None
+        """
+        spills = {side: Spill(directory, side, self.partitions, width=4) for side in [SOURCE, TARGET]}
+        for i in range(self.partitions):
+            table = dict(spills[SOURCE].read(i))
+            for key, row in spills[TARGET].read(i):
+                source = table.pop(key, None)
+                if source is None:
+                    self._issue(self.EXTRA, row)
+                    continue
+                self.counts["matched"] += 1
+                detail = self._compare(source, row)
+                if detail:
+                    self._issue(self.MISMATCH, source, detail)
+                else:
+                    self._reservoir(source, row)
+            for row in table.values():
+                self._issue(self.MISSING, row)
+
+    def _digest(self, side: str, url: str):
+        """
+        下载并计算sha1
+        :param side: str SOURCE或TARGET
+        :param url: str 下载地址或本地文件路径
+        :return: str
+        """
+        if not url.startswith(("http://", "https://")):
+            return File(url).digest("sha1")
+        limiter = Limiter.get(url)
+        limiter.request()
+        sha1 = hashlib.sha1()
+        with requests.get(url, auth=self._auth.get(side), stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                limiter.transfer(len(chunk))
+                sha1.update(chunk)
+        return sha1.hexdigest()
+
+    def verify(self, threads: int = 8):
+        """
+        下载抽样资源的两侧内容, 比对实际的sha1
+        :param threads: int 并发下载数
+        :return: None
+        """
+        if not self.samples:
+            return
+
+        def check(pair):
+            source, target = pair
+            try:
+                digests = {SOURCE: self._digest(SOURCE, source[7]),
+                           TARGET: self._digest(TARGET, target[7])}
+            except (requests.exceptions.RequestException, OSError) as e:
+                return source, {"error": str(e)}
+            expected = source[5] or digests[SOURCE]
+            if digests[TARGET] != digests[SOURCE] or digests[SOURCE] != expected:
+                return source, {"field": "content", **digests, "recorded": source[5]}
+            return source, None
+
+        with ThreadPool(threads) as pool:
+            for source, detail in pool.imap_unordered(check, self.samples):
+                if detail:
+                    self._issue(self.CORRUPT, source, detail)
+        self.logger.info(f"抽样比对内容: {len(self.samples)}个资源, "
+                         f"不一致 {self.counts[self.CORRUPT]}")
+
+    def run(self, source, target, source_auth: NexusAuth = None, target_auth: NexusAuth = None):
+        """
+        执行审计
+        :param source: Iterable 源组件, 应与迁移时的筛选结果一致
+        :param target: Iterable 目标组件, 应与源使用相同的筛选
+        :param source_auth: NexusAuth类 源的认证信息, 用于抽样下载
+        :param target_auth: NexusAuth类 目标的认证信息, 用于抽样下载
+        :return: dict 统计结果
+        """
+        self._auth = {SOURCE: source_auth, TARGET: target_auth}
+        if self.tmp_dir:
+            os.makedirs(self.tmp_dir, exist_ok=True)
+        directory = tempfile.mkdtemp(prefix="audit-", dir=self.tmp_dir)
+        if self.report_path:
+            self._report = open(self.report_path, "w", encoding="utf-8")
+        try:
+            self.enumerate(source, target, directory)
+            self.join(directory)
+            self.verify()
+        finally:
+            rmtree(directory, ignore_errors=True)
+            if self._report is not None:
+                self._report.close()
+                self._report = None
+        self.report()
+        return self.counts
+
+    def report(self):
+        """
+        输出审计结果
+        :return: None
+        """
+        counts = self.counts
+        self.logger.info(
+            f"审计结果: 源资源 {counts[SOURCE]}, 目标资源 {counts[TARGET]}, 匹配 {counts['matched']}, "
+            f"缺失 {counts[self.MISSING]}, 多余 {counts[self.EXTRA]}, "
+            f"校验和不一致 {counts[self.MISMATCH]}, 内容不一致 {counts[self.CORRUPT]}")
+        if self.report_path and not self.clean:
+            self.logger.info(f"问题明细: {self.report_path}")
+        if self.clean:
+            self.logger.info("审计通过")
+        else:
+            self.logger.warning("审计未通过")
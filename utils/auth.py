@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: auth.py
+@time: 2026/10/20 2:00 上午
+"""
+
+__version__ = (0, 0, 2)
+__update_str__ = "认证统计保存在共享内存中, 主进程可汇总所有工作进程的登录次数"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import base64
+import logging
+import multiprocessing
+import os
+import secrets
+import threading
+from urllib.parse import urljoin
+
+import requests
+from requests.auth import AuthBase, _basic_auth_str
+
+from utils.exceptions import AuthModeNotSupport
+
+# basic: 每个请求携带用户名密码, Nexus每次校验密码哈希
+# session: 每个进程登录一次, 后续请求携带NXSESSIONID, 会话失效(401)时重新登录
+# token: 使用用户令牌(Nexus Pro), 校验开销低于密码
+BASIC = "basic"
+SESSION = "session"
+TOKEN = "token"
+AUTH_MODES = [BASIC, SESSION, TOKEN]
+SESSION_API = "service/rapture/session"
+SESSION_COOKIE = "NXSESSIONID"
+CSRF_TOKEN = "NX-ANTI-CSRF-TOKEN"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class AuthStats(object):
+    """认证统计"""
+
+    KEYS = ("logins", "reauths", "fallbacks")
+
+    def __init__(self):
+        """
+        初始化
+        计数保存在共享内存中, 随进程池初始化参数传入子进程后, 所有进程共用
+        """
+        self._counters = {key: multiprocessing.Value("q", 0) for key in self.KEYS}
+
+    def __str__(self):
+        return f"<{self.__doc__} {' '.join(f'{k}={v}' for k, v in self.values().items())}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __getitem__(self, key: str):
+        return self._counters[key].value
+
+    def add(self, key: str):
+        """
+        计数加一
+        :param key: str 统计项, 参考KEYS
+        :return: None
+        """
+        counter = self._counters[key]
+        with counter.get_lock():
+            counter.value += 1
+
+    def values(self):
+        """
+        返回所有统计项
+        :return: dict
+        """
+        return {key: self[key] for key in self.KEYS}
+
+
+class NexusAuth(AuthBase):
+    """Nexus认证"""
+
+    # (地址, 用户名) -> 会话Cookie, 每个进程各自登录; None表示登录失败, 退回basic
+    _sessions = {}
+    _pid = os.getpid()
+    _lock = threading.Lock()
+    # 所有进程共用的认证统计, 由install安装至子进程
+    stats = AuthStats()
+
+    def __init__(
+            self,
+            url: str,
+            username: str = None,
+            password: str = None,
+            mode: str = BASIC,
+            token_name: str = None,
+            token_passcode: str = None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        实例不保存会话, 可随组件及进程池初始化参数传入子进程, 每个进程首次请求时登录, 同一地址及用户共用一个会话
+        :param url: str Nexus地址, 例如 http://nexus:8081
+        :param username: str 用户名
+        :param password: str 密码
+        :param mode: str 认证方式, basic / session / token
+        :param token_name: str 用户令牌名称, token方式必填
+        :param token_passcode: str 用户令牌密码, token方式必填
+        :param logger: logging.Logger类 日志记录器
+        """
+        mode = (mode or BASIC).lower()
+        if mode not in AUTH_MODES:
+            raise AuthModeNotSupport(f"Auth mode {mode} is NOT supported, choose from {AUTH_MODES}")
+        if mode == TOKEN and not (token_name and token_passcode):
+            raise AuthModeNotSupport("Auth mode token requires token_name and token_passcode")
+        self.url = url
+        self.username = username
+        self.password = password
+        self.mode = mode
+        self.token_name = token_name
+        self.token_passcode = token_passcode
+        self.logger = logger if logger else logging.getLogger(__name__)
+
+    def __str__(self):
+        return f"<{self.__doc__} URL={self.url} Username={self.username} Mode={self.mode}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __bool__(self):
+        return bool(self.username or self.token_name)
+
+    @property
+    def credentials(self):
+        """
+        等效的basic认证信息, 例如用于创建代理存储库
+        :return: tuple (用户名, 密码)
+        """
+        if self.mode == TOKEN:
+            return self.token_name, self.token_passcode
+        return self.username, self.password
+
+    @classmethod
+    def _reset(cls):
+        """
+        fork后的子进程不沿用父进程的会话及锁
+        :return: None
+        """
+        if cls._pid != os.getpid():
+            cls._pid = os.getpid()
+            cls._sessions = {}
+            cls._lock = threading.Lock()
+
+    @classmethod
+    def install(cls, stats: AuthStats):
+        """
+        在子进程中安装父进程的认证统计
+        :param stats: AuthStats类 父进程的NexusAuth.stats
+        :return: None
+        """
+        if stats is not None:
+            cls.stats = stats
+
+    def login(self):
+        """
+        登录并返回会话Cookie, 失败时返回None
+        :return: str or None
+        """
+        data = {"username": base64.b64encode(self.username.encode("utf-8")).decode(),
+                "password": base64.b64encode(self.password.encode("utf-8")).decode()}
+        try:
+            response = requests.post(
+                urljoin(self.url + "/", SESSION_API), data=data,
+                headers={"X-Nexus-UI": "true", "X-Requested-With": "XMLHttpRequest"})
+            cookie = response.cookies.get(SESSION_COOKIE)
+            if response.status_code < 300 and cookie:
+                NexusAuth.stats.add("logins")
+                self.logger.debug(f"已登录[{self.url}], 后续请求复用会话")
+                return cookie
+            msg = f"登录[{self.url}]失败, 状态码: {response.status_code}, 退回basic认证"
+        except requests.exceptions.RequestException as e:
+            msg = f"登录[{self.url}]失败: {e}, 退回basic认证"
+        NexusAuth.stats.add("fallbacks")
+        self.logger.warning(msg)
+        return None
+
+    def session(self, stale: str = None):
+        """
+        返回当前进程的会话Cookie, 多个线程同时请求时只登录一次
+        :param stale: str 已失效的Cookie, 与缓存一致时重新登录
+        :return: str or None
+        """
+        NexusAuth._reset()
+        key = (self.url, self.username)
+        with NexusAuth._lock:
+            if key in NexusAuth._sessions and (stale is None or NexusAuth._sessions[key] != stale):
+                return NexusAuth._sessions[key]
+            cookie = self.login()
+            NexusAuth._sessions[key] = cookie
+            return cookie
+
+    @staticmethod
+    def _apply_session(r: requests.PreparedRequest, cookie: str):
+        """
+        在请求中携带会话Cookie, 非只读请求同时携带防CSRF令牌
+        :param r: PreparedRequest 请求
+        :param cookie: str 会话Cookie
+        :return: None
+        """
+        cookies = [f"{SESSION_COOKIE}={cookie}"]
+        if r.method not in SAFE_METHODS:
+            csrf = secrets.token_hex(16)
+            cookies.append(f"{CSRF_TOKEN}={csrf}")
+            r.headers[CSRF_TOKEN] = csrf
+        existing = r.headers.get("Cookie")
+        r.headers["Cookie"] = "; ".join(([existing] if existing else []) + cookies)
+
+    def __call__(self, r: requests.PreparedRequest):
+        if self.mode == TOKEN:
+            r.headers["Authorization"] = _basic_auth_str(self.token_name, self.token_passcode)
+            return r
+        cookie = self.session() if self.mode == SESSION and self.username else None
+        if cookie is None:
+            if self.username:
+                r.headers["Authorization"] = _basic_auth_str(self.username, self.password)
+            return r
+        self._apply_session(r, cookie)
+        r.nexus_session = cookie
+        try:
+            r.nexus_position = r.body.tell()
+        except AttributeError:
+            r.nexus_position = None
+        r.register_hook("response", self._handle_401)
+        return r
+
+    def _handle_401(self, response: requests.Response, **kwargs):
+        """
+        会话失效时重新登录并重发请求一次
+        :param response: Response 响应
+        :param kwargs: dict 发送参数
+        :return: Response
+        """
+        request = response.request
+        if response.status_code != 401 or getattr(request, "nexus_retried", False):
+            return response
+        if request.nexus_position is not None:
+            request.body.seek(request.nexus_position)
+        elif request.body is not None and not isinstance(request.body, (bytes, str)):
+            # 流式请求体无法重发
+            return response
+        NexusAuth.stats.add("reauths")
+        self.logger.info(f"[{self.url}]会话已失效, 重新登录")
+        cookie = self.session(stale=request.nexus_session)
+        response.content
+        response.close()
+        prepared = request.copy()
+        prepared.headers.pop("Cookie", None)
+        prepared.headers.pop(CSRF_TOKEN, None)
+        if cookie is None:
+            prepared.headers["Authorization"] = _basic_auth_str(self.username, self.password)
+        else:
+            self._apply_session(prepared, cookie)
+        prepared.nexus_retried = True
+        retry = response.connection.send(prepared, **kwargs)
+        retry.history.append(response)
+        retry.request = prepared
+        return retry
+
+    @classmethod
+    def report(cls, logger: logging.Logger):
+        """
+        输出所有进程的认证统计
+        :param logger: logging.Logger类 日志记录器
+        :return: None
+        """
+        stats = cls.stats.values()
+        if any(stats.values()):
+            logger.info(f"认证: 登录 {stats['logins']}, 会话失效重新登录 {stats['reauths']}, "
+                        f"退回basic {stats['fallbacks']}")
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: bundle.py
+@time: 2026/10/19 5:20 下午
+"""
+
+__version__ = (0, 0, 2)
+__update_str__ = "写入时校验资源的sha1, 失败时截断当前分块"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from utils.classes import Nexus, Log
+from utils.limiter import parse_rate
+from utils.exceptions import BundleChecksumError
+
+INDEX_NAME = "index.jsonl.gz"
+DEFAULT_CHUNK_SIZE = "1G"
+
+
+class BundleWriter(object):
+    """离线包分块写入器, 每个线程独占一个"""
+
+    def __init__(self, directory: str, prefix: str, chunk_size: int):
+        """
+        初始化
+        :param directory: str 离线包目录
+        :param prefix: str 分块文件名前缀, 用于区分写入器
+        :param chunk_size: int 单个分块文件的大小上限, 超过后写入新的分块
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.sequence = -1
+        self.name = None
+        self._file = None
+
+    def __str__(self):
+        return f"<{self.__doc__} Chunk={self.name}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _rotate(self):
+        """
+        关闭当前分块并创建下一个
+        :return: None
+        """
+        self.close()
+        self.sequence += 1
+        self.name = f"chunk-{self.prefix}-{self.sequence:05d}.bin"
+        self._file = open(os.path.join(self.directory, self.name), "wb")
+
+    def write(self, asset: Nexus.Asset):
+        """
+        将资源分块写入当前分块文件, 同时计算sha1
+        与资源记录的sha1不一致或下载失败时, 截断已写入的部分并抛出异常
+        :param asset: Asset类
+        :return: list [路径, sha1, 大小, 分块文件名, 偏移量]
+        """
+        if self._file is None or self._file.tell() >= self.chunk_size:
+            self._rotate()
+        offset = self._file.tell()
+        sha1 = hashlib.sha1()
+        writer = self
+
+        class HashingWriter(object):
+            def write(self, data):
+                sha1.update(data)
+                return writer._file.write(data)
+
+        try:
+            size = asset.copy_to(HashingWriter())
+            expected = getattr(asset, "sha1", None)
+            if expected and sha1.hexdigest() != expected:
+                raise BundleChecksumError(
+                    f"{asset.path} 校验失败: 期望 {expected}, 实际 {sha1.hexdigest()}")
+        except Exception:
+            self._file.seek(offset)
+            self._file.truncate()
+            raise
+        self._file.flush()
+        return [asset.path, sha1.hexdigest(), size, self.name, offset]
+
+    def close(self):
+        """
+        关闭当前分块文件
+        :return: None
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Member(object):
+    """离线包成员, 按偏移量读取分块文件的一段"""
+
+    def __init__(self, path: str, fd: int, offset: int, size: int, sha1: str = None):
+        """
+        初始化
+        :param path: str 资源路径
+        :param fd: int 分块文件描述符
+        :param offset: int 在分块文件中的偏移量
+        :param size: int 大小
+        :param sha1: str 可选, 完整读取时校验的sha1
+        """
+        self.path = path
+        self.name = os.path.basename(path)
+        self.extension = self.name.split(".")[-1]
+        self.fd = fd
+        self.offset = offset
+        self.size = size
+        self.sha1 = sha1
+        self._position = 0
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path} Size={self.size}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def read(self, size: int = -1):
+        """
+        读取数据, 使用pread不改变共享的文件位置, 可被多个线程同时读取
+        :param size: int 字节数, -1为读取剩余全部
+        :return: bytes
+        """
+        remaining = self.size - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        start = self._position
+        data = os.pread(self.fd, size, self.offset + start)
+        self._position += len(data)
+        if self.sha1 and start == 0 and self._position == self.size \
+                and hashlib.sha1(data).hexdigest() != self.sha1:
+            raise BundleChecksumError(f"{self.path} 校验失败")
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET):
+        """
+        移动读取位置
+        :param offset: int 偏移量
+        :param whence: int 参考位置
+        :return: int 新的位置
+        """
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: self.size}
+        self._position = max(0, min(self.size, base[whence] + offset))
+        return self._position
+
+    def tell(self):
+        """
+        返回当前读取位置
+        :return: int
+        """
+        return self._position
+
+    def copy_to(self, fileobj, chunk_size: int = 1024 * 1024):
+        """
+        分块写入文件对象, 不在内存中保留完整内容
+        :param fileobj: 可写的文件对象
+        :param chunk_size: int 每次读取的字节数
+        :return: int 写入的字节数
+        """
+        sha1 = hashlib.sha1()
+        written = 0
+        while written < self.size:
+            data = os.pread(
+                self.fd, min(chunk_size, self.size - written), self.offset + written)
+            if not data:
+                break
+            sha1.update(data)
+            fileobj.write(data)
+            written += len(data)
+        if self.sha1 and sha1.hexdigest() != self.sha1:
+            raise BundleChecksumError(f"{self.path} 校验失败")
+        return written
+
+
+class Bundle(object):
+    """离线包"""
+
+    # 每个进程打开的分块文件描述符, 由所有线程共用
+    _handles = {}
+
+    def __init__(
+            self,
+            directory: str,
+            chunk_size=DEFAULT_CHUNK_SIZE,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param directory: str 离线包目录, 包含分块文件及索引
+        :param chunk_size: int or str 单个分块文件的大小上限, 支持K/M/G后缀
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.directory = directory
+        self.chunk_size = int(parse_rate(chunk_size))
+        self.logger = logger if logger else Log().logger
+        self.index_path = os.path.join(self.directory, INDEX_NAME)
+        self._local = threading.local()
+        self._writers = []
+        self._index = None
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"<{self.__doc__} Directory={self.directory}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __getstate__(self):
+        # 仅传递路径, 写入器及锁不跨进程
+        return {"directory": self.directory, "chunk_size": self.chunk_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"], state["chunk_size"])
+
+    def _writer(self):
+        """
+        返回当前线程的写入器
+        :return: BundleWriter类
+        """
+        writer = getattr(self._local, "writer", None)
+        if writer is None:
+            with self._lock:
+                prefix = f"{len(self._writers):03d}"
+                writer = BundleWriter(self.directory, prefix, self.chunk_size)
+                self._writers.append(writer)
+            self._local.writer = writer
+        return writer
+
+    def open(self):
+        """
+        创建离线包目录及索引, 用于导出
+        :return: self
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._index = gzip.open(self.index_path, "wt", encoding="utf-8")
+        return self
+
+    def add(self, component: Nexus.Component, excludes: list = None):
+        """
+        将组件的资源写入当前线程的分块文件, 并追加索引
+        :param component: Component类
+        :param excludes: list 排除的拓展名
+        :return: int 写入的字节数
+        """
+        excludes = excludes if excludes else []
+        writer = self._writer()
+        assets = [writer.write(asset) for asset in component.assets
+                  if asset.extension not in excludes]
+        entry = {"group": component.group, "name": component.name,
+                 "version": component.version, "assets": assets}
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._index.write(line + "\n")
+        return sum(asset[2] for asset in assets)
+
+    def close(self):
+        """
+        关闭所有分块文件及索引
+        :return: None
+        """
+        for writer in self._writers:
+            writer.close()
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def entries(self):
+        """
+        逐行读取索引, 不在内存中保留完整索引
+        :return: generator 组件条目字典
+        """
+        with gzip.open(self.index_path, "rt", encoding="utf-8") as index:
+            for line in index:
+                if line.strip():
+                    yield json.loads(line)
+
+    def members(self, entry: dict):
+        """
+        返回组件条目中的所有成员
+        :param entry: dict 由entries()返回的组件条目
+        :return: list Member类
+        """
+        members = []
+        for path, sha1, size, chunk, offset in entry["assets"]:
+            members.append(Member(path, self._fd(chunk), offset, size, sha1))
+        return members
+
+    def _fd(self, chunk: str):
+        """
+        返回分块文件的描述符, 每个进程每个分块只打开一次
+        :param chunk: str 分块文件名
+        :return: int
+        """
+        path = os.path.join(self.directory, chunk)
+        fd = self._handles.get(path)
+        if fd is None:
+            with self._lock:
+                fd = self._handles.get(path)
+                if fd is None:
+                    fd = os.open(path, os.O_RDONLY)
+                    self._handles[path] = fd
+        return fd
@@ -9,35 +9,66 @@
 @time: 2021/4/8 3:39 下午
 """
 
+import atexit
+import contextvars
+import hashlib
 import json
 import logging
+import mmap
+import multiprocessing
 import os
+import queue
 import re
+import signal
 import subprocess
 import tempfile
-from collections import Iterable
-from hashlib import md5
+import threading
+import time
+from collections import namedtuple
+from collections.abc import Iterable
+from datetime import datetime, timezone
 from logging import handlers
+from multiprocessing.pool import ThreadPool
 from urllib.parse import urljoin
 from xml.etree import ElementTree
 
 import requests
 
+from utils.auth import NexusAuth
+from utils.exceptions import AssetChecksumError
 from utils.exceptions import GetRepositoryInfoError
+from utils.exceptions import ManageRepositoryError
 from utils.exceptions import MavenClientDeployError
 from utils.exceptions import UploadComponentError
-
-__version__ = (0, 1, 7)
-__update_str__ = "增加日志记录器, 增加提取单个repo的方法"
+from utils.limiter import Limiter
+from utils.trace import span
+
+# 传递给子进程的精简记录, 不包含认证信息及日志记录器
+ComponentRecord = namedtuple(
+    "ComponentRecord",
+    ["id", "repository", "format", "group", "name", "version", "assets"])
+AssetRecord = namedtuple(
+    "AssetRecord",
+    ["id", "path", "repository", "format", "download_url", "checksum",
+     "size", "last_modified"])
+
+__version__ = (0, 1, 31)
+__update_str__ = "分段下载的线程继承组件的trace采样结果"
 __version_str__ = "当前版本:" + \
                   ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
 
+# 文件摘要: 小于DIGEST_CHUNK的文件一次读取, 更大的文件内存映射后按DIGEST_WINDOW计算
+DIGEST_CHUNK = 1024 * 1024
+DIGEST_WINDOW = 8 * 1024 * 1024
+
 
 class Nexus(object):
     """Nexus类"""
     BASE_URL = "service/rest/"
     HEADERS = {"accept": "application/json"}
     REPOSITORIES_API = "v1/repositories"
+    # API地址 -> 认证信息, 由进程池初始化函数传入子进程
+    _credentials = {}
 
     def __init__(
             self,
@@ -46,7 +77,8 @@ class Nexus(object):
             protocol: str = "http",
             username: str = None,
             password: str = None,
-            logger: logging.Logger = None):
+            logger: logging.Logger = None,
+            **kwargs):
         """
         初始化
         :param address: str 域名或IP
@@ -55,6 +87,13 @@ class Nexus(object):
         :param username: str 用户名
         :param password: str 密码
         :param logger: logging.Logger类 日志记录器
+        :param kwargs: dict 接受其他参数:
+         - bytes_per_second: str 每秒传输字节数上限, 支持K/M/G后缀
+         - requests_per_second: str 每秒请求数上限
+         - concurrent_uploads: str 同时上传数上限
+         - auth_mode: str 认证方式, basic(默认) / session / token
+         - token_name: str 用户令牌名称, token方式使用
+         - token_passcode: str 用户令牌密码, token方式使用
         """
         self.address = address
         self.port = port
@@ -65,8 +104,20 @@ class Nexus(object):
             self.BASE_URL)
         self.username = username
         self.password = password
-        self.auth = (self.username, self.password)
         self.logger = logger if logger else Log().logger
+        self.auth = NexusAuth(
+            self.url, self.username, self.password,
+            mode=kwargs.get("auth_mode"),
+            token_name=kwargs.get("token_name"),
+            token_passcode=kwargs.get("token_passcode"),
+            logger=self.logger)
+        Nexus._credentials[self.api_url] = self.auth
+        self.limiter = Limiter(
+            bytes_per_second=kwargs.get("bytes_per_second"),
+            requests_per_second=kwargs.get("requests_per_second"),
+            concurrent_uploads=kwargs.get("concurrent_uploads"))
+        if self.limiter.enabled:
+            Limiter.register(self.api_url, self.limiter)
         self._repositories = []
 
     def __str__(self):
@@ -75,6 +126,23 @@ class Nexus(object):
     def __repr__(self):
         return self.__str__()
 
+    @classmethod
+    def credentials(cls):
+        """
+        返回已创建实例的认证信息, 用于传递给进程池初始化函数
+        :return: dict
+        """
+        return dict(cls._credentials)
+
+    @classmethod
+    def install(cls, credentials: dict):
+        """
+        在子进程中安装父进程的认证信息
+        :param credentials: dict 由credentials()返回的字典
+        :return: None
+        """
+        cls._credentials.update(credentials)
+
     @property
     def repositories(self):
         """
@@ -91,6 +159,7 @@ class Nexus(object):
         :return: list
         """
         url = urljoin(self.api_url, self.REPOSITORIES_API)
+        self.limiter.request()
         response = requests.get(url, auth=self.auth, headers=self.HEADERS)
         j = json.loads(response.content.decode("utf-8"))
         repositories = []
@@ -120,6 +189,7 @@ class Nexus(object):
 
         MANAGEMENT_API = "v1/repositories/{format}/{type}/{repository}"
         COMPONENTS_API = "v1/components"
+        SEARCH_API = "v1/search"
         REPOSITORIES_KEY = "repository"
 
         def __init__(
@@ -128,7 +198,7 @@ class Nexus(object):
                 format: str,
                 type: str,
                 api_url: str,
-                auth: tuple = None,
+                auth: NexusAuth = None,
                 logger: logging.Logger = None,
                 **kwargs):
             """
@@ -137,7 +207,7 @@ class Nexus(object):
             :param format: str 存储库格式
             :param type: str 存储库类型
             :param api_url: str API请求地址
-            :param auth: tuple 源数据认证信息
+            :param auth: NexusAuth类 源数据认证信息
             :param logger: logging.Logger 日志记录器
             :param kwargs: dict 接受其他参数:
              - headers: dict 请求头字典
@@ -177,6 +247,7 @@ class Nexus(object):
             )
             # 拼接管理API请求地址
             self.manage_api_url = urljoin(self.api_url, manage_api)
+            Limiter.get(self.api_url).request()
             response = requests.get(
                 self.manage_api_url,
                 auth=self.auth,
@@ -192,6 +263,17 @@ class Nexus(object):
                 raise GetRepositoryInfoError(response.status_code)
             return json.loads(content)
 
+        def _lookup(self, *keys):
+            """
+            优先从初始化参数中获取值, 缺失时才请求信息接口
+            :param keys: str 候选键名, 最后一个为信息接口中的键名
+            :return: object
+            """
+            for key in keys:
+                if key in self.kwargs:
+                    return self.kwargs[key]
+            return self.info.get(keys[-1])
+
         @property
         def info(self):
             """
@@ -208,7 +290,7 @@ class Nexus(object):
             返回当前存储库连接地址
             :return: str
             """
-            return self.kwargs.get("url", self.info.get("url"))
+            return self._lookup("url")
 
         @property
         def online(self):
@@ -340,6 +422,55 @@ class Nexus(object):
                 self.api_url, self.name, auth=self.auth, headers=self.headers)
             return iterator
 
+        def search(self, **params):
+            """
+            通过搜索接口获取部件获取器的迭代器, 由Nexus在服务端过滤
+            :param params: 搜索参数, 例如 group, name, version, maven.baseVersion
+            :return: Iterable()
+            """
+            iterator = Nexus.IteratorComponentGetter(
+                self.api_url, self.name, auth=self.auth, headers=self.headers,
+                params=params)
+            return iterator
+
+        def component(self, id: str):
+            """
+            按ID获取组件, 信息在首次访问时请求
+            :param id: str 组件ID
+            :return: Component类
+            """
+            return Nexus.Component(
+                id, self.api_url, auth=self.auth, headers=self.headers,
+                logger=self.logger)
+
+        def find_components(self, group: str, name: str, version: str):
+            """
+            按GAV精确查找组件
+            :param group: str 组ID
+            :param name: str 名称
+            :param version: str 版本
+            :return: list Component类
+            """
+            components = []
+            for getter in self.search(group=group, name=name, version=version):
+                components.extend(
+                    c for c in getter.components
+                    if (c.group, c.name, c.version) == (group, name, version))
+            return components
+
+        def delete_component(self, id: str):
+            """
+            删除组件
+            :param id: str 组件ID
+            :return: None
+            """
+            url = urljoin(self.api_url, Nexus.Component.COMPONENT_API.format(id=id))
+            Limiter.get(self.api_url).request()
+            response = requests.delete(url, auth=self.auth)
+            if response.status_code not in [200, 204, 404]:
+                self.logger.error(response.content.decode("utf-8"))
+                raise ManageRepositoryError(response.status_code)
+
         def upload_component(self, files: dict):
             """
             上传组件方法
@@ -348,8 +479,13 @@ class Nexus(object):
             """
             url = urljoin(self.api_url, self.COMPONENTS_API)
             params = {self.REPOSITORIES_KEY: self.name}
-            response = requests.post(
-                url, params=params, files=files, auth=self.auth)
+            limiter = Limiter.get(self.api_url)
+            size = self._payload_size(files)
+            with limiter.upload(), span("upload", "upload", repository=self.name, size=size):
+                limiter.request()
+                limiter.transfer(size)
+                response = requests.post(
+                    url, params=params, files=files, auth=self.auth)
             if response.status_code not in [200, 204]:
                 self.logger.error("*" * 50)
                 self.logger.error(response.content.decode("utf-8"))
@@ -357,6 +493,23 @@ class Nexus(object):
                 self.logger.error("*" * 50)
                 raise UploadComponentError(response.status_code)
 
+        @staticmethod
+        def _payload_size(files: dict):
+            """
+            计算上传数据的大小
+            :param files: dict 上传的数据
+            :return: int
+            """
+            size = 0
+            for _, data in files.values():
+                if isinstance(data, (bytes, str)):
+                    size += len(data)
+                elif hasattr(data, "seek"):
+                    position = data.tell()
+                    size += data.seek(0, os.SEEK_END) - position
+                    data.seek(position)
+            return size
+
     class IteratorComponentGetter(object):
         """部件获取器迭代器"""
 
@@ -364,22 +517,25 @@ class Nexus(object):
                 self,
                 api_url: str,
                 repository: str,
-                auth: tuple = None,
+                auth: NexusAuth = None,
                 headers: dict = None,
-                logger: logging.Logger = None):
+                logger: logging.Logger = None,
+                params: dict = None):
             """
             初始化
             :param api_url: str API请求地址
             :param repository: str 存储库名称
-            :param auth: tuple 认证信息
+            :param auth: NexusAuth类 认证信息
             :param headers: dict 请求头字典
             :param logger: logging.Logger 日志记录器
+            :param params: dict 可选, 搜索参数, 提供时使用搜索接口
             """
             self.api_url = api_url
             self.repository = repository
             self.auth = auth
             self.headers = headers if headers else Nexus.HEADERS
             self.logger = logger if logger else Log().logger
+            self.params = params
             self.token = None
             self._started = False
 
@@ -412,7 +568,8 @@ class Nexus(object):
                 auth=self.auth,
                 token=self.token,
                 headers=self.headers,
-                logger=self.logger)
+                logger=self.logger,
+                params=self.params)
             self.token = getter.continue_token
             return getter
 
@@ -425,23 +582,27 @@ class Nexus(object):
                 self,
                 api_url: str,
                 repository: str,
-                auth: tuple = None,
+                auth: NexusAuth = None,
                 token: str = None,
                 headers: dict = None,
-                logger: logging.Logger = None):
+                logger: logging.Logger = None,
+                params: dict = None):
             """
             初始化
             :param api_url: str API请求地址
             :param repository: str 存储库名称
-            :param auth: tuple 认证信息
+            :param auth: NexusAuth类 认证信息
             :param token: str 迭代器父token
             :param headers: dict 请求头字典
             :param logger: logging.Logger 日志记录器
+            :param params: dict 可选, 搜索参数, 提供时使用搜索接口
             """
             self.COMPONENTS_API = Nexus.Repository.COMPONENTS_API
+            self.SEARCH_API = Nexus.Repository.SEARCH_API
             self.REPOSITORIES_KEY = Nexus.Repository.REPOSITORIES_KEY
             self.api_url = api_url
-            self.url = urljoin(self.api_url, self.COMPONENTS_API)
+            self.url = urljoin(
+                self.api_url, self.SEARCH_API if params else self.COMPONENTS_API)
             self.repository = repository
             self.auth = auth
             self.token = token
@@ -449,12 +610,14 @@ class Nexus(object):
             self.logger = logger if logger else Log().logger
             kwargs = {
                 "headers": self.headers, "params": {
-                    self.REPOSITORIES_KEY: self.repository}}
+                    **(params or {}), self.REPOSITORIES_KEY: self.repository}}
             if self.auth:
                 kwargs["auth"] = self.auth
             if self.token:
                 kwargs["params"][self.TOKEN_KEY] = self.token
-            response = requests.get(self.url, **kwargs)
+            with span("list page", "list", repository=self.repository):
+                Limiter.get(self.api_url).request()
+                response = requests.get(self.url, **kwargs)
             j = json.loads(response.content.decode("utf8"))
             self._items = j["items"]
             self.continue_token = j[self.TOKEN_KEY]
@@ -496,19 +659,23 @@ class Nexus(object):
         """部件类"""
 
         COMPONENT_API = "v1/components/{id}"
+        # 同一组件内同时下载的资源数
+        PARALLEL_ASSETS = 4
+        __slots__ = ("id", "api_url", "auth", "logger",
+                     "kwargs", "headers", "_info", "_directory", "_assets_cache")
 
         def __init__(
                 self,
                 id: str,
                 api_url: str,
-                auth: tuple = None,
+                auth: NexusAuth = None,
                 logger: logging.Logger = None,
                 **kwargs):
             """
             初始化
             :param id: str 当前组件id
             :param api_url: str API请求地址
-            :param auth: tuple 源地址认证信息
+            :param auth: NexusAuth类 源地址认证信息
             :param logger: logging.Logger类 日志记录器
             :param kwargs: 允许传入其他信息:
              - headers: dict 请求头字典
@@ -521,15 +688,83 @@ class Nexus(object):
             self.id = id
             self.api_url = api_url
             self.auth = auth
-            self.info_api_url = urljoin(
-                self.api_url,
-                self.COMPONENT_API.format(
-                    id=self.id))
             self.logger = logger if logger else Log().logger
             self.kwargs = kwargs
             self.headers = self.kwargs.get("headers", Nexus.HEADERS)
             self._info = None
             self._directory = None
+            self._assets_cache = None
+
+        def __reduce__(self):
+            """
+            序列化时仅保留精简记录(普通元组, 字段顺序同ComponentRecord), 认证信息由子进程按API地址查找
+            :return: tuple
+            """
+            return _restore_component, (self.api_url, self._state())
+
+        @classmethod
+        def from_record(
+                cls,
+                api_url: str,
+                record: ComponentRecord,
+                auth: NexusAuth = None,
+                logger: logging.Logger = None):
+            """
+            由精简记录创建组件
+            :param api_url: str API请求地址
+            :param record: ComponentRecord 精简记录, 也可以是字段顺序相同的元组
+            :param auth: NexusAuth类 认证信息, 默认按API地址查找
+            :param logger: logging.Logger类 日志记录器
+            :return: Component类
+            """
+            id, repository, fmt, group, name, version, assets = record
+            kwargs = {"group": group, "name": name, "version": version, "assets": assets}
+            if repository is not None:
+                kwargs["repository"] = repository
+            if fmt is not None:
+                kwargs["format"] = fmt
+            return cls(
+                id, api_url, auth=auth if auth else Nexus._credentials.get(api_url),
+                logger=logger, **kwargs)
+
+        def _state(self):
+            """
+            返回精简记录的普通元组形式, 序列化时不构造namedtuple
+            :return: tuple
+            """
+            kwargs = self.kwargs
+            if self._assets_cache is not None:
+                assets = tuple(asset._state() for asset in self._assets_cache)
+            else:
+                # 直接由列表数据转换, 避免创建资源实例
+                assets = tuple(
+                    d if isinstance(d, tuple) else (
+                        d["id"],
+                        d.get("path"),
+                        d.get("repository"),
+                        d.get("format"),
+                        d.get("download_url") or d.get("downloadUrl"),
+                        d.get("checksum"),
+                        d.get("fileSize"),
+                        d.get("lastModified"))
+                    for d in self._assets)
+            return (
+                self.id,
+                kwargs.get("repository"),
+                kwargs.get("format"),
+                kwargs["group"] if "group" in kwargs else self.group,
+                kwargs["name"] if "name" in kwargs else self.name,
+                kwargs["version"] if "version" in kwargs else self.version,
+                assets)
+
+        @property
+        def record(self):
+            """
+            返回当前组件的精简记录
+            :return: ComponentRecord
+            """
+            state = self._state()
+            return ComponentRecord(*state[:-1], tuple(AssetRecord._make(a) for a in state[-1]))
 
         def __str__(self):
             """显示当前类信息"""
@@ -547,18 +782,39 @@ class Nexus(object):
         def __repr__(self):
             return self.__str__()
 
+        @property
+        def info_api_url(self):
+            """
+            返回当前组件的信息接口地址
+            :return: str
+            """
+            return urljoin(self.api_url, self.COMPONENT_API.format(id=self.id))
+
         def _get_info(self):
             """
             获取当前组件信息方法
             :return: dict 信息字典
             """
             # 拼接管理API请求地址
-            response = requests.get(
-                self.info_api_url,
-                auth=self.auth,
-                headers=self.headers)
+            with span("info", "info", id=self.id):
+                Limiter.get(self.api_url).request()
+                response = requests.get(
+                    self.info_api_url,
+                    auth=self.auth,
+                    headers=self.headers)
             return json.loads(response.content.decode("utf-8"))
 
+        def _lookup(self, *keys):
+            """
+            优先从初始化参数中获取值, 缺失时才请求信息接口
+            :param keys: str 候选键名, 最后一个为信息接口中的键名
+            :return: object
+            """
+            for key in keys:
+                if key in self.kwargs:
+                    return self.kwargs[key]
+            return self.info[keys[-1]]
+
         @property
         def info(self):
             """
@@ -575,7 +831,7 @@ class Nexus(object):
             返回当前组件的存储库名称
             :return: str
             """
-            return self.kwargs.get("repository", self.info["repository"])
+            return self._lookup("repository")
 
         @property
         def name(self):
@@ -583,7 +839,7 @@ class Nexus(object):
             返回当前组件的名称
             :return: str
             """
-            return self.kwargs.get("name", self.info["name"])
+            return self._lookup("name")
 
         @property
         def format(self):
@@ -591,7 +847,7 @@ class Nexus(object):
             返回当前组件的格式
             :return: str
             """
-            return self.kwargs.get("format", self.info["format"])
+            return self._lookup("format")
 
         @property
         def group(self):
@@ -599,7 +855,7 @@ class Nexus(object):
             返回当前组件的组信息
             :return: str
             """
-            return self.kwargs.get("group", self.info["group"])
+            return self._lookup("group")
 
         @property
         def version(self):
@@ -607,7 +863,7 @@ class Nexus(object):
             返回当前组件的版本信息
             :return: str
             """
-            return self.kwargs.get("version", self.info["version"])
+            return self._lookup("version")
 
         @property
         def _assets(self):
@@ -615,20 +871,43 @@ class Nexus(object):
             返回当前组件的资源列表
             :return: list
             """
-            return self.kwargs.get("assets", self.info["assets"])
+            return self._lookup("assets")
 
         @property
         def assets(self):
             """
-            返回当前部件的所有资源
+            返回当前部件的所有资源, 仅在首次访问时创建
             :return: list
             """
-            assets = []
-            for d in self._assets:
-                d["api_url"] = self.api_url
-                d["auth"] = self.auth
-                assets.append(Nexus.Asset(**d))
-            return assets
+            if self._assets_cache is None:
+                assets = []
+                for d in self._assets:
+                    if isinstance(d, tuple):
+                        assets.append(Nexus.Asset.from_record(
+                            self.api_url, d, self.auth, self.logger))
+                    else:
+                        assets.append(Nexus.Asset(
+                            **d, api_url=self.api_url, auth=self.auth, logger=self.logger))
+                self._assets_cache = assets
+            return self._assets_cache
+
+        @property
+        def size(self):
+            """
+            返回当前部件所有资源的总大小 (列表接口未返回大小时为0)
+            :return: int
+            """
+            return sum(asset.size or 0 for asset in self.assets)
+
+        @property
+        def last_modified(self):
+            """
+            返回当前部件资源的最后修改时间
+            :return: datetime or None
+            """
+            times = [asset.last_modified for asset in self.assets]
+            times = [t for t in times if t]
+            return max(times) if times else None
 
         @property
         def directory(self):
@@ -655,31 +934,40 @@ class Nexus(object):
             d = os.path.join(self._directory, self.name)
             if not os.path.exists(d):
                 os.makedirs(d, exist_ok=True)
-            files = []
-            for asset in self.assets:
-                # 排除自动生成文件
-                if asset.extension in exclude:
-                    continue
-                files.append(asset.download(d))
-            return files
+            # 排除自动生成文件
+            assets = [asset for asset in self.assets
+                      if asset.extension not in exclude]
+            if not assets:
+                return []
+            # 同一组件的资源并发下载
+            with ThreadPool(min(len(assets), self.PARALLEL_ASSETS)) as pool:
+                return pool.map(lambda asset: asset.download(d), assets)
 
     class Asset(object):
         """资源类"""
 
         ASSET_API = "v1/assets/{id}"
+        CHUNK_SIZE = 64 * 1024
+        # 超过该大小的资源拆分为多个Range请求并发下载
+        RANGE_THRESHOLD = 16 * 1024 * 1024
+        RANGE_PARTS = 4
+        # 下载中断后续传的次数
+        RETRIES = 3
+        __slots__ = ("id", "api_url", "auth", "logger",
+                     "kwargs", "headers", "_info")
 
         def __init__(
                 self,
                 id: str,
                 api_url: str,
-                auth: tuple = None,
+                auth: NexusAuth = None,
                 logger: logging.Logger = None,
                 **kwargs):
             """
             初始化资源类
             :param id: str 资源ID
             :param api_url: str API请求地址
-            :param auth: str 源地址认证信息
+            :param auth: NexusAuth类 源地址认证信息
             :param logger: logging.Logger类 日志记录器
             :param kwargs: dict 允许传入其他信息
              - path: str 资源路径
@@ -690,15 +978,68 @@ class Nexus(object):
             self.id = id
             self.api_url = api_url
             self.auth = auth
-            self.info_api_url = urljoin(
-                self.api_url,
-                self.ASSET_API.format(
-                    id=self.id))
             self.logger = logger if logger else Log().logger
             self.kwargs = kwargs
             self.headers = self.kwargs.get("headers", Nexus.HEADERS)
             self._info = None
 
+        def __reduce__(self):
+            """
+            序列化时仅保留精简记录(普通元组, 字段顺序同AssetRecord), 认证信息由子进程按API地址查找
+            :return: tuple
+            """
+            return _restore_asset, (self.api_url, self._state())
+
+        @classmethod
+        def from_record(
+                cls,
+                api_url: str,
+                record: AssetRecord,
+                auth: NexusAuth = None,
+                logger: logging.Logger = None):
+            """
+            由精简记录创建资源
+            :param api_url: str API请求地址
+            :param record: AssetRecord 精简记录, 也可以是字段顺序相同的元组
+            :param auth: NexusAuth类 认证信息, 默认按API地址查找
+            :param logger: logging.Logger类 日志记录器
+            :return: Asset类
+            """
+            id, path, repository, fmt, download_url, checksum, size, last_modified = record
+            kwargs = {}
+            for key, value in (("path", path), ("repository", repository), ("format", fmt),
+                               ("download_url", download_url), ("checksum", checksum),
+                               ("fileSize", size), ("lastModified", last_modified)):
+                if value is not None:
+                    kwargs[key] = value
+            return cls(
+                id, api_url, auth=auth if auth else Nexus._credentials.get(api_url),
+                logger=logger, **kwargs)
+
+        def _state(self):
+            """
+            返回精简记录的普通元组形式, 序列化时不构造namedtuple
+            :return: tuple
+            """
+            kwargs = self.kwargs
+            return (
+                self.id,
+                self.path,
+                kwargs.get("repository"),
+                kwargs.get("format"),
+                self.download_url,
+                kwargs.get("checksum"),
+                self.size,
+                kwargs.get("lastModified"))
+
+        @property
+        def record(self):
+            """
+            返回当前资源的精简记录
+            :return: AssetRecord
+            """
+            return AssetRecord._make(self._state())
+
         def __str__(self):
             """显示当前类信息"""
             info = "<" \
@@ -714,18 +1055,39 @@ class Nexus(object):
         def __repr__(self):
             return self.__str__()
 
+        @property
+        def info_api_url(self):
+            """
+            返回当前资源的信息接口地址
+            :return: str
+            """
+            return urljoin(self.api_url, self.ASSET_API.format(id=self.id))
+
         def _get_info(self):
             """
             获取当前资源信息方法
             :return: dict 信息字典
             """
             # 拼接管理API请求地址
-            response = requests.get(
-                self.info_api_url,
-                auth=self.auth,
-                headers=self.headers)
+            with span("info", "info", id=self.id):
+                Limiter.get(self.api_url).request()
+                response = requests.get(
+                    self.info_api_url,
+                    auth=self.auth,
+                    headers=self.headers)
             return json.loads(response.content.decode("utf-8"))
 
+        def _lookup(self, *keys):
+            """
+            优先从初始化参数中获取值, 缺失时才请求信息接口
+            :param keys: str 候选键名, 最后一个为信息接口中的键名
+            :return: object
+            """
+            for key in keys:
+                if key in self.kwargs:
+                    return self.kwargs[key]
+            return self.info[keys[-1]]
+
         @property
         def info(self):
             """
@@ -742,7 +1104,7 @@ class Nexus(object):
             返回当前资源的路径
             :return: str
             """
-            return self.kwargs.get("path", self.info["path"])
+            return self._lookup("path")
 
         @property
         def name(self):
@@ -766,8 +1128,7 @@ class Nexus(object):
             返回当前资源的下载URL
             :return: str
             """
-            return self.kwargs.get(
-                "download_url", self.info["downloadUrl"])
+            return self._lookup("download_url", "downloadUrl")
 
         @property
         def repository(self):
@@ -775,8 +1136,7 @@ class Nexus(object):
             返回当前资源的存储库名称
             :return: str
             """
-            return self.kwargs.get(
-                "repository", self.info["repository"])
+            return self._lookup("repository")
 
         @property
         def format(self):
@@ -784,7 +1144,7 @@ class Nexus(object):
             返回当前组件的格式
             :return: str
             """
-            return self.kwargs.get("format", self.info["format"])
+            return self._lookup("format")
 
         @property
         def checksum(self):
@@ -792,7 +1152,7 @@ class Nexus(object):
             返回当前资源的校验信息
             :return: str
             """
-            return self.kwargs.get("checksum", self.info["checksum"])
+            return self._lookup("checksum")
 
         @property
         def md5(self):
@@ -826,36 +1186,254 @@ class Nexus(object):
             """
             return self.checksum.get("sha512")
 
+        @property
+        def size(self):
+            """
+            返回当前资源的大小 (列表接口未返回大小时为None)
+            :return: int or None
+            """
+            return self.kwargs.get("fileSize")
+
+        @property
+        def last_modified(self):
+            """
+            返回当前资源的最后修改时间
+            :return: datetime or None
+            """
+            return self.parse_time(self.kwargs.get("lastModified"))
+
+        @staticmethod
+        def parse_time(value: str):
+            """
+            解析Nexus返回的ISO时间字符串
+            :param value: str 例如 2021-04-01T10:10:10.123+00:00
+            :return: datetime or None
+            """
+            if not value:
+                return None
+            try:
+                parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                return None
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed
+
         @property
         def stream(self):
             """
             获取当前资源的字节流
             :return: bytes
             """
-            return requests.get(
-                self.download_url,
-                auth=self.auth,
-                stream=True).content
+            with span("download", "download", path=self.path):
+                limiter = Limiter.get(self.download_url)
+                limiter.request()
+                response = requests.get(
+                    self.download_url,
+                    auth=self.auth,
+                    stream=True)
+                chunks = []
+                for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    limiter.transfer(len(chunk))
+                    chunks.append(chunk)
+            return b"".join(chunks)
+
+        def copy_to(self, fileobj):
+            """
+            将当前资源分块写入文件对象, 不在内存中保留完整内容
+            :param fileobj: 可写的文件对象
+            :return: int 写入的字节数
+            """
+            with span("download", "download", path=self.path):
+                limiter = Limiter.get(self.download_url)
+                limiter.request()
+                written = 0
+                with requests.get(
+                        self.download_url,
+                        auth=self.auth,
+                        stream=True) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        limiter.transfer(len(chunk))
+                        fileobj.write(chunk)
+                        written += len(chunk)
+            return written
 
-        def download(self, directory: str = os.getcwd()):
+        def download(self, directory: str = os.getcwd(), parts: int = None):
             """
             下载当前资源到指定目录
+            先写入.part文件, 中断后从已写入的位置续传, 校验通过后才重命名为目标文件
             :param directory: str 下载目录
+            :param parts: int 大文件分段数, 默认为RANGE_PARTS, 1为不分段
             :return: str 文件路径
             """
+            parts = parts if parts else self.RANGE_PARTS
             file = File(os.path.join(directory, self.name))
             # 如果文件已存在, 则检查md5, 不一致才需要下载
             if file.exists:
                 if self.md5 == file.md5():
                     return file.path
-            with open(file.path, "wb") as f:
-                f.write(self.stream)
+            partial = f"{file.path}.part"
+            with span("download", "download", path=self.path, size=self.size):
+                for attempt in range(1, self.RETRIES + 1):
+                    try:
+                        if self.size and self.size >= self.RANGE_THRESHOLD and parts > 1:
+                            self._download_ranges(partial, parts)
+                        else:
+                            self._download_resume(partial)
+                        break
+                    except requests.exceptions.RequestException as e:
+                        if attempt == self.RETRIES:
+                            raise
+                        self.logger.warning(f"下载[{self.name}]中断, 第{attempt}次续传: {e}")
+                self._verify(partial)
+            os.replace(partial, file.path)
             return file.path
 
+        def _get_range(self, start: int, end: int = None):
+            """
+            发起Range请求
+            :param start: int 起始字节
+            :param end: int 结束字节(包含), None为直到末尾
+            :return: requests.Response
+            """
+            Limiter.get(self.download_url).request()
+            headers = {"Range": f"bytes={start}-{'' if end is None else end}"}
+            return requests.get(
+                self.download_url, auth=self.auth, headers=headers, stream=True)
+
+        def _download_resume(self, partial: str):
+            """
+            单连接下载, 已存在部分文件时从其末尾续传
+            :param partial: str 部分文件路径
+            :return: None
+            """
+            limiter = Limiter.get(self.download_url)
+            offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+            response = self._get_range(offset)
+            if response.status_code == 416:
+                # 已下载完整
+                response.close()
+                return
+            response.raise_for_status()
+            # 服务端不支持Range时从头写入
+            mode = "ab" if response.status_code == 206 else "wb"
+            with open(partial, mode) as f, response:
+                for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    limiter.transfer(len(chunk))
+                    f.write(chunk)
+
+        def _download_ranges(self, partial: str, parts: int):
+            """
+            将资源拆分为多个Range请求并发下载, 按偏移量写入预分配的文件
+            各分段的进度记录在.json文件中, 中断后从各分段已写入的位置续传
+            服务端(或中间代理)未返回206时停止所有分段, 删除预分配的文件后回退为单连接下载
+            :param partial: str 部分文件路径
+            :param parts: int 分段数
+            :return: None
+            """
+            size = self.size
+            state_path = f"{partial}.json"
+            step = -(-size // parts)
+            ranges = [(start, min(start + step, size) - 1)
+                      for start in range(0, size, step)]
+            progress = {}
+            if os.path.exists(partial) and os.path.exists(state_path):
+                with open(state_path, "r") as f:
+                    progress = {int(k): v for k, v in json.load(f).items()}
+            else:
+                with open(partial, "wb") as f:
+                    f.truncate(size)
+            lock = threading.Lock()
+            written = [0]
+            unsupported = threading.Event()
+            limiter = Limiter.get(self.download_url)
+            fd = os.open(partial, os.O_WRONLY)
+
+            def save():
+                with open(state_path, "w") as f:
+                    json.dump(progress, f)
+
+            def fetch(item):
+                start, end = item
+                position = start + progress.get(start, 0)
+                if position > end or unsupported.is_set():
+                    return
+                response = self._get_range(position, end)
+                with response, span("range", "download", path=self.path, start=position, end=end):
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        unsupported.set()
+                        return
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        if unsupported.is_set():
+                            return
+                        limiter.transfer(len(chunk))
+                        os.pwrite(fd, chunk, position)
+                        position += len(chunk)
+                        with lock:
+                            progress[start] = position - start
+                            # 定期记录进度, 进程被终止后仍可续传
+                            written[0] += len(chunk)
+                            if written[0] >= self.RANGE_THRESHOLD // parts:
+                                written[0] = 0
+                                save()
+            # 各分段在组件的上下文中执行, 继承trace采样结果
+            context = contextvars.copy_context()
+            try:
+                with ThreadPool(len(ranges)) as pool:
+                    pool.map(lambda item: context.copy().run(fetch, item), ranges)
+            finally:
+                os.close(fd)
+                with lock:
+                    save()
+            os.remove(state_path)
+            if unsupported.is_set():
+                self.logger.warning(f"下载[{self.name}]时服务端不支持Range请求, 回退为单连接下载")
+                os.remove(partial)
+                self._download_resume(partial)
+
+        def _verify(self, path: str):
+            """
+            校验下载的文件, 不一致时删除文件, 下次从头下载
+            :param path: str 文件路径
+            :return: None
+            """
+            checksum = self.kwargs.get("checksum") or {}
+            for algorithm in ["sha1", "md5"]:
+                if checksum.get(algorithm):
+                    if File(path).digest(algorithm) != checksum[algorithm]:
+                        os.remove(path)
+                        raise AssetChecksumError(f"{self.name} {algorithm}校验失败")
+                    return
+
+
+def _restore_component(api_url: str, state: tuple):
+    """
+    反序列化组件, 由Component.__reduce__使用
+    :param api_url: str API请求地址
+    :param state: tuple 精简记录的普通元组形式
+    :return: Nexus.Component类
+    """
+    return Nexus.Component.from_record(api_url, state)
+
+
+def _restore_asset(api_url: str, state: tuple):
+    """
+    反序列化资源, 由Asset.__reduce__使用
+    :param api_url: str API请求地址
+    :param state: tuple 精简记录的普通元组形式
+    :return: Nexus.Asset类
+    """
+    return Nexus.Asset.from_record(api_url, state)
+
 
 class File(object):
     """文件类"""
 
+    # 启用混合执行器时由Offloader.install安装, 摘要在CPU进程池中计算
+    offloader = None
+
     def __init__(self, path: str):
         """
         初始化
@@ -879,26 +1457,58 @@ class File(object):
         """
         return os.path.exists(self.path)
 
-    def md5(self, chunk: int = 4096):
+    def digests(self, algorithms: Iterable = ("md5",), chunk: int = DIGEST_CHUNK):
+        """
+        读取一次文件, 同时计算多种摘要
+        大文件使用内存映射, 按窗口交给摘要算法, 计算时释放GIL, 可由多个线程并行
+        :param algorithms: Iterable 摘要算法, 例如 md5, sha1
+        :param chunk: int 分块大小, 不小于该大小的文件使用内存映射
+        :return: dict {算法: 摘要值}
+        """
+        if File.offloader is not None:
+            return File.offloader.digests(self.path, algorithms)
+        hashes = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= chunk:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, \
+                        memoryview(m) as view:
+                    for start in range(0, size, DIGEST_WINDOW):
+                        window = view[start:start + DIGEST_WINDOW]
+                        for _hash in hashes.values():
+                            _hash.update(window)
+                        window.release()
+            else:
+                data = f.read()
+                for _hash in hashes.values():
+                    _hash.update(data)
+        return {algorithm: _hash.hexdigest() for algorithm, _hash in hashes.items()}
+
+    def digest(self, algorithm: str = "md5", chunk: int = DIGEST_CHUNK):
+        """
+        获取文件摘要
+        :param algorithm: str 摘要算法, 例如 md5, sha1
+        :param chunk: int 分块大小, 参考digests
+        :return: str 摘要值
+        """
+        return self.digests((algorithm,), chunk)[algorithm]
+
+    def md5(self, chunk: int = DIGEST_CHUNK):
         """
         获取文件md5值
-        :param chunk: int 分块大小
+        :param chunk: int 分块大小, 参考digests
         :return: str md5值
         """
-        _md5 = md5()
-        with open(self.path, "rb") as f:
-            for chk in iter(lambda: f.read(chunk), b""):
-                _md5.update(chk)
-        return _md5.hexdigest()
+        return self.digest("md5", chunk)
 
 
 class POM(object):
     """POM类"""
 
-    def __init__(self, path: str):
+    def __init__(self, path):
         """
         初始化
-        :param path: str POM文件地址
+        :param path: str or 文件对象 POM文件地址, 或可读写的文件对象
         """
         self.path = path
         self._tree = None
@@ -923,6 +1533,8 @@ class POM(object):
         :return: ElementTree
         """
         if not self._tree:
+            if hasattr(self.path, "seek"):
+                self.path.seek(0)
             self._tree = ElementTree.parse(self.path)
         return self._tree
 
@@ -942,12 +1554,19 @@ class POM(object):
         :param mapping: dict 映射字典
         :return: None
         """
-        search = f".//{{{self.namespace}}}{key}"
-        results = self.tree.getroot().findall(search)
-        for result in results:
-            result.text = mapping.get(result.text, result.text)
-        ElementTree.register_namespace("", self.namespace)
-        self.tree.write(self.path)
+        with span("pom rewrite", "pom"):
+            search = f".//{{{self.namespace}}}{key}"
+            results = self.tree.getroot().findall(search)
+            for result in results:
+                result.text = mapping.get(result.text, result.text)
+            ElementTree.register_namespace("", self.namespace)
+            if hasattr(self.path, "seek"):
+                self.path.seek(0)
+                self.path.truncate()
+                self.tree.write(self.path)
+                self.path.seek(0)
+            else:
+                self.tree.write(self.path)
 
 
 class MavenClient(object):
@@ -959,17 +1578,25 @@ class MavenClient(object):
             os.path.dirname(__file__),
             "../conf/settings.xml"))
 
+    DEFAULT_GOAL = "deploy:deploy-file"
+
     def __init__(self, binary: str = DEFAULT_BIN,
                  setting: str = DEFAULT_CONF,
+                 options: Iterable = None,
+                 goal: str = DEFAULT_GOAL,
                  logger: logging.Logger = None):
         """
         初始化
         :param binary: str 二进制可执行客户端路径
         :param setting: str 指定默认配置文件路径
+        :param options: Iterable 目标之前的全局参数, 例如 -B -o -Dmaven.repo.local=...
+        :param goal: str 部署目标
         :param logger: logging.Logger类 日志记录器
         """
         self.binary = binary
         self.setting = setting
+        self.options = list(options) if options else []
+        self.goal = goal
         self.logger = logger if logger else Log().logger
         self._args = []
 
@@ -1002,18 +1629,21 @@ class MavenClient(object):
         返回执行的shell命令
         :return: str
         """
-        return f"{self.binary} --settings {self.setting} {' '.join(self._args)}"
+        return f"{self.binary} --settings {self.setting} {' '.join(self.options + self._args)}"
 
     def deploy(self):
         """
         执行上传命令
         :return: None or raise MavenClientDeployError
         """
-        self._args.insert(0, "deploy:deploy-file")
-        command = [self.binary, "--settings", self.setting] + self.args
+        self._args.insert(0, self.goal)
+        command = [self.binary, "--settings", self.setting] + self.options + self.args
         try:
-            out = subprocess.check_output(command).decode("utf-8").strip()
-            self.logger.info(out)
+            with span("deploy", "deploy"):
+                out = subprocess.check_output(command)
+            # mvn输出较长, 仅在DEBUG时解码及记录, 避免拖慢上传流程
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(out.decode("utf-8").strip())
         except subprocess.CalledProcessError as e:
             self.logger.error("*" * 50)
             self.logger.error(f"执行命令: {self.shell}")
@@ -1040,6 +1670,10 @@ class Log(object, metaclass=Singleton):
     """日志类"""
 
     DEFAULT_FORMAT = "[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s"
+    BLOCK = "block"
+    DROP = "drop"
+    DROP_INFO = "drop_info"
+    POLICIES = [BLOCK, DROP, DROP_INFO]
 
     def __init__(
             self,
@@ -1049,11 +1683,19 @@ class Log(object, metaclass=Singleton):
             **kwargs):
         """
         初始化日志类
+        所有进程只向队列写入记录, 由单独的监听进程批量写入屏幕及文件
         :param name: str 指定日志名称
         :param level: str 指定日志等级
         :param kwargs: 允许传入其他参数
          - info_file: str info日志名称
          - error_file: str error日志名称
+         - queue_size: int 日志队列长度
+         - drop_policy: str 队列已满时的策略:
+           block: 阻塞直到队列有空位 (默认)
+           drop: 丢弃新记录
+           drop_info: 丢弃WARNING以下的记录, WARNING及以上阻塞
+         - batch_size: int 监听进程每批写入的最大记录数
+         - flush_interval: float 监听进程写入间隔(秒)
         """
         self.name = name
         self.level = level.upper()
@@ -1061,8 +1703,16 @@ class Log(object, metaclass=Singleton):
         self.info_file = kwargs.get("info_file", f"{__name__}_info.log")
         self.error_file = kwargs.get("error_file", f"{__name__}_error.log")
         self.format = kwargs.get("format", self.DEFAULT_FORMAT)
+        self.queue_size = int(kwargs.get("queue_size", 10000))
+        self.drop_policy = kwargs.get("drop_policy", self.BLOCK)
+        if self.drop_policy not in self.POLICIES:
+            raise ValueError(f"Unknown drop policy: {self.drop_policy}")
+        self.batch_size = int(kwargs.get("batch_size", 500))
+        self.flush_interval = float(kwargs.get("flush_interval", 0.5))
         self.info_path = os.path.join(self.directory, self.info_file)
         self.error_path = os.path.join(self.directory, self.error_file)
+        self.queue = None
+        self._listener = None
         self._logger = None
 
     @property
@@ -1075,32 +1725,168 @@ class Log(object, metaclass=Singleton):
             self._logger = self._get_logger()
         return self._logger
 
+    @property
+    def worker_config(self):
+        """
+        返回子进程安装日志记录器所需的配置, 用于进程池初始化函数
+        :return: dict
+        """
+        if not self._logger:
+            self._logger = self._get_logger()
+        return self._config()
+
+    def _config(self):
+        """
+        返回日志队列配置
+        :return: dict
+        """
+        return {"name": self.name, "level": self.level,
+                "queue": self.queue, "drop_policy": self.drop_policy}
+
+    @classmethod
+    def install(cls, config: dict):
+        """
+        在子进程中将日志记录器指向父进程的日志队列 (spawn方式启动的子进程需要)
+        :param config: dict 由worker_config返回的配置
+        :return: logger
+        """
+        logger = logging.getLogger(config["name"])
+        logger.setLevel(config["level"])
+        logger.handlers = [
+            LogQueueHandler(config["queue"], config["drop_policy"])]
+        logger.propagate = False
+        # 子进程中的Log()直接复用该记录器, 不再启动监听进程
+        log = cls(name=config["name"], level=config["level"])
+        if not log._logger:
+            log.queue = config["queue"]
+            log._logger = logger
+        return logger
+
     def _get_logger(self):
         """
-        获取日志记录器
+        获取日志记录器, 并启动日志监听进程
         :return: logging.getLogger()
         """
-        logger = logging.getLogger(self.name)
-        logger.setLevel(self.level)
-        formatter = logging.Formatter(self.format)
-        # 创建屏幕流
-        stream_handler = logging.StreamHandler()
-        stream_handler.setLevel(self.level)
-        stream_handler.setFormatter(formatter)
-
         os.makedirs(self.directory, exist_ok=True)
-        # 创建INFO文件处理器
-        file_handler_info = handlers.TimedRotatingFileHandler(
-            self.info_path, when="D")
-        file_handler_info.setFormatter(formatter)
-        file_handler_info.setLevel(logging.INFO)
-        # 创建ERROR文件处理器
-        file_handler_error = handlers.TimedRotatingFileHandler(
-            self.error_path, when="D")
-        file_handler_error.setFormatter(formatter)
-        file_handler_error.setLevel(logging.ERROR)
-        # 添加所有处理器
-        logger.addHandler(stream_handler)
-        logger.addHandler(file_handler_info)
-        logger.addHandler(file_handler_error)
-        return logger
+        self.queue = multiprocessing.Queue(self.queue_size)
+        self._listener = multiprocessing.Process(
+            target=_log_listener,
+            args=(self.queue, {
+                "level": self.level,
+                "format": self.format,
+                "info_path": self.info_path,
+                "error_path": self.error_path,
+                "batch_size": self.batch_size,
+                "flush_interval": self.flush_interval}),
+            name="log-listener",
+            daemon=True)
+        self._listener.start()
+        atexit.register(self.stop, os.getpid())
+        return self.install(self._config())
+
+    def stop(self, pid: int = None):
+        """
+        等待队列中的记录写入完毕后停止监听进程, 仅创建监听进程的进程可调用
+        :param pid: int 创建监听进程的进程号
+        :return: None
+        """
+        if pid not in (None, os.getpid()) or not self._listener:
+            return
+        self.queue.put(None)
+        self._listener.join(timeout=10)
+        self._listener = None
+
+
+class LogQueueHandler(handlers.QueueHandler):
+    """日志队列处理器"""
+
+    def __init__(self, queue, drop_policy: str = Log.BLOCK):
+        """
+        初始化
+        :param queue: multiprocessing.Queue 日志队列
+        :param drop_policy: str 队列已满时的策略, 参考Log.POLICIES
+        """
+        super(LogQueueHandler, self).__init__(queue)
+        self.drop_policy = drop_policy
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        """
+        写入队列, 队列已满时按策略处理
+        :param record: LogRecord
+        :return: None
+        """
+        block = self.drop_policy == Log.BLOCK or (
+            self.drop_policy == Log.DROP_INFO
+            and record.levelno >= logging.WARNING)
+        try:
+            self.queue.put(record, block=block)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            notice = logging.makeLogRecord({
+                "name": record.name, "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"日志队列已满, 进程[{os.getpid()}]丢弃了{dropped}条记录"})
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self.dropped += dropped
+
+
+def _log_listener(log_queue, config: dict):
+    """
+    日志监听进程, 批量写入屏幕及文件, 文件仅由本进程写入, 避免多进程轮转冲突
+    :param log_queue: multiprocessing.Queue 日志队列
+    :param config: dict 日志配置
+    :return: None
+    """
+    # 忽略中断信号, 由主进程在退出时发送结束标记
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    formatter = logging.Formatter(config["format"])
+    stream_handler = logging.StreamHandler()
+    stream_handler.setLevel(config["level"])
+    file_handler_info = handlers.TimedRotatingFileHandler(
+        config["info_path"], when="D")
+    file_handler_info.setLevel(logging.INFO)
+    file_handler_error = handlers.TimedRotatingFileHandler(
+        config["error_path"], when="D")
+    file_handler_error.setLevel(logging.ERROR)
+    all_handlers = [stream_handler, file_handler_info, file_handler_error]
+    for handler in all_handlers:
+        handler.setFormatter(formatter)
+    parent = os.getppid()
+    running = True
+    while running:
+        # 主进程被强制结束时不会发送结束标记, 此时监听进程自行退出
+        if os.getppid() != parent:
+            break
+        batch = []
+        deadline = time.monotonic() + config["flush_interval"]
+        while len(batch) < config["batch_size"]:
+            try:
+                record = log_queue.get(
+                    timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                break
+            if record is None:
+                running = False
+                break
+            batch.append(record)
+        for handler in all_handlers:
+            records = [r for r in batch if r.levelno >= handler.level]
+            if not records:
+                continue
+            if isinstance(handler, handlers.TimedRotatingFileHandler):
+                if handler.shouldRollover(records[0]):
+                    handler.doRollover()
+                if handler.stream is None:
+                    handler.stream = handler._open()
+            # 每批仅写入及刷新一次
+            handler.stream.write("".join(
+                handler.format(r) + handler.terminator for r in records))
+            handler.flush()
+    for handler in all_handlers:
+        handler.close()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: control.py
+@time: 2026/10/19 7:30 下午
+"""
+
+__version__ = (0, 0, 2)
+__update_str__ = "信号处理函数仅记录信号, 由派发循环应用并输出日志, 避免在信号处理中获取日志锁"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import json
+import logging
+import os
+import signal
+import socketserver
+import threading
+from collections import deque
+
+from utils.classes import Log
+
+WAIT_INTERVAL = 0.5
+
+
+class Controller(object):
+    """运行时控制器"""
+
+    def __init__(
+            self,
+            limit: int,
+            maximum: int = None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        进程池按最大并发创建, 通过限制同时派发的组件数调整实际并发
+        :param limit: int 初始并发数
+        :param maximum: int 并发上限, 即进程池大小, 默认与初始并发数相同
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.maximum = maximum if maximum else limit
+        self.limit = max(1, min(limit, self.maximum))
+        self.logger = logger if logger else Log().logger
+        self.in_flight = 0
+        self.paused = False
+        self.draining = False
+        self._condition = threading.Condition()
+        # 信号处理函数收到的信号, 由派发循环取出应用
+        self._signals = deque()
+        self._terminating = False
+        self._server = None
+
+    def __str__(self):
+        return f"<{self.__doc__} Limit={self.limit}/{self.maximum} " \
+               f"InFlight={self.in_flight} Paused={self.paused} Draining={self.draining}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def acquire(self):
+        """
+        派发组件前调用, 暂停或已达并发数时阻塞
+        :return: bool 为False时表示正在排空, 不应再派发
+        """
+        with self._condition:
+            self.poll()
+            while not self.draining and (
+                    self.paused or self.in_flight >= self.limit):
+                # 定时唤醒, 使信号处理函数收到的信号及时生效
+                self._condition.wait(WAIT_INTERVAL)
+                self.poll()
+            if self.draining:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, *_):
+        """
+        组件完成(成功或失败)后调用
+        :return: None
+        """
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def resize(self, limit: int):
+        """
+        调整并发数, 减小时已派发的组件继续执行
+        :param limit: int 新的并发数, 范围为 1 ~ maximum
+        :return: int 实际生效的并发数
+        """
+        self.limit = max(1, min(int(limit), self.maximum))
+        self.logger.info(f"并发数调整为{self.limit}/{self.maximum}")
+        return self.limit
+
+    def pause(self):
+        """
+        暂停派发, 已派发的组件继续执行
+        :return: None
+        """
+        self.paused = True
+        self.logger.info("已暂停派发")
+
+    def resume(self):
+        """
+        恢复派发
+        :return: None
+        """
+        self.paused = False
+        self.logger.info("已恢复派发")
+
+    def drain(self):
+        """
+        停止派发, 等待已派发的组件完成后退出
+        :return: None
+        """
+        self.draining = True
+        self.logger.info(f"开始排空, 等待{self.in_flight}个组件完成")
+
+    def status(self):
+        """
+        返回当前状态
+        :return: dict
+        """
+        return {"limit": self.limit, "maximum": self.maximum,
+                "in_flight": self.in_flight, "paused": self.paused,
+                "draining": self.draining}
+
+    def command(self, line: str):
+        """
+        执行控制命令: status / pause / resume / drain / resize N
+        :param line: str 命令
+        :return: dict 执行后的状态或错误信息
+        """
+        args = line.split()
+        if not args:
+            return {"error": "empty command"}
+        if args[0] == "resize" and len(args) == 2 and args[1].lstrip("+-").isdigit():
+            value = args[1]
+            self.resize(self.limit + int(value) if value[0] in "+-" else int(value))
+        elif args[0] in ["pause", "resume", "drain"] and len(args) == 1:
+            getattr(self, args[0])()
+        elif args[0] != "status":
+            return {"error": f"unknown command: {line}"}
+        return self.status()
+
+    def poll(self):
+        """
+        应用信号处理函数收到的信号, 由派发循环调用
+        :return: None
+        """
+        while self._signals:
+            signum = self._signals.popleft()
+            if signum == signal.SIGUSR1:
+                self.resize(self.limit + 1)
+            elif signum == signal.SIGUSR2:
+                self.resize(self.limit - 1)
+            elif signum == signal.SIGTERM and not self.draining:
+                self.drain()
+
+    def _on_signal(self, signum, _):
+        """
+        信号处理函数, 仅记录信号, 不获取锁也不输出日志
+        日志处理器的锁可能正被被中断的代码持有, 在此记录日志会死锁, 由派发循环调用poll应用
+        :param signum: int 信号
+        :return: None
+        """
+        if signum == signal.SIGTERM:
+            if self._terminating:
+                # 再次收到时立即退出
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                os.kill(os.getpid(), signal.SIGTERM)
+            self._terminating = True
+        self._signals.append(signum)
+
+    def install_signals(self):
+        """
+        安装信号处理: SIGUSR1 并发+1, SIGUSR2 并发-1, SIGTERM 排空(再次发送立即退出)
+        仅能在主线程调用
+        :return: None
+        """
+        for signum in [signal.SIGUSR1, signal.SIGUSR2, signal.SIGTERM]:
+            signal.signal(signum, self._on_signal)
+
+    @staticmethod
+    def reset_signals():
+        """
+        恢复默认信号处理, 用于子进程
+        :return: None
+        """
+        for signum in [signal.SIGUSR1, signal.SIGUSR2, signal.SIGTERM]:
+            signal.signal(signum, signal.SIG_DFL)
+
+    def serve(self, path: str):
+        """
+        在后台线程中监听本地Unix套接字, 每行一个命令, 返回JSON状态
+        例如: echo "resize 4" | nc -U ./migrate.sock
+        :param path: str 套接字路径
+        :return: None
+        """
+        controller = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            """控制命令处理器"""
+
+            def handle(self):
+                for line in self.rfile:
+                    result = controller.command(line.decode("utf-8").strip())
+                    self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+
+        if os.path.exists(path):
+            os.remove(path)
+        self._server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.logger.info(f"控制套接字已启动: {path}")
+
+    def close(self):
+        """
+        关闭控制套接字
+        :return: None
+        """
+        if self._server is not None:
+            path = self._server.server_address
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class Checkpoint(object):
+    """已完成组件的检查点文件"""
+
+    def __init__(self, path: str, logger: logging.Logger = None):
+        """
+        初始化, 读取已完成的组件键, 之后完成的组件追加写入
+        :param path: str 检查点文件路径
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.path = path
+        self.logger = logger if logger else Log().logger
+        self.completed = set()
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.completed = {line.strip() for line in f if line.strip()}
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path} Completed={len(self.completed)}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __contains__(self, key: str):
+        return key in self.completed
+
+    def done(self, key: str):
+        """
+        记录已完成组件
+        :param key: str 组件键
+        :return: None
+        """
+        with self._lock:
+            self.completed.add(key)
+            self._file.write(key + "\n")
+
+    def flush(self):
+        """
+        写入磁盘
+        :return: None
+        """
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        写入磁盘并关闭
+        :return: None
+        """
+        self.flush()
+        self._file.close()
+        self.logger.info(f"检查点已保存: {self.path}, 已完成{len(self.completed)}个组件")
@@ -9,8 +9,8 @@
 @time: 2021/4/8 3:44 下午
 """
 
-__version__ = (0, 1, 1)
-__update_str__ = "增加类型检查异常"
+__version__ = (0, 1, 11)
+__update_str__ = "移除多目标迁移目标失败异常, 副本目标的失败由主进程汇总"
 __version_str__ = "当前版本:" + \
                   ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
 
@@ -58,3 +58,38 @@ class MissingMavenSettingError(Exception):
 class MissingSnapshotIdError(Exception):
     """缺少上传快照私服的id"""
     ...
+
+
+class ManageRepositoryError(Exception):
+    """创建或删除存储库失败"""
+    ...
+
+
+class BundleChecksumError(Exception):
+    """离线包成员校验失败"""
+    ...
+
+
+class AssetChecksumError(Exception):
+    """资源下载校验失败"""
+    ...
+
+
+class WorkerLostError(Exception):
+    """工作进程在处理任务时异常退出"""
+    ...
+
+
+class FanOutNotSupport(Exception):
+    """多目标迁移不支持该存储库"""
+    ...
+
+
+class AuthModeNotSupport(Exception):
+    """认证方式不支持异常"""
+    ...
+
+
+class RecordingFormatError(Exception):
+    """录制文件格式不支持"""
+    ...
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: fanout.py
+@time: 2026/10/20 1:10 上午
+"""
+
+__version__ = (0, 0, 3)
+__update_str__ = "副本目标异步上传, 各目标结果由主进程汇总, 全部目标成功后组件才完成"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing.util import Finalize
+
+from utils.classes import Nexus, Log
+from utils.planner import human_bytes
+from utils.trace import span
+
+DEFAULT_BUFFER = 4
+DEFAULT_RETRIES = 3
+RETRY_DELAY = 2
+
+
+class Target(object):
+    """迁移目标"""
+
+    def __init__(self, name: str, repository: Nexus.Repository, url_mapping: dict = None):
+        """
+        初始化
+        进度计数保存在共享内存中, 随进程池初始化参数传入子进程后, 所有进程共用
+        :param name: str 目标名称, 主目标为TargetNexus, 其他为config.ini中[TargetNexus:名称]的名称
+        :param repository: Repository类 目标存储库实例
+        :param url_mapping: dict 该目标的POM地址映射
+        """
+        self.name = name
+        self.repository = repository
+        self.url_mapping = url_mapping if url_mapping else {}
+        self._uploaded = multiprocessing.Value("q", 0)
+        self._failed = multiprocessing.Value("q", 0)
+        self._bytes = multiprocessing.Value("q", 0)
+
+    def __str__(self):
+        return f"<{self.__doc__} Name={self.name} Repository={self.repository.name}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def uploaded(self):
+        return self._uploaded.value
+
+    @property
+    def failed(self):
+        return self._failed.value
+
+    @property
+    def bytes(self):
+        return self._bytes.value
+
+    def record(self, success: bool, size: int = 0):
+        """
+        记录一个组件的结果
+        :param success: bool 是否成功
+        :param size: int 上传的字节数
+        :return: None
+        """
+        counter = self._uploaded if success else self._failed
+        with counter.get_lock():
+            counter.value += 1
+        if success:
+            with self._bytes.get_lock():
+                self._bytes.value += size
+
+
+class Tracker(object):
+    """多目标结果汇总"""
+
+    def __init__(self, targets: list, results, done, failed):
+        """
+        初始化
+        主目标的结果由主进程直接记录, 副本目标的结果由各进程的上传线程经队列上报
+        :param targets: list Target类
+        :param results: multiprocessing.Queue 副本目标的结果 (组件键, 目标名称, 错误)
+        :param done: callable 组件在所有目标成功后调用, 参数为组件键
+        :param failed: callable 组件在任一目标失败时调用一次, 参数为组件键及错误信息
+        """
+        self.targets = [target.name for target in targets]
+        self.results = results
+        self.done = done
+        self.failed = failed
+        # 组件键 -> [已有结果的目标, 首个错误]
+        self._pending = {}
+        # 至少一个目标失败的组件数
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._collect, name="FanOut-Tracker", daemon=True)
+
+    def __str__(self):
+        return f"<{self.__doc__} Targets={self.targets} Pending={len(self._pending)}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def record(self, key: str, target: str, error: str = None):
+        """
+        记录组件在一个目标上的结果
+        :param key: str 组件键
+        :param target: str 目标名称
+        :param error: str 失败时的错误信息
+        :return: None
+        """
+        with self._lock:
+            state = self._pending.setdefault(key, [set(), None])
+            if error is not None and state[1] is None:
+                state[1] = f"[{target}] {error}"
+                self.failures += 1
+                self.failed(key, state[1])
+            state[0].add(target)
+            if len(state[0]) < len(self.targets):
+                return
+            del self._pending[key]
+            if state[1] is None:
+                self.done(key)
+
+    def _collect(self):
+        while True:
+            item = self.results.get()
+            if item is None:
+                break
+            self.record(*item)
+
+    def finish(self):
+        """
+        所有工作进程退出后调用: 处理已上报的结果, 只有部分目标完成的组件(例如进程异常退出)视为失败
+        :return: None
+        """
+        self.results.put(None)
+        self._thread.join()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for key, (finished, error) in pending.items():
+            if error is None:
+                self.failures += 1
+                self.failed(key, f"目标{[t for t in self.targets if t not in finished]}未完成")
+
+
+class FanOut(object):
+    """多目标分发"""
+
+    def __init__(
+            self,
+            targets: list,
+            buffer: int = DEFAULT_BUFFER,
+            retries: int = DEFAULT_RETRIES,
+            logger: logging.Logger = None):
+        """
+        初始化
+        第一个目标为主目标, 在迁移函数中同步上传, 失败时组件失败, 不再分发至其他目标
+        主目标成功后迁移函数即返回, 其他目标由每个进程中各自的上传线程异步上传, 积压达到buffer时迁移函数等待,
+        慢的目标最多落后主目标buffer个组件
+        各目标独立重试, 结果经队列汇总至主进程, 全部目标成功后组件才视为完成, 任一目标最终失败时组件失败
+        :param targets: list Target类, 第一个为主目标
+        :param buffer: int 每个进程中每个副本目标最多积压的组件数
+        :param retries: int 每个目标上传失败的重试次数
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.targets = targets
+        self.buffer = max(1, buffer)
+        self.retries = max(0, retries)
+        self.logger = logger if logger else Log().logger
+        # 各进程上报的目标结果 (组件键, 目标名称, 错误), 由主进程的汇总线程消费
+        self._results = multiprocessing.Queue()
+        self._tracker = None
+        self._reset()
+
+    def __str__(self):
+        return f"<{self.__doc__} Targets={[target.name for target in self.targets]}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __getstate__(self):
+        # 上传线程, 本地队列及汇总状态不跨进程
+        state = dict(self.__dict__)
+        for key in ["_queues", "_threads", "_lock", "_finalizer", "_tracker"]:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tracker = None
+        self._reset()
+
+    def _reset(self):
+        self._queues = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._finalizer = None
+
+    @property
+    def primary(self):
+        return self.targets[0]
+
+    @property
+    def replicas(self):
+        return self.targets[1:]
+
+    def _start(self):
+        """
+        在当前进程中启动副本目标的上传线程, 进程退出时等待积压的组件上传完成
+        :return: None
+        """
+        with self._lock:
+            if self._queues:
+                return
+            for target in self.replicas:
+                q = queue.Queue(maxsize=self.buffer)
+                thread = threading.Thread(
+                    target=self._consume, args=(target, q),
+                    name=f"FanOut-{target.name}", daemon=True)
+                thread.start()
+                self._queues[target.name] = q
+                self._threads.append(thread)
+            self._finalizer = Finalize(self, self.close, exitpriority=20)
+
+    def upload(self, target: Target, key: str, build):
+        """
+        上传一个组件至目标, 失败时重试
+        :param target: Target类 目标
+        :param key: str 组件键, 用于日志
+        :param build: callable 参数为目标, 返回上传的表单数据, 每次尝试重新构造
+        :return: int 上传的字节数
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                files = build(target)
+                size = target.repository._payload_size(files)
+                with span("fanout", "upload", target=target.name, component=key):
+                    target.repository.upload_component(files)
+                target.record(True, size)
+                return size
+            except Exception as e:
+                if attempt >= self.retries:
+                    target.record(False)
+                    raise
+                self.logger.warning(
+                    f"目标[{target.name}]上传[{key}]失败, 第{attempt + 1}次重试: {e}")
+                time.sleep(RETRY_DELAY * (attempt + 1))
+
+    def _consume(self, target: Target, q: queue.Queue):
+        """
+        副本目标的上传线程, 每个组件的结果上报至主进程
+        :param target: Target类 目标
+        :param q: queue.Queue 积压的组件
+        :return: None
+        """
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            key, build, session = item
+            error = None
+            try:
+                self.upload(target, key, build)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                self.logger.error(f"目标[{target.name}]迁移组件[{key}]失败: {error}")
+            finally:
+                if session is not None:
+                    session.release()
+            self._results.put((key, target.name, error))
+
+    def deliver(self, key: str, build, session=None):
+        """
+        分发一个组件: 主目标同步上传, 成功后副本目标入队, 不等待副本目标完成
+        :param key: str 组件键
+        :param build: callable 参数为目标, 返回上传的表单数据
+        :param session: SpoolSession类 组件的临时存储会话, 每个副本上传完成后释放一次引用
+        :return: None
+        """
+        # 主目标失败时直接抛出, 副本目标不会收到该组件
+        self.upload(self.primary, key, build)
+        if not self.replicas:
+            return
+        self._start()
+        for target in self.replicas:
+            if session is not None:
+                session.retain()
+            # 积压已满时等待, 副本目标最多落后buffer个组件
+            self._queues[target.name].put((key, build, session))
+
+    def close(self):
+        """
+        等待当前进程中积压的组件上传完成
+        :return: None
+        """
+        with self._lock:
+            queues, threads = self._queues, self._threads
+            self._queues, self._threads = {}, []
+        for q in queues.values():
+            q.put(None)
+        for thread in threads:
+            thread.join()
+
+    def track(self, done, failed):
+        """
+        在主进程中开始汇总各目标的结果
+        :param done: callable 组件在所有目标成功后调用, 参数为组件键
+        :param failed: callable 组件在任一目标失败时调用, 参数为组件键及错误信息
+        :return: Tracker类
+        """
+        self._tracker = Tracker(self.targets, self._results, done, failed).start()
+        return self._tracker
+
+    def complete(self, key: str):
+        """
+        主目标上传成功, 由主进程中迁移任务的成功回调调用
+        :param key: str 组件键
+        :return: None
+        """
+        self._tracker.record(key, self.primary.name)
+
+    def finish(self):
+        """
+        所有工作进程退出后调用, 处理剩余的结果
+        :return: None
+        """
+        if self._tracker is not None:
+            self._tracker.finish()
+            self._tracker = None
+
+    def report(self):
+        """
+        输出各目标的迁移进度
+        :return: None
+        """
+        for target in self.targets:
+            self.logger.info(
+                f"目标[{target.name}] -> [{target.repository.name}]: 组件 {target.uploaded}, "
+                f"失败 {target.failed}, {human_bytes(target.bytes)}")
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: filters.py
+@time: 2026/10/19 4:30 下午
+"""
+
+__version__ = (0, 0, 3)
+__update_str__ = "快照保留策略支持判断单个新构建, 用于持续同步的事件"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+
+from utils.classes import Log
+
+
+def parse_date(value):
+    """
+    解析配置中的日期, 支持 2021-01-01 或 2021-01-01T10:00:00
+    :param value: str or date or datetime 日期
+    :return: datetime or None
+    """
+    if value in (None, ""):
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class SnapshotPolicy(object):
+    """快照保留策略"""
+
+    ALL = "all"
+    LATEST = "latest"
+    SINCE = "since"
+    POLICIES = [ALL, LATEST, SINCE]
+    # 带时间戳的快照版本, 例如 1.2-20210401.101010-37
+    TIMESTAMP_PATTERN = re.compile(
+        r"^(?P<base>.+)-(?P<timestamp>\d{8}\.\d{6})-(?P<build>\d+)$")
+
+    def __init__(
+            self,
+            keep: str = ALL,
+            latest: int = 1,
+            since=None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param keep: str 策略:
+         - all: 保留所有快照 (默认)
+         - latest: 每个基础版本仅保留最新的N个构建
+         - since: 仅保留指定日期之后的构建
+        :param latest: int latest策略保留的构建数
+        :param since: str latest/since策略的日期下限, 例如 2021-01-01
+        :param logger: logging.Logger类 日志记录器
+        """
+        if keep not in self.POLICIES:
+            raise ValueError(f"Unknown snapshot policy: {keep}")
+        self.keep = keep
+        self.latest = int(latest)
+        self.since = parse_date(since)
+        if self.keep == self.SINCE and self.since is None:
+            raise ValueError("The snapshot policy 'since' requires a date")
+        self.logger = logger if logger else Log().logger
+        self.kept = 0
+        self.skipped = 0
+        self.skipped_bytes = 0
+
+    def __str__(self):
+        return f"<{self.__doc__} Keep={self.keep} Latest={self.latest} Since={self.since}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def parse(cls, version: str):
+        """
+        解析带时间戳的快照版本
+        :param version: str 版本号
+        :return: tuple (基础版本, 构建时间, 构建号) 或 None
+        """
+        match = cls.TIMESTAMP_PATTERN.match(version or "")
+        if not match:
+            return None
+        timestamp = datetime.strptime(
+            match.group("timestamp"), "%Y%m%d.%H%M%S").replace(tzinfo=timezone.utc)
+        return match.group("base"), timestamp, int(match.group("build"))
+
+    def match(self, component):
+        """
+        判断单个新部署的构建是否保留, 用于持续同步的事件
+        新构建总是其基础版本中最新的, latest策略下保留, 仅检查日期下限
+        :param component: Component类
+        :return: bool
+        """
+        parsed = self.parse(component.version)
+        if self.keep == self.ALL or parsed is None or self.since is None:
+            return True
+        return parsed[1] >= self.since
+
+    def _skip(self, component):
+        self.skipped += 1
+        self.skipped_bytes += component.size
+
+    def apply(self, components):
+        """
+        根据列表信息筛选需要迁移的快照组件, 不下载任何资源
+        :param components: Iterable 组件可迭代对象
+        :return: generator
+        """
+        if self.keep == self.ALL:
+            yield from components
+            return
+        builds = defaultdict(list)
+        for component in components:
+            parsed = self.parse(component.version)
+            # 非时间戳版本不参与筛选
+            if parsed is None:
+                self.kept += 1
+                yield component
+                continue
+            base, timestamp, build = parsed
+            if self.since and timestamp < self.since:
+                self._skip(component)
+                continue
+            if self.keep == self.SINCE:
+                self.kept += 1
+                yield component
+                continue
+            builds[(component.group, component.name, base)].append(
+                (timestamp, build, component))
+        # latest策略需要完整列表后才能确定最新构建
+        for key, items in builds.items():
+            items.sort(key=lambda x: (x[0], x[1]), reverse=True)
+            for _, _, component in items[self.latest:]:
+                self._skip(component)
+            for _, _, component in items[:self.latest]:
+                self.kept += 1
+                yield component
+        self.report()
+
+    def report(self):
+        """
+        输出筛选统计
+        :return: None
+        """
+        self.logger.info(
+            f"快照策略[{self.keep}]: 保留 {self.kept} 个组件, "
+            f"跳过 {self.skipped} 个组件, 共 {self.skipped_bytes} 字节")
+
+
+class ComponentFilter(object):
+    """组件过滤规则"""
+
+    # 支持过滤的字段, name即artifactId
+    FIELDS = ["group", "name", "version"]
+
+    def __init__(
+            self,
+            include: dict = None,
+            exclude: dict = None,
+            modified_after=None,
+            modified_before=None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param include: dict 包含规则, 字段 -> 通配符列表, 同一字段任一匹配即可, 不同字段需全部满足
+        :param exclude: dict 排除规则, 字段 -> 通配符列表, 任一匹配即排除
+        :param modified_after: str 仅保留该日期(含)之后修改的组件
+        :param modified_before: str 仅保留该日期之前修改的组件
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.include = self._normalize(include)
+        self.exclude = self._normalize(exclude)
+        self.modified_after = parse_date(modified_after)
+        self.modified_before = parse_date(modified_before)
+        self.logger = logger if logger else Log().logger
+        self.matched = 0
+        self.skipped = 0
+
+    def __str__(self):
+        return f"<{self.__doc__} Include={self.include} Exclude={self.exclude} " \
+               f"After={self.modified_after} Before={self.modified_before}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _normalize(self, rules: dict):
+        """
+        校验并整理规则, 单个字符串视为只有一项的列表
+        :param rules: dict 规则
+        :return: dict
+        """
+        normalized = {}
+        for field, patterns in (rules or {}).items():
+            if field not in self.FIELDS:
+                raise ValueError(f"Unknown filter field: {field}")
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            if patterns:
+                normalized[field] = [str(pattern) for pattern in patterns]
+        return normalized
+
+    @property
+    def enabled(self):
+        """
+        返回是否配置了任意规则
+        :return: bool
+        """
+        return bool(self.include or self.exclude
+                    or self.modified_after or self.modified_before)
+
+    def search_params(self):
+        """
+        返回可下推至搜索接口的参数
+        搜索接口每个字段仅接受一个值, 且仅支持末尾通配符, 因此只下推单个简单的包含规则
+        :return: dict
+        """
+        params = {}
+        for field, patterns in self.include.items():
+            if len(patterns) != 1:
+                continue
+            pattern = patterns[0]
+            if re.search(r"[?\[\]]", pattern) or "*" in pattern.rstrip("*"):
+                continue
+            params[field] = pattern
+        return params
+
+    def match(self, component):
+        """
+        判断组件是否满足规则, 仅使用列表信息
+        :param component: Component类
+        :return: bool
+        """
+        for field, patterns in self.include.items():
+            value = getattr(component, field) or ""
+            if not any(fnmatchcase(value, pattern) for pattern in patterns):
+                return False
+        for field, patterns in self.exclude.items():
+            value = getattr(component, field) or ""
+            if any(fnmatchcase(value, pattern) for pattern in patterns):
+                return False
+        if self.modified_after or self.modified_before:
+            # 列表未返回修改时间时无法判断, 保留
+            modified = component.last_modified
+            if modified and self.modified_after and modified < self.modified_after:
+                return False
+            if modified and self.modified_before and modified >= self.modified_before:
+                return False
+        return True
+
+    def apply(self, components):
+        """
+        在客户端筛选组件, 服务端已过滤的条件会再次校验
+        :param components: Iterable 组件可迭代对象
+        :return: generator
+        """
+        for component in components:
+            if self.match(component):
+                self.matched += 1
+                yield component
+            else:
+                self.skipped += 1
+        self.report()
+
+    def report(self):
+        """
+        输出筛选统计
+        :return: None
+        """
+        self.logger.info(
+            f"过滤规则: 保留 {self.matched} 个组件, 跳过 {self.skipped} 个组件")
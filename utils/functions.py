@@ -9,52 +9,76 @@
 @time: 2021/4/20 9:12 上午
 """
 
-__version__ = (0, 0, 1)
-__update_str__ = "初始创建"
+__version__ = (0, 1, 26)
+__update_str__ = "隔离的maven客户端不再传入部署地址"
 __version_str__ = "当前版本:" + \
     ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
 
+import atexit
+import io
 import os
+import time
+import logging
+import threading
 import yaml
-import tempfile
-from collections import Iterable
-from shutil import rmtree
+from collections.abc import Iterable
 from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 
-from utils.classes import Nexus, Log, POM, MavenClient
+from utils.classes import Nexus, Log, MavenClient
+from utils.scheduler import Scheduler
+from utils.shard import Shard, CoordinatorClient
+from utils.planner import Planner, DEFAULT_PROBES
+from utils.limiter import Limiter
+from utils.spool import Spool
+from utils.filters import SnapshotPolicy, ComponentFilter
+from utils.bundle import Bundle, DEFAULT_CHUNK_SIZE
+from utils.replicator import Replicator
+from utils.control import Controller, Checkpoint
+from utils.trace import Tracer
+from utils.loadtest import LoadTester, SyntheticComponent
+from utils.loadtest import DEFAULT_LEVELS, DEFAULT_COUNT, DEFAULT_SIZES
+from utils.audit import Auditor, DEFAULT_PARTITIONS, DEFAULT_SAMPLE
+from utils.lifecycle import WorkerPool
+from utils.offload import HybridPool, replace_pom, PROCESS, HYBRID, DEFAULT_CPU_PROCESSES
+from utils.fanout import FanOut, Target
+from utils.auth import NexusAuth, AuthStats
+from utils.mavenenv import MavenEnvironment
 from utils.exceptions import AssetExceedMaximum
 from utils.exceptions import MissingMavenSettingError
 from utils.exceptions import MissingSnapshotIdError
+from utils.exceptions import FanOutNotSupport
 
 DEFAULT_POOL = 10
+# 子进程中的迁移函数及除组件外的参数, 由init_worker安装
+_task = None
 
 
-def migrate_maven2_repository(
+def _prepare_maven2(
         src_repo: Nexus.Repository,
         dst_repo: Nexus.Repository,
         config: str,
-        processes: int = DEFAULT_POOL,
-        logger: Log().logger = None):
+        logger: logging.Logger,
+        deploy: bool = True):
+    """
+    读取maven.yaml配置, 根据源存储库版本策略选择迁移函数
+    :param src_repo: Repository类 源存储库实例
+    :param dst_repo: Repository类 目标存储库实例
+    :param config: str maven.yaml配置文件路径
+    :param logger: logging.logger类 日志记录器
+    :param deploy: bool 是否会调用迁移函数部署组件, 为False时不预热maven运行环境
+    :return: tuple (配置字典, 迁移函数, 迁移函数除组件外的参数)
+    """
     with open(config, "r", encoding="utf-8") as conf:
         yml = yaml.safe_load(conf)
     excludes = yml.get("excludes", [])
-    tmp_dir = yml.get("tmp_dir", tempfile.mkdtemp())
+    tmp_dir = yml.get("tmp_dir")
     url_mapping = yml.get("pom_url_mapping")
-    logger = logger if logger else Log().logger
+    # 所有阶段共用同一个临时存储管理器, 并传递给子进程
+    Spool.install(Spool(tmp_dir, **(yml.get("spool") or {})))
     if src_repo.maven_version_policy == "RELEASE":
-        pool = Pool(processes)
-        for getter in src_repo.iter_component_getter:
-            for component in getter.components:
-                pool.apply_async(
-                    migrate_maven_release_component, args=(
-                        component,
-                        dst_repo,
-                        url_mapping,
-                        excludes,
-                        tmp_dir,
-                        logger))
-        pool.close()
-        pool.join()
+        func = migrate_maven_release_component
+        args = (dst_repo, url_mapping, excludes, tmp_dir, logger)
     elif src_repo.maven_version_policy == "SNAPSHOT":
         setting = os.path.join(os.path.dirname(config), yml.get("settings"))
         if not os.path.exists(setting):
@@ -65,22 +89,735 @@ def migrate_maven2_repository(
             msg = "Missing the id in {setting.xml}/settings/servers/server, " \
                   "which was used for upload snapshots."
             raise MissingSnapshotIdError(msg)
-        pool = Pool(processes)
-        for getter in src_repo.iter_component_getter:
-            for component in getter.components:
-                pool.apply_async(
-                    migrate_maven_snapshot_component,
-                    args=(
-                        component,
-                        dst_repo,
-                        setting,
-                        snapshot_id,
-                        url_mapping,
-                        excludes,
-                        tmp_dir,
-                        logger))
+        func = migrate_maven_snapshot_component
+        args = (dst_repo, setting, snapshot_id, url_mapping, excludes,
+                tmp_dir, logger, _maven_environment(setting, yml, logger) if deploy else None)
+    else:
+        func, args = None, ()
+    return yml, func, args
+
+
+def _maven_environment(setting: str, yml: dict, logger: logging.Logger):
+    """
+    读取maven.yaml中的maven_client配置, 预热离线插件库
+    :param setting: str maven配置文件路径
+    :param yml: dict maven.yaml配置字典
+    :param logger: logging.logger类 日志记录器
+    :return: MavenEnvironment类, 未启用或预热失败时为None
+    """
+    conf = dict(yml.get("maven_client") or {})
+    if not conf.pop("isolated", True):
+        return None
+    environment = MavenEnvironment(setting, **conf, logger=logger)
+    if not environment.prepare():
+        return None
+    # 各进程的本地仓库在退出时删除, 插件库保留
+    atexit.register(environment.clean)
+    return environment
+
+
+def _select_components(
+        src_repo: Nexus.Repository,
+        yml: dict,
+        shard: Shard = None,
+        logger: logging.Logger = None):
+    """
+    列出源存储库中需要迁移的组件, 依次应用过滤规则, 快照保留策略及分片
+    快照保留策略须在分片之前应用, 否则同一基础版本的构建分散在各分片中, 每个分片各自保留最新N个构建
+    :param src_repo: Repository类 源存储库实例
+    :param yml: dict maven.yaml配置字典
+    :param shard: Shard类 仅保留属于该分片的组件
+    :param logger: logging.logger类 日志记录器
+    :return: generator
+    """
+    rules = ComponentFilter(**(yml.get("filters") or {}), logger=logger)
+    params = rules.search_params()
+    if params:
+        logger.info(f"使用搜索接口列出组件, 参数: {params}")
+    components = iter_components(src_repo, params)
+    if rules.enabled:
+        components = rules.apply(components)
+    if src_repo.maven_version_policy == "SNAPSHOT":
+        policy = SnapshotPolicy(
+            **(yml.get("snapshot_policy") or {}), logger=logger)
+        components = policy.apply(components)
+    if shard:
+        components = shard.filter(components)
+    return components
+
+
+def _prepare_fanout(
+        dst_repo: Nexus.Repository,
+        replicas: list,
+        yml: dict,
+        logger: logging.Logger):
+    """
+    根据maven.yaml的fanout配置创建多目标分发器
+    :param dst_repo: Repository类 主目标存储库实例
+    :param replicas: list 额外的目标 [(名称, Repository类)]
+    :param yml: dict maven.yaml配置字典
+    :param logger: logging.logger类 日志记录器
+    :return: FanOut类
+    """
+    conf = dict(yml.get("fanout") or {})
+    mappings = conf.pop("pom_url_mapping", None) or {}
+    default = yml.get("pom_url_mapping")
+    targets = [Target("TargetNexus", dst_repo, default)]
+    for name, repository in replicas:
+        if repository.maven_version_policy != "RELEASE" \
+                or dst_repo.maven_version_policy != "RELEASE":
+            msg = f"Fan-out migration supports RELEASE repositories only: {name}"
+            raise FanOutNotSupport(msg)
+        targets.append(Target(name, repository, mappings.get(name, default)))
+    logger.info(f"多目标迁移: {', '.join(f'{t.name}[{t.repository.name}]' for t in targets)}")
+    return FanOut(targets, logger=logger, **conf)
+
+
+def plan_maven2_repository(
+        src_repo: Nexus.Repository,
+        dst_repo: Nexus.Repository,
+        config: str,
+        pools: list = None,
+        probes: int = DEFAULT_PROBES,
+        probe_upload: bool = False,
+        probe_levels: list = None,
+        shard: Shard = None,
+        logger: logging.Logger = None):
+    """
+    盘点maven2存储库并预测迁移耗时, 不迁移任何组件
+    :param src_repo: Repository类 源存储库实例
+    :param dst_repo: Repository类 目标存储库实例
+    :param config: str maven.yaml配置文件路径
+    :param pools: list 需要预测的并发数列表
+    :param probes: int 探测下载的组件数量, 0为不探测
+    :param probe_upload: bool 是否将探测组件上传至目标存储库以测量上传性能
+    :param probe_levels: list 探测下载的并发级别
+    :param shard: Shard类 仅盘点属于该分片的组件
+    :param logger: logging.logger类 日志记录器
+    :return: Planner类
+    """
+    logger = logger if logger else Log().logger
+    # 仅探测上传时才会部署组件, 其余情况不调用mvn
+    yml, func, args = _prepare_maven2(
+        src_repo, dst_repo, config, logger, deploy=bool(probes and probe_upload))
+    planner = Planner(yml.get("excludes", []), probes, probe_levels, logger=logger)
+    planner.inventory(_select_components(src_repo, yml, shard, logger))
+    if probes:
+        upload = None
+        if probe_upload and func is not None:
+            def upload(component):
+                func(component, *args)
+        planner.probe(upload)
+    planner.report(pools)
+    return planner
+
+
+def migrate_maven2_repository(
+        src_repo: Nexus.Repository,
+        dst_repo: Nexus.Repository,
+        config: str,
+        processes: int = DEFAULT_POOL,
+        schedule: str = Scheduler.LISTING,
+        shard: Shard = None,
+        coordinator: CoordinatorClient = None,
+        controller: Controller = None,
+        checkpoint: Checkpoint = None,
+        executor: str = PROCESS,
+        cpu_processes: int = DEFAULT_CPU_PROCESSES,
+        replicas: list = None,
+        logger: logging.Logger = None):
+    """
+    迁移maven2存储库
+    :param src_repo: Repository类 源存储库实例
+    :param dst_repo: Repository类 目标存储库实例
+    :param config: str maven.yaml配置文件路径
+    :param processes: int 进程数
+    :param schedule: str 调度策略, 参考Scheduler.POLICIES
+    :param shard: Shard类 仅迁移属于该分片的组件
+    :param coordinator: CoordinatorClient类 协调器客户端, 用于跳过及上报已完成组件
+    :param controller: Controller类 运行时控制器, 进程池按其并发上限创建
+    :param checkpoint: Checkpoint类 检查点, 用于跳过及记录已完成组件
+    :param executor: str 执行器:
+     - process: 每个组件在独立的工作进程中迁移 (默认)
+     - hybrid: 组件在线程中迁移, 并发数可远大于CPU核数, POM替换及摘要计算交给CPU进程池
+    :param cpu_processes: int hybrid执行器的CPU进程数
+    :param replicas: list 可选, 额外的目标 [(名称, Repository类)], 每个资源只下载一次, 同时上传至所有目标
+    :param logger: logging.logger类 日志记录器
+    :return: tuple (是否已派发全部组件, 失败的组件数), 排空或分片租约失效时前者为False
+    """
+    global _task
+    logger = logger if logger else Log().logger
+    yml, func, args = _prepare_maven2(src_repo, dst_repo, config, logger)
+    if func is None:
+        return False, 0
+    fanout = None
+    if replicas:
+        fanout = _prepare_fanout(dst_repo, replicas, yml, logger)
+        func, args = migrate_maven_release_fanout, (
+            fanout, yml.get("excludes", []), yml.get("tmp_dir"), logger)
+    components = _select_components(src_repo, yml, shard, logger)
+    if coordinator:
+        finished = coordinator.completed()
+        if finished:
+            logger.info(f"分片[{shard.index}/{shard.total}]已完成{len(finished)}个组件, 跳过")
+        components = (c for c in components if Shard.key(c) not in finished)
+    if checkpoint and checkpoint.completed:
+        logger.info(f"检查点已完成{len(checkpoint.completed)}个组件, 跳过")
+        components = (c for c in components if Shard.key(c) not in checkpoint)
+    scheduler = Scheduler(schedule, processes, logger=logger)
+    tracker = None
+    if fanout:
+        # 副本目标异步上传, 全部目标成功后才记入检查点及协调器
+        tracker = fanout.track(
+            lambda key: _component_done(key, coordinator, checkpoint),
+            lambda key, error: _component_failed(key, error, coordinator, logger))
+    if executor == HYBRID:
+        # 在当前进程的线程中执行, 直接使用已有的限流器, 临时存储及记录器
+        _task = (func, args)
+        pool = HybridPool(
+            controller.maximum if controller else processes, cpu_processes, logger=logger)
+    else:
+        pool = _worker_pool(
+            controller.maximum if controller else processes, (func, args), yml, logger)
+    completed = True
+    for component in scheduler.order(components):
+        if controller and not controller.acquire():
+            completed = False
+            break
+        if coordinator and coordinator.lost:
+            # 分片已转交其他节点, 不再与新的持有者重复迁移
+            if controller:
+                controller.release()
+            completed = False
+            break
+        scheduler.submit(component)
+        callback, error_callback = _completion_callbacks(
+            scheduler, Shard.key(component), coordinator, controller, checkpoint, logger, fanout)
+        pool.apply_async(
+            run_task,
+            args=(component,),
+            callback=callback,
+            error_callback=error_callback)
+    scheduler.close()
+    pool.close()
+    # 工作进程退出前等待其副本目标的积压上传完成
+    pool.join()
+    failed = scheduler.failed
+    if fanout:
+        # hybrid执行器在当前进程中上传副本
+        fanout.close()
+        fanout.finish()
+        failed += tracker.failures
+    if checkpoint:
+        checkpoint.flush()
+    scheduler.report()
+    pool.report()
+    NexusAuth.report(logger)
+    if fanout:
+        fanout.report()
+    if failed:
+        logger.warning(f"{failed}个组件迁移失败, 可再次迁移或使用audit命令核对")
+    return completed, failed
+
+
+def replicate_maven2_repository(
+        src_repo: Nexus.Repository,
+        dst_repo: Nexus.Repository,
+        config: str,
+        processes: int = DEFAULT_POOL,
+        host: str = "0.0.0.0",
+        port: int = 8766,
+        secret: str = None,
+        logger: logging.Logger = None,
+        **kwargs):
+    """
+    持续同步maven2存储库: 接收源Nexus的Webhook, 仅迁移发生变化的组件, 并定期低速对账
+    事件及对账应用maven.yaml中的过滤规则及快照保留策略
+    :param src_repo: Repository类 源存储库实例
+    :param dst_repo: Repository类 目标存储库实例
+    :param config: str maven.yaml配置文件路径
+    :param processes: int 进程数
+    :param host: str Webhook监听地址
+    :param port: int Webhook监听端口
+    :param secret: str 可选, Webhook密钥
+    :param logger: logging.logger类 日志记录器
+    :param kwargs: 其他参数, 参考Replicator:
+     - debounce: float 防抖秒数
+     - reconcile_interval: float 对账间隔秒数
+     - reconcile_delay: float 对账时每页之间的等待秒数
+    :return: None
+    """
+    logger = logger if logger else Log().logger
+    yml, func, args = _prepare_maven2(src_repo, dst_repo, config, logger)
+    if func is None:
+        return
+    pool = _worker_pool(processes, (func, args), yml, logger)
+
+    def failed(error):
+        logger.error(f"同步组件失败: {error}")
+
+    def submit(component):
+        pool.apply_async(run_task, args=(component,), error_callback=failed)
+
+    replicator = Replicator(
+        src_repo, dst_repo, submit, secret=secret,
+        filters=yml.get("filters"),
+        snapshot_policy=yml.get("snapshot_policy"),
+        tmp_dir=yml.get("tmp_dir"),
+        logger=logger, **kwargs)
+    try:
+        replicator.serve(host, port)
+    finally:
         pool.close()
         pool.join()
+        pool.report()
+
+
+def loadtest_maven2_repository(
+        dst_repo: Nexus.Repository,
+        levels: list = None,
+        count: int = DEFAULT_COUNT,
+        sizes: str = DEFAULT_SIZES,
+        cleanup: bool = False,
+        logger: logging.Logger = None):
+    """
+    使用合成组件压测目标maven2存储库的写入能力, 依次测量各并发级别的吞吐量及延迟
+    上传路径与迁移生产组件相同, 限流配置同样生效
+    :param dst_repo: Repository类 目标存储库实例, 需为RELEASE版本策略
+    :param levels: list 并发级别列表
+    :param count: int 每个并发级别上传的组件数
+    :param sizes: str jar大小分布, 参考utils.loadtest.parse_sizes
+    :param cleanup: bool 结束后是否删除合成组件
+    :param logger: logging.logger类 日志记录器
+    :return: LoadTester类
+    """
+    logger = logger if logger else Log().logger
+    tester = LoadTester(sizes, count, logger=logger)
+    logger.info(f"开始压测[{dst_repo.name}], 合成组件组ID前缀: {tester.group}")
+    try:
+        for level in sorted(set(levels if levels else DEFAULT_LEVELS)):
+            components = tester.generate(level)
+            pool = Pool(
+                level,
+                initializer=init_worker,
+                initargs=(Limiter.registry(), Log().worker_config, Spool.current(),
+                          Nexus.credentials(), Tracer.current(),
+                          (upload_synthetic_component, (dst_repo,)), NexusAuth.stats))
+            start = time.perf_counter()
+            results = pool.map(run_task, components, chunksize=1)
+            elapsed = time.perf_counter() - start
+            pool.close()
+            pool.join()
+            tester.record(level, elapsed, results)
+        tester.report()
+    finally:
+        if cleanup:
+            tester.cleanup(dst_repo)
+    return tester
+
+
+def audit_maven2_repository(
+        src_repo: Nexus.Repository,
+        dst_repo: Nexus.Repository,
+        config: str,
+        sample: int = DEFAULT_SAMPLE,
+        partitions: int = DEFAULT_PARTITIONS,
+        report: str = None,
+        shard: Shard = None,
+        logger: logging.Logger = None):
+    """
+    审计迁移结果: 并行列出两侧的资源, 按GAV及路径比对, 报告缺失, 多余及校验和不一致的资源
+    两侧的组件与迁移时一致, 应用相同的过滤规则, 快照保留策略及分片, excludes中的拓展名不参与审计
+    目标中不在迁移范围内的组件(例如其他分片或被过滤的组件)不会被报告为多余
+    :param src_repo: Repository类 源存储库实例
+    :param dst_repo: Repository类 目标存储库实例
+    :param config: str maven.yaml配置文件路径
+    :param sample: int 随机抽样下载比对内容的资源数, 0为不抽样
+    :param partitions: int 分区数, 决定内存占用
+    :param report: str 可选, 问题明细的输出路径
+    :param shard: Shard类 仅审计属于该分片的组件
+    :param logger: logging.logger类 日志记录器
+    :return: Auditor类
+    """
+    logger = logger if logger else Log().logger
+    with open(config, "r", encoding="utf-8") as conf:
+        yml = yaml.safe_load(conf)
+    # 配置了pom_url_mapping时POM在迁移时被修改, 仅比对存在性
+    auditor = Auditor(
+        partitions, sample,
+        excludes=yml.get("excludes", []),
+        skip_checksum=["pom"] if yml.get("pom_url_mapping") else [],
+        report=report,
+        tmp_dir=yml.get("tmp_dir"),
+        logger=logger)
+    logger.info(f"审计 [{src_repo.name}] -> [{dst_repo.name}]")
+    if src_repo.maven_version_policy == "SNAPSHOT":
+        logger.warning("快照组件由Maven客户端重新部署, 目标的时间戳版本与源不同, 将被报告为缺失及多余")
+    auditor.run(
+        _select_components(src_repo, yml, shard, logger),
+        _select_components(dst_repo, yml, shard, logger),
+        source_auth=getattr(src_repo, "auth", None),
+        target_auth=getattr(dst_repo, "auth", None))
+    return auditor
+
+
+def _imap_bounded(pool, func, iterable, limit: int):
+    """
+    与Pool.imap_unordered相同, 但限制已派发未取回的任务数, 避免一次性读取全部输入
+    :param pool: Pool或ThreadPool
+    :param func: function 任务函数
+    :param iterable: Iterable 输入
+    :param limit: int 最多同时派发的任务数
+    :return: generator
+    """
+    slots = threading.BoundedSemaphore(limit)
+
+    def feed():
+        for item in iterable:
+            slots.acquire()
+            yield item
+
+    for result in pool.imap_unordered(func, feed()):
+        slots.release()
+        yield result
+
+
+def export_maven2_repository(
+        src_repo: Nexus.Repository,
+        config: str,
+        directory: str,
+        processes: int = DEFAULT_POOL,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        shard: Shard = None,
+        logger: logging.Logger = None):
+    """
+    将maven2存储库导出为离线包, 每个线程写入各自的分块文件, 内存占用与存储库大小无关
+    单个组件失败时记录日志并计数, 不写入索引, 继续导出其他组件
+    :param src_repo: Repository类 源存储库实例
+    :param config: str maven.yaml配置文件路径
+    :param directory: str 离线包目录
+    :param processes: int 并发下载数
+    :param chunk_size: int or str 单个分块文件的大小上限
+    :param shard: Shard类 仅导出属于该分片的组件
+    :param logger: logging.logger类 日志记录器
+    :return: tuple (Bundle类, 失败的组件数)
+    """
+    logger = logger if logger else Log().logger
+    with open(config, "r", encoding="utf-8") as conf:
+        yml = yaml.safe_load(conf)
+    excludes = yml.get("excludes", [])
+    bundle = Bundle(directory, chunk_size, logger=logger).open()
+    components = 0
+    failed = 0
+    size = 0
+
+    def export(component):
+        try:
+            return bundle.add(component, excludes)
+        except Exception as e:
+            logger.error(f"导出组件[{Shard.key(component)}]失败: {type(e).__name__}: {e}")
+            return None
+
+    try:
+        with ThreadPool(processes) as pool:
+            for written in _imap_bounded(
+                    pool,
+                    export,
+                    _select_components(src_repo, yml, shard, logger),
+                    processes * 2):
+                if written is None:
+                    failed += 1
+                    continue
+                components += 1
+                size += written
+                if components % 1000 == 0:
+                    logger.info(f"已导出{components}个组件, {size}字节")
+    finally:
+        bundle.close()
+    logger.info(f"导出完成: {components}个组件, {size}字节 -> {directory}")
+    if failed:
+        logger.warning(f"{failed}个组件导出失败, 未写入离线包, 可再次导出")
+    return bundle, failed
+
+
+def import_maven2_repository(
+        dst_repo: Nexus.Repository,
+        config: str,
+        directory: str,
+        processes: int = DEFAULT_POOL,
+        logger: logging.Logger = None):
+    """
+    将离线包导入maven2存储库, 各进程按偏移量并发读取分块文件
+    :param dst_repo: Repository类 目标存储库实例
+    :param config: str maven.yaml配置文件路径
+    :param directory: str 离线包目录
+    :param processes: int 进程数
+    :param logger: logging.logger类 日志记录器
+    :return: None
+    """
+    logger = logger if logger else Log().logger
+    with open(config, "r", encoding="utf-8") as conf:
+        yml = yaml.safe_load(conf)
+    tmp_dir = yml.get("tmp_dir")
+    url_mapping = yml.get("pom_url_mapping")
+    Spool.install(Spool(tmp_dir, **(yml.get("spool") or {})))
+    setting, snapshot_id = None, None
+    if dst_repo.maven_version_policy == "SNAPSHOT":
+        setting = os.path.join(os.path.dirname(config), yml.get("settings"))
+        if not os.path.exists(setting):
+            raise MissingMavenSettingError("Missing the maven client settings.xml")
+        snapshot_id = yml.get("snapshot_id")
+        if not snapshot_id:
+            raise MissingSnapshotIdError(
+                "Missing the id in {setting.xml}/settings/servers/server, "
+                "which was used for upload snapshots.")
+    environment = _maven_environment(setting, yml, logger) if setting else None
+    bundle = Bundle(directory, logger=logger)
+    args = (dst_repo, bundle, url_mapping, setting, snapshot_id, tmp_dir, logger, environment)
+    scheduler = Scheduler(Scheduler.LISTING, processes, logger=logger)
+    pool = _worker_pool(processes, (import_maven_component, args), yml, logger)
+    # 限制已派发未完成的条目数, 使内存占用与索引大小无关
+    slots = threading.BoundedSemaphore(processes * 2)
+
+    def done(result):
+        scheduler.done(result)
+        slots.release()
+
+    for entry in bundle.entries():
+        slots.acquire()
+        scheduler.submit(BundleComponent(entry))
+        pool.apply_async(
+            run_task,
+            args=(entry,),
+            callback=done,
+            error_callback=done)
+    scheduler.close()
+    pool.close()
+    pool.join()
+    scheduler.report()
+    pool.report()
+
+
+def import_maven_component(
+        entry: dict,
+        repository: Nexus.Repository,
+        bundle: Bundle,
+        url_mapping: dict,
+        setting: str = None,
+        snapshot_id: str = None,
+        tmp_dir: str = None,
+        logger: logging.Logger = None,
+        environment: MavenEnvironment = None):
+    """
+    将离线包中的组件上传至存储库
+    :param entry: dict 离线包索引中的组件条目
+    :param repository: Repository类 迁移的目标存储库实例
+    :param bundle: Bundle类 离线包
+    :param url_mapping: dict 用于替换pom文件的URL地址映射字典
+    :param setting: str 快照存储库使用的maven配置文件路径
+    :param snapshot_id: str 用于上传snapshots的配置ID
+    :param tmp_dir: str 临时存储目录
+    :param logger: logging.logger类 日志记录器
+    :param environment: MavenEnvironment类 隔离的maven运行环境
+    :return: None
+    """
+    logger = logger if logger else Log().logger
+    component = BundleComponent(entry)
+    members = bundle.members(entry)
+    with Spool.current(tmp_dir).session() as session:
+        if setting:
+            # 快照需要通过maven客户端部署, 先还原为文件
+            session.reserve(sum(member.size for member in members))
+            assets = []
+            for member in members:
+                path = os.path.join(session.path, member.name)
+                with open(path, "wb") as f:
+                    member.copy_to(f)
+                assets.append(path)
+            _deploy_snapshot(component, repository, assets, setting,
+                             snapshot_id, url_mapping, environment)
+        else:
+            fileobjs = []
+            for member in members:
+                f = member
+                # pom文件需要修改对应地址, 复制到临时文件后修改
+                if member.extension == "pom":
+                    session.reserve(member.size)
+                    f = session.file()
+                    member.copy_to(f)
+                    replace_pom(f, "url", url_mapping)
+                    f.seek(0)
+                fileobjs.append((member.name, member.extension, f))
+            repository.upload_component(_release_files(component, fileobjs))
+    logger.info(f"已上传[{component.name}]")
+
+
+class BundleComponent(object):
+    """离线包中的组件"""
+
+    __slots__ = ("group", "name", "version", "size")
+
+    def __init__(self, entry: dict):
+        """
+        初始化
+        :param entry: dict 离线包索引中的组件条目
+        """
+        self.group = entry["group"]
+        self.name = entry["name"]
+        self.version = entry["version"]
+        self.size = sum(asset[2] for asset in entry["assets"])
+
+
+def _worker_pool(processes: int, task: tuple, yml: dict, logger: logging.Logger):
+    """
+    创建迁移进程池, 按maven.yaml的workers配置回收工作进程
+    迁移函数及其参数每个进程只传递一次, 任务只传递组件的精简记录
+    :param processes: int 进程数
+    :param task: tuple (迁移函数, 除组件外的参数)
+    :param yml: dict maven.yaml配置字典
+    :param logger: logging.logger类 日志记录器
+    :return: WorkerPool类
+    """
+    return WorkerPool(
+        processes,
+        initializer=init_worker,
+        initargs=(Limiter.registry(), Log().worker_config, Spool.current(),
+                  Nexus.credentials(), Tracer.current(), task, NexusAuth.stats),
+        logger=logger,
+        **(yml.get("workers") or {}))
+
+
+def init_worker(
+        limiters: dict,
+        log_config: dict,
+        spool: Spool,
+        credentials: dict = None,
+        tracer: Tracer = None,
+        task: tuple = None,
+        auth_stats: AuthStats = None):
+    """
+    进程池初始化函数, 在子进程中安装父进程共享的资源
+    :param limiters: dict 端点限流器, 由Limiter.registry()返回
+    :param log_config: dict 日志队列配置, 由Log().worker_config返回
+    :param spool: Spool类 临时存储管理器
+    :param credentials: dict 认证信息, 由Nexus.credentials()返回
+    :param tracer: Tracer类 时间线记录器, 未启用时为None
+    :param task: tuple (迁移函数, 除组件外的参数), 供run_task使用
+    :param auth_stats: AuthStats类 认证统计, 即父进程的NexusAuth.stats
+    :return: None
+    """
+    global _task
+    # 运行时控制信号仅由主进程处理
+    Controller.reset_signals()
+    Limiter.install(limiters)
+    Log.install(log_config)
+    Spool.install(spool)
+    Nexus.install(credentials or {})
+    NexusAuth.install(auth_stats)
+    Tracer.install(tracer)
+    _task = task
+
+
+def run_task(component: Nexus.Component):
+    """
+    在子进程中使用已安装的迁移函数及参数迁移组件
+    :param component: Component类 需要迁移的component实例
+    :return: object 迁移函数的返回值
+    """
+    func, args = _task
+    tracer = Tracer.current()
+    if tracer is None:
+        return func(component, *args)
+    # 离线包导入时为索引条目字典
+    name = component["name"] if isinstance(component, dict) else component.name
+    with tracer.task(func.__name__, component=name):
+        return func(component, *args)
+
+
+def _completion_callbacks(
+        scheduler: Scheduler,
+        key: str,
+        coordinator: CoordinatorClient = None,
+        controller: Controller = None,
+        checkpoint: Checkpoint = None,
+        logger: logging.Logger = None,
+        fanout: FanOut = None):
+    """
+    生成组件成功及失败的回调, 通知调度器, 控制器, 协调器及检查点
+    :param scheduler: Scheduler类 调度器
+    :param key: str 组件键
+    :param coordinator: CoordinatorClient类 协调器客户端
+    :param controller: Controller类 运行时控制器
+    :param checkpoint: Checkpoint类 检查点
+    :param logger: logging.logger类 日志记录器
+    :param fanout: FanOut类 多目标分发器, 提供时成功回调只记录主目标, 由其汇总所有目标后通知协调器及检查点
+    :return: tuple (成功回调, 失败回调)
+    """
+    logger = logger if logger else Log().logger
+
+    def callback(result):
+        scheduler.done(result)
+        if controller:
+            controller.release()
+        if fanout:
+            fanout.complete(key)
+        else:
+            _component_done(key, coordinator, checkpoint)
+
+    def error_callback(error):
+        logger.error(f"迁移组件[{key}]失败: {type(error).__name__}: {error}")
+        scheduler.done(error)
+        if controller:
+            controller.release()
+        _component_failed(key, f"{type(error).__name__}: {error}", coordinator)
+    return callback, error_callback
+
+
+def _component_done(key: str, coordinator: CoordinatorClient = None, checkpoint: Checkpoint = None):
+    """
+    组件已迁移至所有目标, 通知协调器及检查点
+    :param key: str 组件键
+    :param coordinator: CoordinatorClient类 协调器客户端
+    :param checkpoint: Checkpoint类 检查点
+    :return: None
+    """
+    if coordinator:
+        coordinator.complete(key)
+    if checkpoint:
+        checkpoint.done(key)
+
+
+def _component_failed(
+        key: str,
+        error: str,
+        coordinator: CoordinatorClient = None,
+        logger: logging.Logger = None):
+    """
+    组件迁移失败, 通知协调器, 释放分片时上报并由协调器重新分配
+    :param key: str 组件键
+    :param error: str 错误信息
+    :param coordinator: CoordinatorClient类 协调器客户端
+    :param logger: logging.logger类 日志记录器, 提供时记录错误
+    :return: None
+    """
+    if logger:
+        logger.error(f"迁移组件[{key}]失败: {error}")
+    if coordinator:
+        coordinator.fail(key, error)
+
+
+def iter_components(repository: Nexus.Repository, params: dict = None):
+    """
+    遍历存储库的所有组件
+    :param repository: Repository类 存储库实例
+    :param params: dict 可选, 搜索参数, 提供时通过搜索接口由服务端过滤
+    :return: generator
+    """
+    getters = repository.search(**params) if params \
+        else repository.iter_component_getter
+    for getter in getters:
+        for component in getter.components:
+            yield component
 
 
 def migrate_maven_release_component(
@@ -89,7 +826,7 @@ def migrate_maven_release_component(
         url_mapping: dict,
         excludes: Iterable = None,
         tmp_dir: str = None,
-        logger: Log().logger = Log().logger):
+        logger: logging.Logger = None):
     """
     迁移生产组件
     :param component: Component类 需要迁移的component实例
@@ -101,40 +838,136 @@ def migrate_maven_release_component(
     :return: None
     """
     excludes = excludes if excludes else []
-    tmp_dir = tmp_dir if tmp_dir else tempfile.mkdtemp()
+    logger = logger if logger else Log().logger
+    # 无论成功或失败, 退出时均清理临时文件
+    assets = [asset for asset in component.assets
+              # 排除自动生成文件
+              if asset.extension not in excludes]
+    with Spool.current(tmp_dir).session() as session:
+        session.reserve(sum(asset.size or 0 for asset in assets))
+
+        def fetch(asset):
+            if asset.size and asset.size >= asset.RANGE_THRESHOLD:
+                # 大文件分段并发下载至临时目录
+                f = session.open(asset.download(session.path), "r+b")
+            else:
+                # 小文件保存在内存中, 超过阈值时写入临时目录
+                f = session.file()
+                written = asset.copy_to(f)
+                if asset.size is None:
+                    session.reserve(written, block=False)
+            # pom文件需要修改对应地址
+            if asset.extension == "pom":
+                replace_pom(f, "url", url_mapping)
+            f.seek(0)
+            return asset.name, asset.extension, f
+
+        fileobjs = []
+        if assets:
+            # 同一组件的资源并发下载
+            with ThreadPool(min(len(assets), component.PARALLEL_ASSETS)) as pool:
+                fileobjs = pool.map(fetch, assets)
+        repository.upload_component(_release_files(component, fileobjs))
+    logger.info(f"已上传[{component.name}]")
+
+
+def _release_files(component, fileobjs: list):
+    """
+    构造上传生产组件的表单数据
+    :param component: Component类或包含group, name, version的对象
+    :param fileobjs: list (文件名, 拓展名, 文件对象)
+    :return: dict
+    """
     files = {
         "maven2.groupId": (None, component.group),
         "maven2.artifactId": (None, component.name),
         "maven2.version": (None, component.version)
     }
-    num = 0
-    _dir = ""
-    for asset in component.assets:
-        # 排除自动生成文件
-        if asset.extension in excludes:
-            continue
-        num += 1
-        # pom文件需要执行下载并修改对应目录
-        if asset.extension == "pom":
-            os.makedirs(tmp_dir, exist_ok=True)
-            _dir = tempfile.mkdtemp(dir=tmp_dir)
-            pom = POM(asset.download(_dir))
-            pom.replace("url", url_mapping)
-            files[f"maven2.asset{num}"] = (asset.name, open(pom.path, "rb"))
-        else:
-            files[f"maven2.asset{num}"] = (asset.name, asset.stream)
-        files[f"maven2.asset{num}.extension"] = (None, asset.extension)
-        # 如果是sources文件, 则需要添加classifier
-        if asset.extension == "jar" and "sources" in asset.name:
-            files[f"maven2.asset{num}.classifier"] = (None, "sources")
     # 检查asset数量
-    if num > 3:
+    if len(fileobjs) > 3:
         msg = f"组件[{component.name}]的资源数量超过3, 无法上传!"
         raise AssetExceedMaximum(msg)
-    repository.upload_component(files)
-    if os.path.exists(_dir):
-        rmtree(_dir)
-    logger.info(f"已上传[{component.name}]")
+    for num, (name, extension, f) in enumerate(fileobjs, 1):
+        files[f"maven2.asset{num}"] = (name, f)
+        files[f"maven2.asset{num}.extension"] = (None, extension)
+        # 如果是sources文件, 则需要添加classifier
+        if extension == "jar" and "sources" in name:
+            files[f"maven2.asset{num}.classifier"] = (None, "sources")
+    return files
+
+
+def upload_synthetic_component(
+        component: SyntheticComponent,
+        repository: Nexus.Repository):
+    """
+    生成并上传一个合成组件, 用于压测
+    :param component: SyntheticComponent类 合成组件
+    :param repository: Repository类 目标存储库实例
+    :return: tuple (GAV, 上传耗时, 字节数, 错误信息或None)
+    """
+    pom = component.pom()
+    jar = component.jar()
+    size = len(pom) + jar.getbuffer().nbytes
+    fileobjs = [(f"{component.name}-{component.version}.jar", "jar", jar),
+                (f"{component.name}-{component.version}.pom", "pom", pom)]
+    start = time.perf_counter()
+    try:
+        repository.upload_component(_release_files(component, fileobjs))
+    except Exception as e:
+        return component.gav, time.perf_counter() - start, size, f"{type(e).__name__}: {e}"
+    return component.gav, time.perf_counter() - start, size, None
+
+
+def migrate_maven_release_fanout(
+        component: Nexus.Component,
+        fanout: FanOut,
+        excludes: Iterable = None,
+        tmp_dir: str = None,
+        logger: logging.Logger = None):
+    """
+    迁移生产组件至多个目标, 每个资源只下载一次
+    大文件下载至临时目录, 每个目标各自打开; 小文件保存在内存中共用; POM按各目标的映射分别替换
+    :param component: Component类 需要迁移的component实例
+    :param fanout: FanOut类 多目标分发器
+    :param excludes: Iterable 可迭代对象, 包含排除拓展名文件
+    :param tmp_dir: str 临时存储目录
+    :param logger: logging.logger类 日志记录器
+    :return: None
+    """
+    excludes = excludes if excludes else []
+    logger = logger if logger else Log().logger
+    assets = [asset for asset in component.assets
+              if asset.extension not in excludes]
+    with Spool.current(tmp_dir).session() as session:
+        session.reserve(sum(asset.size or 0 for asset in assets))
+
+        def fetch(asset):
+            if asset.size and asset.size >= asset.RANGE_THRESHOLD:
+                return asset.name, asset.extension, asset.download(session.path)
+            f = session.file()
+            written = asset.copy_to(f)
+            if asset.size is None:
+                session.reserve(written, block=False)
+            f.seek(0)
+            return asset.name, asset.extension, f.read()
+
+        payloads = []
+        if assets:
+            with ThreadPool(min(len(assets), component.PARALLEL_ASSETS)) as pool:
+                payloads = pool.map(fetch, assets)
+
+        def build(target):
+            fileobjs = []
+            for name, extension, data in payloads:
+                f = session.open(data, "rb") if isinstance(data, str) else io.BytesIO(data)
+                if extension == "pom":
+                    f = io.BytesIO(f.read())
+                    replace_pom(f, "url", target.url_mapping)
+                fileobjs.append((name, extension, f))
+            return _release_files(component, fileobjs)
+
+        fanout.deliver(Shard.key(component), build, session)
+    logger.info(f"已上传[{component.name}]至{fanout.primary.name}, {len(fanout.replicas)}个额外目标异步上传")
 
 
 def migrate_maven_snapshot_component(
@@ -145,7 +978,8 @@ def migrate_maven_snapshot_component(
         url_mapping: dict,
         excludes: Iterable = None,
         tmp_dir: str = None,
-        logger: Log().logger = Log().logger):
+        logger: logging.Logger = None,
+        environment: MavenEnvironment = None):
     """
     迁移快照maven组件
     :param component: Component类 需要迁移的component实例
@@ -156,12 +990,41 @@ def migrate_maven_snapshot_component(
     :param excludes: Iterable 可迭代对象, 包含排除拓展名文件
     :param tmp_dir: str 临时存储目录
     :param logger: logging.logger类 日志记录器
+    :param environment: MavenEnvironment类 隔离的maven运行环境, 为None时使用共用的本地仓库
     :return: None
     """
     excludes = excludes if excludes else []
-    tmp_dir = tmp_dir if tmp_dir else tempfile.mkdtemp()
-    # 下载资源并获取资源文件路径列表
-    assets = component.download(tmp_dir, excludes)
+    logger = logger if logger else Log().logger
+    with Spool.current(tmp_dir).session() as session:
+        session.reserve(sum(
+            asset.size or 0 for asset in component.assets
+            if asset.extension not in excludes))
+        # 下载资源并获取资源文件路径列表
+        assets = component.download(session.path, excludes)
+        _deploy_snapshot(component, repository, assets, setting, snapshot_id,
+                         url_mapping, environment)
+    logger.info(f"已上传[{component.name}]")
+
+
+def _deploy_snapshot(
+        component: Nexus.Component,
+        repository: Nexus.Repository,
+        assets: list,
+        setting: str,
+        snapshot_id: str,
+        url_mapping: dict,
+        environment: MavenEnvironment = None):
+    """
+    使用maven客户端部署已下载的快照组件
+    :param component: Component类 需要迁移的component实例
+    :param repository: Repository类 迁移的目标存储库实例
+    :param assets: list 已下载的资源文件路径
+    :param setting: str 配置文件的路径
+    :param snapshot_id: str 用于上传snapshots的配置ID
+    :param url_mapping: dict 用于替换pom文件的URL地址映射字典
+    :param environment: MavenEnvironment类 隔离的maven运行环境
+    :return: None
+    """
     # 构造参数字典
     args_dict = {
         "-DgroupId": component.group,
@@ -178,12 +1041,16 @@ def migrate_maven_snapshot_component(
             else:
                 args_dict["-Dfile"] = asset
         elif asset.endswith(".pom"):
-            pom = POM(asset)
-            pom.replace("url", url_mapping)
+            replace_pom(asset, "url", url_mapping)
             args_dict["-DpomFile"] = asset
-    maven = MavenClient(setting=setting)
+    if environment is not None:
+        maven = environment.client()
+    else:
+        maven = MavenClient(setting=setting)
     maven.args = [f"{k}={v}" for k, v in args_dict.items()]
     if "-Dfile" in args_dict.keys():
-        maven.deploy()
-    rmtree(component.directory)
-    logger.info(f"已上传[{component.name}]")
+        limiter = Limiter.get(repository.api_url)
+        with limiter.upload():
+            limiter.request()
+            limiter.transfer(sum(os.path.getsize(asset) for asset in assets))
+            maven.deploy()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: inventory.py
+@time: 2026/10/19 10:30 下午
+"""
+
+__version__ = (0, 0, 1)
+__update_str__ = "初始创建, 存储库清单快照的保存, 增量刷新及查询"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import gzip
+import json
+import logging
+import os
+import struct
+from collections import defaultdict
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+
+from utils.classes import Nexus, Log, ComponentRecord, AssetRecord
+from utils.filters import parse_date
+
+MAGIC = b"NMTINV01"
+FRAME = struct.Struct(">I")
+CHECKSUMS = ["sha1", "md5"]
+BATCH_SIZE = 100
+AGGREGATIONS = ["group", "name", "version", "extension", "repository"]
+
+
+class Inventory(object):
+    """存储库清单快照"""
+
+    def __init__(self, path: str, logger: logging.Logger = None):
+        """
+        初始化
+        文件为gzip压缩的长度前缀帧: 头部(字典), 每个组件一帧(数组), 尾部(字典, 包含统计)
+        组件帧: [id, group, name, version, [[资源id, 路径, 大小, sha1, md5, 修改时间, 下载地址]]]
+        下载地址与 存储库地址/路径 相同时省略
+        :param path: str 快照文件路径
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.path = path
+        self.logger = logger if logger else Log().logger
+        self._header = None
+        self._footer = None
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def exists(self):
+        """
+        快照文件是否存在
+        :return: bool
+        """
+        return os.path.exists(self.path)
+
+    @property
+    def header(self):
+        """
+        返回头部信息: 存储库名称, 格式, 下载地址前缀, 创建时间
+        :return: dict
+        """
+        if self._header is None:
+            with gzip.open(self.path, "rb") as f:
+                self._header = self._read_header(f)
+        return self._header
+
+    @property
+    def footer(self):
+        """
+        返回尾部统计: 组件数, 资源数, 字节数, 以及刷新时的变化数
+        需要读取整个文件
+        :return: dict
+        """
+        if self._footer is None:
+            for _ in self.records():
+                pass
+        return self._footer
+
+    @staticmethod
+    def _write_frame(f, data):
+        body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        f.write(FRAME.pack(len(body)))
+        f.write(body)
+
+    @staticmethod
+    def _read_frame(f):
+        prefix = f.read(FRAME.size)
+        if len(prefix) < FRAME.size:
+            return None
+        (length,) = FRAME.unpack(prefix)
+        return json.loads(f.read(length))
+
+    def _read_header(self, f):
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{self.path} is not an inventory snapshot")
+        return self._read_frame(f)
+
+    @staticmethod
+    def _encode(record: ComponentRecord, base: str):
+        """
+        将组件记录编码为紧凑的数组
+        :param record: ComponentRecord 精简记录
+        :param base: str 下载地址前缀
+        :return: list
+        """
+        assets = []
+        for asset in record.assets:
+            checksum = asset.checksum or {}
+            download_url = asset.download_url
+            if download_url == base + (asset.path or ""):
+                download_url = None
+            assets.append([asset.id, asset.path, asset.size,
+                           checksum.get("sha1"), checksum.get("md5"),
+                           asset.last_modified, download_url])
+        return [record.id, record.group, record.name, record.version, assets]
+
+    def _decode(self, row: list):
+        """
+        将数组解码为组件记录
+        :param row: list 组件帧
+        :return: ComponentRecord
+        """
+        repository = self.header.get("repository")
+        fmt = self.header.get("format")
+        base = self.header.get("download_base", "")
+        id, group, name, version, assets = row
+        records = []
+        for asset_id, path, size, sha1, md5, last_modified, download_url in assets:
+            checksum = {k: v for k, v in zip(CHECKSUMS, [sha1, md5]) if v}
+            records.append(AssetRecord(
+                asset_id, path, repository, fmt,
+                download_url if download_url else base + (path or ""),
+                checksum or None, size, last_modified))
+        return ComponentRecord(id, repository, fmt, group, name, version, tuple(records))
+
+    def save(self, repository: Nexus.Repository, records=None, previous: dict = None):
+        """
+        列出存储库并保存快照, 先写入临时文件再替换, 中断时不破坏已有快照
+        :param repository: Repository类 存储库实例
+        :param records: Iterable 可选, 组件记录, 默认列出存储库
+        :param previous: dict 可选, 旧快照的 {组件ID: 资源签名}, 用于统计变化
+        :return: dict 尾部统计
+        """
+        if records is None:
+            records = (component.record
+                       for getter in repository.iter_component_getter
+                       for component in getter.components)
+        header = {
+            "repository": repository.name,
+            "format": getattr(repository, "format", None),
+            "download_base": f"{repository.url.rstrip('/')}/" if getattr(repository, "url", None) else "",
+            "created": datetime.now(timezone.utc).isoformat(),
+        }
+        footer = {"components": 0, "assets": 0, "bytes": 0}
+        if previous is not None:
+            footer.update({"added": 0, "changed": 0, "removed": 0})
+        base = header["download_base"]
+        temporary = f"{self.path}.tmp"
+        with gzip.open(temporary, "wb", compresslevel=6) as f:
+            f.write(MAGIC)
+            self._write_frame(f, header)
+            for record in records:
+                row = self._encode(record, base)
+                self._write_frame(f, row)
+                footer["components"] += 1
+                footer["assets"] += len(record.assets)
+                footer["bytes"] += sum(asset.size or 0 for asset in record.assets)
+                if previous is not None:
+                    signature = previous.pop(record.id, None)
+                    if signature is None:
+                        footer["added"] += 1
+                    elif signature != self._signature(row):
+                        footer["changed"] += 1
+                if footer["components"] % 10000 == 0:
+                    self.logger.info(f"已保存{footer['components']}个组件")
+            if previous is not None:
+                footer["removed"] = len(previous)
+            self._write_frame(f, footer)
+        os.replace(temporary, self.path)
+        self._header, self._footer = header, footer
+        self.logger.info(
+            f"清单快照已保存: {self.path}, 组件 {footer['components']}, "
+            f"资源 {footer['assets']}, 字节 {footer['bytes']}")
+        return footer
+
+    @staticmethod
+    def _signature(row: list):
+        """
+        组件的资源签名, 路径, 大小, 校验和或修改时间变化时不同
+        :param row: list 组件帧
+        :return: int
+        """
+        return hash(tuple((a[1], a[2], a[3], a[5]) for a in row[4]))
+
+    def refresh(self, repository: Nexus.Repository):
+        """
+        重新列出存储库并更新快照, 按资源的修改时间, 大小及校验和统计新增, 变化及删除的组件
+        Nexus列表接口不支持按修改时间过滤, 仍需完整列出, 但旧快照仅保留签名, 内存占用与组件数成正比且很小
+        :param repository: Repository类 存储库实例
+        :return: dict 尾部统计
+        """
+        if not self.exists:
+            return self.save(repository)
+        previous = {}
+        with gzip.open(self.path, "rb") as f:
+            self._read_header(f)
+            while True:
+                row = self._read_frame(f)
+                if row is None or isinstance(row, dict):
+                    break
+                previous[row[0]] = self._signature(row)
+        footer = self.save(repository, previous=previous)
+        self.logger.info(
+            f"清单快照已刷新: 新增 {footer['added']}, 变化 {footer['changed']}, "
+            f"删除 {footer['removed']}")
+        return footer
+
+    def records(self):
+        """
+        逐帧读取快照, 不在内存中保留全部记录
+        :return: generator ComponentRecord
+        """
+        with gzip.open(self.path, "rb") as f:
+            self._header = self._read_header(f)
+            while True:
+                row = self._read_frame(f)
+                if row is None:
+                    break
+                if isinstance(row, dict):
+                    self._footer = row
+                    break
+                yield self._decode(row)
+
+    def components(self, repository: Nexus.Repository):
+        """
+        将快照中的记录还原为组件, 可直接交给迁移流程
+        :param repository: Repository类 快照对应的存储库实例, 提供API地址及认证信息
+        :return: generator Component类
+        """
+        for record in self.records():
+            yield Nexus.Component.from_record(repository.api_url, record, repository.auth)
+
+    def query(
+            self,
+            group: str = None,
+            name: str = None,
+            version: str = None,
+            path: str = None,
+            extension: str = None,
+            modified_after=None,
+            modified_before=None,
+            min_size: int = None):
+        """
+        按条件筛选快照中的组件, 字符串条件支持通配符, 资源条件仅保留匹配的资源
+        :param group: str 组ID
+        :param name: str 名称
+        :param version: str 版本
+        :param path: str 资源路径
+        :param extension: str 资源拓展名
+        :param modified_after: str or datetime 资源修改时间不早于该时间
+        :param modified_before: str or datetime 资源修改时间早于该时间
+        :param min_size: int 资源大小不小于该字节数
+        :return: generator ComponentRecord
+        """
+        after, before = parse_date(modified_after), parse_date(modified_before)
+        asset_filter = any(v is not None for v in
+                           [path, extension, after, before, min_size])
+        for record in self.records():
+            if group and not fnmatchcase(record.group or "", group):
+                continue
+            if name and not fnmatchcase(record.name or "", name):
+                continue
+            if version and not fnmatchcase(record.version or "", version):
+                continue
+            if not asset_filter:
+                yield record
+                continue
+            assets = tuple(asset for asset in record.assets
+                           if self._match_asset(asset, path, extension, after, before, min_size))
+            if assets:
+                yield record._replace(assets=assets)
+
+    @staticmethod
+    def _match_asset(asset: AssetRecord, path, extension, after, before, min_size):
+        if path and not fnmatchcase(asset.path or "", path):
+            return False
+        if extension and not fnmatchcase((asset.path or "").split(".")[-1], extension):
+            return False
+        if min_size is not None and (asset.size or 0) < min_size:
+            return False
+        if after or before:
+            modified = Nexus.Asset.parse_time(asset.last_modified)
+            if modified is None:
+                return False
+            if after and modified < after:
+                return False
+            if before and modified >= before:
+                return False
+        return True
+
+    @staticmethod
+    def aggregate(records, by: str = "group"):
+        """
+        按字段汇总组件数, 资源数及字节数
+        :param records: Iterable ComponentRecord, 例如query()的结果
+        :param by: str 汇总字段, 参考AGGREGATIONS, extension按资源汇总
+        :return: dict {值: [组件数, 资源数, 字节数]}
+        """
+        result = defaultdict(lambda: [0, 0, 0])
+        for record in records:
+            if by == "extension":
+                seen = set()
+                for asset in record.assets:
+                    key = (asset.path or "").split(".")[-1]
+                    item = result[key]
+                    if key not in seen:
+                        item[0] += 1
+                        seen.add(key)
+                    item[1] += 1
+                    item[2] += asset.size or 0
+                continue
+            item = result[getattr(record, by)]
+            item[0] += 1
+            item[1] += len(record.assets)
+            item[2] += sum(asset.size or 0 for asset in record.assets)
+        return dict(result)
+
+
+class InventoryComponentGetter(object):
+    """清单快照组件获取器, 对应一批记录"""
+
+    def __init__(self, components: list):
+        """
+        初始化
+        :param components: list Component类
+        """
+        self.components = components
+
+    def __str__(self):
+        return f"<{self.__doc__} Components={len(self.components)}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class InventoryRepository(object):
+    """以清单快照代替列表接口的存储库, 其余属性及方法与原存储库相同"""
+
+    def __init__(self, inventory: Inventory, repository: Nexus.Repository):
+        """
+        初始化
+        :param inventory: Inventory类 清单快照
+        :param repository: Repository类 快照对应的存储库实例
+        """
+        if inventory.header.get("repository") != repository.name:
+            inventory.logger.warning(
+                f"清单快照[{inventory.path}]属于存储库[{inventory.header.get('repository')}], "
+                f"而不是[{repository.name}]")
+        self.inventory = inventory
+        self.repository = repository
+
+    def __getattr__(self, item):
+        return getattr(self.repository, item)
+
+    def __str__(self):
+        return f"<{self.__doc__} Repository={self.repository.name} Path={self.inventory.path}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def iter_component_getter(self):
+        """
+        按批次返回快照中的组件
+        :return: generator InventoryComponentGetter类
+        """
+        batch = []
+        for component in self.inventory.components(self.repository):
+            batch.append(component)
+            if len(batch) >= BATCH_SIZE:
+                yield InventoryComponentGetter(batch)
+                batch = []
+        if batch:
+            yield InventoryComponentGetter(batch)
+
+    def search(self, **params):
+        """
+        快照不支持服务端过滤, 返回全部组件, 由过滤规则在本地过滤
+        :param params: 搜索参数, 忽略
+        :return: generator InventoryComponentGetter类
+        """
+        return self.iter_component_getter
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: lifecycle.py
+@time: 2026/10/19 11:50 下午
+"""
+
+__version__ = (0, 0, 1)
+__update_str__ = "初始创建, 工作进程生命周期管理"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from collections import Counter, deque
+from multiprocessing.connection import wait
+from multiprocessing.pool import MaybeEncodingError
+
+from utils.classes import Log
+from utils.limiter import parse_rate
+from utils.planner import human_bytes
+from utils.exceptions import WorkerLostError
+
+DEFAULT_RETRIES = 2
+RUN, CLOSE, TERMINATE = range(3)
+
+
+def resource_usage():
+    """
+    返回当前进程的常驻内存及打开的文件描述符数
+    Linux读取/proc, 其他平台使用峰值常驻内存及/dev/fd
+    :return: tuple (字节数 or None, 文件描述符数 or None)
+    """
+    rss, fds = None, None
+    try:
+        with open("/proc/self/statm", "r") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # macOS为字节, 其他平台为KB
+            rss = peak if sys.platform == "darwin" else peak * 1024
+        except ImportError:
+            pass
+    for directory in ["/proc/self/fd", "/dev/fd"]:
+        try:
+            # 列出目录本身会占用一个描述符
+            fds = len(os.listdir(directory)) - 1
+            break
+        except OSError:
+            continue
+    return rss, fds
+
+
+class WorkerLimits(object):
+    """工作进程回收阈值"""
+
+    def __init__(self, max_tasks: int = 0, max_rss=0, max_fds: int = 0):
+        """
+        初始化, 任一阈值为0时不限制
+        :param max_tasks: int 每个工作进程处理的任务数上限
+        :param max_rss: int or str 常驻内存上限, 支持K/M/G后缀
+        :param max_fds: int 打开的文件描述符数上限
+        """
+        self.max_tasks = int(max_tasks or 0)
+        self.max_rss = int(parse_rate(max_rss)) if max_rss else 0
+        self.max_fds = int(max_fds or 0)
+
+    def __str__(self):
+        return f"<{self.__doc__} Tasks={self.max_tasks} RSS={self.max_rss} FDs={self.max_fds}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def enabled(self):
+        """
+        是否设置了任一阈值
+        :return: bool
+        """
+        return bool(self.max_tasks or self.max_rss or self.max_fds)
+
+    def exceeded(self, tasks: int, rss: int = None, fds: int = None):
+        """
+        检查是否需要回收
+        :param tasks: int 已处理的任务数
+        :param rss: int 常驻内存字节数
+        :param fds: int 文件描述符数
+        :return: str 回收原因, 无需回收时为None
+        """
+        if self.max_rss and rss and rss >= self.max_rss:
+            return f"RSS {human_bytes(rss)} >= {human_bytes(self.max_rss)}"
+        if self.max_fds and fds and fds >= self.max_fds:
+            return f"文件描述符 {fds} >= {self.max_fds}"
+        if self.max_tasks and tasks >= self.max_tasks:
+            return f"任务数 {tasks} >= {self.max_tasks}"
+        return None
+
+
+def _worker(tasks, results, initializer, initargs, limits: WorkerLimits, inherited: list = None):
+    """
+    工作进程主循环, 每个任务完成后上报资源占用, 超过阈值时在返回结果后退出
+    :param tasks: Connection 接收任务
+    :param results: Connection 发送结果
+    :param initializer: callable 初始化函数
+    :param initargs: tuple 初始化函数参数
+    :param limits: WorkerLimits类 回收阈值
+    :param inherited: list fork时继承的其他工作进程的管道描述符, 关闭后不计入文件描述符数
+    :return: None
+    """
+    for fd in inherited or []:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    if initializer is not None:
+        initializer(*initargs)
+    completed = 0
+    while True:
+        try:
+            job = tasks.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        func, args = job
+        try:
+            result = (True, func(*args))
+        except Exception as e:
+            result = (False, e)
+        completed += 1
+        rss, fds = resource_usage()
+        reason = limits.exceeded(completed, rss, fds)
+        try:
+            results.send((result, completed, rss, fds, reason))
+        except Exception as e:
+            # 结果或异常无法序列化
+            error = MaybeEncodingError(e, result[1])
+            results.send(((False, error), completed, rss, fds, reason))
+        if reason:
+            break
+
+
+class _Job(object):
+    """进程池中的任务"""
+
+    __slots__ = ["func", "args", "callback", "error_callback", "attempts"]
+
+    def __init__(self, func, args: tuple, callback=None, error_callback=None):
+        self.func = func
+        self.args = args
+        self.callback = callback
+        self.error_callback = error_callback
+        self.attempts = 0
+
+    def __str__(self):
+        item = self.args[0] if self.args else None
+        name = item.get("name") if isinstance(item, dict) else getattr(item, "name", None)
+        return name or getattr(self.func, "__name__", "task")
+
+
+class _Worker(object):
+    """进程池中的工作进程"""
+
+    __slots__ = ["process", "tasks", "results", "job", "completed", "rss", "fds",
+                 "retiring"]
+
+    def __init__(self, process, tasks, results):
+        self.process = process
+        self.tasks = tasks
+        self.results = results
+        self.job = None
+        self.completed = 0
+        self.rss = None
+        self.fds = None
+        self.retiring = None
+
+
+class WorkerPool(object):
+    """带生命周期管理的进程池"""
+
+    def __init__(
+            self,
+            processes: int,
+            initializer=None,
+            initargs: tuple = (),
+            max_tasks: int = 0,
+            max_rss=0,
+            max_fds: int = 0,
+            retries: int = DEFAULT_RETRIES,
+            logger: logging.Logger = None):
+        """
+        初始化
+        与multiprocessing.Pool的apply_async/close/join/terminate用法一致, 回调在监控线程中执行
+        每个任务完成后工作进程上报常驻内存及文件描述符数, 超过阈值或任务数上限时返回结果后退出, 由新进程替换
+        工作进程在处理任务时异常退出(例如被OOM终止)时, 任务重新派发, 超过重试次数后以WorkerLostError失败
+        :param processes: int 工作进程数
+        :param initializer: callable 工作进程初始化函数
+        :param initargs: tuple 初始化函数参数
+        :param max_tasks: int 每个工作进程处理的任务数上限, 0为不限制
+        :param max_rss: int or str 工作进程常驻内存上限, 支持K/M/G后缀, 0为不限制
+        :param max_fds: int 工作进程打开的文件描述符数上限, 0为不限制
+        :param retries: int 工作进程异常退出时任务的重新派发次数
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.processes = max(1, processes)
+        self.initializer = initializer
+        self.initargs = initargs
+        self.limits = WorkerLimits(max_tasks, max_rss, max_fds)
+        self.retries = retries
+        self.logger = logger if logger else Log().logger
+        self.events = Counter()
+        self.peak_rss = 0
+        self.peak_fds = 0
+        self._context = multiprocessing.get_context()
+        self._workers = []
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._state = RUN
+        self._serial = 0
+        # 进程池关闭或终止时唤醒监控线程
+        self._wakeup_r, self._wakeup_w = self._context.Pipe(duplex=False)
+        for _ in range(self.processes):
+            self._spawn()
+        self._thread = threading.Thread(target=self._supervise, name="WorkerPool", daemon=True)
+        self._thread.start()
+
+    def __str__(self):
+        return f"<{self.__doc__} Processes={self.processes} Limits={self.limits}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _spawn(self):
+        """
+        创建一个工作进程
+        :return: _Worker类
+        """
+        self._serial += 1
+        task_r, task_w = self._context.Pipe(duplex=False)
+        result_r, result_w = self._context.Pipe(duplex=False)
+        inherited = []
+        if self._context.get_start_method() == "fork":
+            inherited = [self._wakeup_r.fileno(), self._wakeup_w.fileno(),
+                         task_w.fileno(), result_r.fileno()]
+            inherited += [fd for w in self._workers
+                          for fd in (w.tasks.fileno(), w.results.fileno(), w.process.sentinel)]
+        process = self._context.Process(
+            target=_worker, name=f"MigrateWorker-{self._serial}", daemon=True,
+            args=(task_r, result_w, self.initializer, self.initargs, self.limits, inherited))
+        process.start()
+        # 子进程持有的一端在父进程中关闭, 子进程退出时读取端收到EOF
+        task_r.close()
+        result_w.close()
+        worker = _Worker(process, task_w, result_r)
+        self._workers.append(worker)
+        self.events["spawned"] += 1
+        self.logger.debug(f"工作进程[{process.pid}]已启动")
+        return worker
+
+    def _dispatch(self):
+        """
+        将等待中的任务派发给空闲的工作进程, 需持有锁
+        :return: None
+        """
+        for worker in self._workers:
+            if not self._pending:
+                return
+            if worker.job is not None or worker.retiring or not worker.process.is_alive():
+                continue
+            job = self._pending.popleft()
+            job.attempts += 1
+            worker.job = job
+            try:
+                worker.tasks.send((job.func, job.args))
+            except (OSError, ValueError):
+                # 进程已退出, 由监控线程重新派发
+                pass
+
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send_bytes(b"")
+        except OSError:
+            pass
+
+    def apply_async(self, func, args: tuple = (), callback=None, error_callback=None):
+        """
+        异步执行任务
+        :param func: callable 可序列化的函数
+        :param args: tuple 参数
+        :param callback: callable 成功回调, 参数为返回值
+        :param error_callback: callable 失败回调, 参数为异常
+        :return: None
+        """
+        with self._lock:
+            if self._state != RUN:
+                raise ValueError("Pool not running")
+            self._pending.append(_Job(func, args, callback, error_callback))
+            self._dispatch()
+
+    def close(self):
+        """
+        不再接收新任务, 已提交的任务完成后工作进程退出
+        :return: None
+        """
+        with self._lock:
+            if self._state == RUN:
+                self._state = CLOSE
+        self._wakeup()
+
+    def terminate(self):
+        """
+        立即终止所有工作进程, 未完成的任务被丢弃
+        :return: None
+        """
+        with self._lock:
+            self._state = TERMINATE
+            self._pending.clear()
+            for worker in self._workers:
+                worker.process.terminate()
+        self._wakeup()
+
+    def join(self):
+        """
+        等待监控线程及所有工作进程退出
+        :return: None
+        """
+        if self._state == RUN:
+            raise ValueError("Pool is still running")
+        self._thread.join()
+
+    def _finished(self):
+        """
+        是否已关闭且没有未完成的任务, 需持有锁
+        :return: bool
+        """
+        if self._state == TERMINATE:
+            return True
+        return self._state == CLOSE and not self._pending \
+            and all(worker.job is None for worker in self._workers)
+
+    def _receive(self, worker: _Worker):
+        """
+        接收工作进程的结果
+        :param worker: _Worker类
+        :return: tuple (任务, (是否成功, 返回值或异常)) or None
+        """
+        try:
+            result, completed, rss, fds, reason = worker.results.recv()
+        except (EOFError, OSError):
+            return None
+        job, worker.job = worker.job, None
+        worker.completed = completed
+        worker.rss, worker.fds = rss, fds
+        self.peak_rss = max(self.peak_rss, rss or 0)
+        self.peak_fds = max(self.peak_fds, fds or 0)
+        if reason:
+            worker.retiring = reason
+        return job, result
+
+    def _reap(self, worker: _Worker):
+        """
+        处理已退出的工作进程, 重新派发其未完成的任务, 需持有锁
+        :param worker: _Worker类
+        :return: tuple (任务, (False, WorkerLostError)) 超过重试次数时, 否则为None
+        """
+        worker.process.join()
+        worker.tasks.close()
+        worker.results.close()
+        self._workers.remove(worker)
+        pid, exitcode = worker.process.pid, worker.process.exitcode
+        lost = None
+        if worker.retiring:
+            self.events["recycled"] += 1
+            self.logger.info(
+                f"工作进程[{pid}]已回收: {worker.retiring}, 任务 {worker.completed}, "
+                f"RSS {human_bytes(worker.rss or 0)}, 文件描述符 {worker.fds}")
+        elif self._state != TERMINATE:
+            self.events["died"] += 1
+            job = worker.job
+            self.logger.warning(
+                f"工作进程[{pid}]异常退出, 退出码 {exitcode}, 任务 {worker.completed}, "
+                f"最近RSS {human_bytes(worker.rss or 0)}, 文件描述符 {worker.fds}")
+            if job is not None:
+                if job.attempts <= self.retries:
+                    self.events["requeued"] += 1
+                    self.logger.warning(f"重新派发[{job}], 第{job.attempts}次")
+                    self._pending.appendleft(job)
+                else:
+                    error = WorkerLostError(
+                        f"Worker {pid} exited with {exitcode} while processing {job}, "
+                        f"attempts: {job.attempts}")
+                    lost = job, (False, error)
+        if self._state == RUN or (self._state == CLOSE and self._pending):
+            self._spawn()
+        return lost
+
+    @staticmethod
+    def _complete(job: _Job, result: tuple):
+        """
+        执行回调, 不持有锁, 回调中可以提交新任务
+        :param job: _Job类
+        :param result: tuple (是否成功, 返回值或异常)
+        :return: None
+        """
+        success, value = result
+        callback = job.callback if success else job.error_callback
+        if callback is not None:
+            callback(value)
+
+    def _supervise(self):
+        """
+        监控线程: 接收结果, 回收及替换工作进程, 重新派发任务
+        :return: None
+        """
+        while True:
+            with self._lock:
+                if self._finished():
+                    break
+                connections = {worker.results: worker for worker in self._workers}
+                sentinels = {worker.process.sentinel: worker for worker in self._workers}
+            ready = wait(list(connections) + list(sentinels) + [self._wakeup_r])
+            completed = []
+            with self._lock:
+                if self._wakeup_r in ready:
+                    while self._wakeup_r.poll():
+                        self._wakeup_r.recv_bytes()
+                for connection in ready:
+                    worker = connections.get(connection)
+                    if worker is not None and worker in self._workers:
+                        received = self._receive(worker)
+                        if received is not None:
+                            completed.append(received)
+                for sentinel in ready:
+                    worker = sentinels.get(sentinel)
+                    if worker is None or worker not in self._workers:
+                        continue
+                    # 退出前发送的结果
+                    while worker.job is not None and worker.results.poll():
+                        received = self._receive(worker)
+                        if received is None:
+                            break
+                        completed.append(received)
+                    lost = self._reap(worker)
+                    if lost is not None:
+                        completed.append(lost)
+                self._dispatch()
+            for job, result in completed:
+                self._complete(job, result)
+        self._shutdown()
+
+    def _shutdown(self):
+        """
+        通知空闲的工作进程退出并等待
+        :return: None
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            try:
+                worker.tasks.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in workers:
+            worker.process.join()
+            worker.tasks.close()
+            worker.results.close()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+
+    def report(self):
+        """
+        输出工作进程生命周期统计
+        :return: None
+        """
+        if not self.limits.enabled and not self.events["died"]:
+            return
+        self.logger.info(
+            f"工作进程: 启动 {self.events['spawned']}, 回收 {self.events['recycled']}, "
+            f"异常退出 {self.events['died']}, 重新派发 {self.events['requeued']}, "
+            f"峰值RSS {human_bytes(self.peak_rss)}, 峰值文件描述符 {self.peak_fds}")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: limiter.py
+@time: 2026/10/19 1:40 下午
+"""
+
+__version__ = (0, 0, 2)
+__update_str__ = "按协议, 主机及实际端口匹配端点, 兼容省略默认端口的下载地址"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import multiprocessing
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def parse_rate(value):
+    """
+    解析限流配置, 支持K/M/G后缀, 例如 10M
+    :param value: str or int or float 配置值
+    :return: float 0为不限制
+    """
+    if value in (None, ""):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = value.strip().upper().rstrip("B").rstrip("I")
+    unit = value[-1] if value and value[-1] in UNITS else ""
+    return float(value[:len(value) - len(unit)] or 0) * UNITS[unit]
+
+
+def endpoint(url: str):
+    """
+    返回地址所属的端点, Nexus返回的downloadUrl会省略默认端口, 与配置中的端口统一为实际端口
+    :param url: str 地址
+    :return: tuple (协议, 主机, 端口) 无法解析时返回None
+    """
+    if not url:
+        return None
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    try:
+        port = parts.port or DEFAULT_PORTS.get(scheme)
+    except ValueError:
+        return None
+    if not parts.hostname:
+        return None
+    return scheme, parts.hostname.lower(), port
+
+
+class TokenBucket(object):
+    """令牌桶"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        初始化
+        :param rate: float 每秒生成的令牌数
+        :param capacity: float 桶容量, 即允许的突发量, 默认为1秒的令牌数
+        """
+        # 状态保存在共享内存中, 由进程池初始化函数传入子进程后, 所有进程及线程共享同一个桶
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else self.rate
+        self._lock = multiprocessing.Lock()
+        self._tokens = multiprocessing.Value("d", self.capacity, lock=False)
+        self._stamp = multiprocessing.Value("d", time.time(), lock=False)
+
+    def __str__(self):
+        return f"<{self.__doc__} Rate={self.rate} Capacity={self.capacity}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def consume(self, amount: float = 1):
+        """
+        消耗令牌, 令牌不足时阻塞
+        允许一次消耗超过桶容量(预支), 由后续调用者等待补足, 避免大文件永远无法获得令牌
+        :param amount: float 令牌数
+        :return: float 实际等待的秒数
+        """
+        with self._lock:
+            now = time.time()
+            tokens = min(
+                self.capacity,
+                self._tokens.value + (now - self._stamp.value) * self.rate)
+            tokens -= amount
+            self._tokens.value = tokens
+            self._stamp.value = now
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class Limiter(object):
+    """Nexus端点限流器"""
+
+    _registry = {}
+    # 端点 -> 限流器, 与_registry同步更新
+    _endpoints = {}
+
+    def __init__(
+            self,
+            bytes_per_second: float = 0,
+            requests_per_second: float = 0,
+            concurrent_uploads: int = 0):
+        """
+        初始化
+        :param bytes_per_second: float 每秒传输字节数上限, 0为不限制
+        :param requests_per_second: float 每秒请求数上限, 0为不限制
+        :param concurrent_uploads: int 同时上传数上限, 0为不限制
+        """
+        self.bytes_per_second = parse_rate(bytes_per_second)
+        self.requests_per_second = parse_rate(requests_per_second)
+        self.concurrent_uploads = int(parse_rate(concurrent_uploads))
+        self._bytes = TokenBucket(self.bytes_per_second) \
+            if self.bytes_per_second else None
+        self._requests = TokenBucket(self.requests_per_second) \
+            if self.requests_per_second else None
+        self._uploads = multiprocessing.BoundedSemaphore(self.concurrent_uploads) \
+            if self.concurrent_uploads else None
+
+    def __str__(self):
+        return f"<{self.__doc__} Bytes/s={self.bytes_per_second} " \
+               f"Requests/s={self.requests_per_second} " \
+               f"Uploads={self.concurrent_uploads}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def enabled(self):
+        """
+        返回是否配置了任意限制
+        :return: bool
+        """
+        return bool(self._bytes or self._requests or self._uploads)
+
+    def request(self):
+        """
+        发起请求前调用, 消耗一个请求令牌
+        :return: None
+        """
+        if self._requests:
+            self._requests.consume(1)
+
+    def transfer(self, size: int):
+        """
+        传输数据时调用, 消耗对应字节数的令牌
+        :param size: int 字节数
+        :return: None
+        """
+        if self._bytes and size:
+            self._bytes.consume(size)
+
+    @contextmanager
+    def upload(self):
+        """
+        上传上下文, 限制同时上传数
+        :return: None
+        """
+        if self._uploads:
+            self._uploads.acquire()
+        try:
+            yield
+        finally:
+            if self._uploads:
+                self._uploads.release()
+
+    @classmethod
+    def register(cls, url: str, limiter):
+        """
+        注册端点限流器
+        :param url: str 端点API地址
+        :param limiter: Limiter类
+        :return: None
+        """
+        cls._registry[url] = limiter
+        cls._endpoints[endpoint(url)] = limiter
+
+    @classmethod
+    def get(cls, url: str):
+        """
+        获取端点限流器, 未注册时返回不限流的实例
+        :param url: str 端点API地址或该端点下的任意地址, 按协议, 主机及实际端口匹配
+        :return: Limiter类
+        """
+        if url in cls._registry:
+            return cls._registry[url]
+        return cls._endpoints.get(endpoint(url), NO_LIMIT)
+
+    @classmethod
+    def registry(cls):
+        """
+        返回已注册的限流器, 用于传递给进程池初始化函数
+        :return: dict
+        """
+        return dict(cls._registry)
+
+    @classmethod
+    def install(cls, registry: dict):
+        """
+        在子进程中安装父进程的限流器
+        :param registry: dict 由registry()返回的字典
+        :return: None
+        """
+        for url, limiter in registry.items():
+            cls.register(url, limiter)
+
+
+NO_LIMIT = Limiter()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: loadtest.py
+@time: 2026/10/19 9:10 下午
+"""
+
+__version__ = (0, 0, 1)
+__update_str__ = "初始创建, 目标存储库写入压测"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import io
+import logging
+import math
+import os
+import random
+import time
+import zipfile
+from multiprocessing.pool import ThreadPool
+
+from utils.classes import Nexus, Log
+from utils.limiter import parse_rate
+from utils.planner import human_bytes
+
+DEFAULT_LEVELS = [1, 2, 4, 8, 16]
+DEFAULT_COUNT = 64
+DEFAULT_SIZES = "16K:60,1M:30,16M:10"
+GROUP_PREFIX = "loadtest"
+POM_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0" \
+xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" \
+xsi:schemaLocation="http://maven.apache.org/POM/4.0.0 http://maven.apache.org/xsd/maven-4.0.0.xsd">
+  <modelVersion>4.0.0</modelVersion>
+  <groupId>{group}</groupId>
+  <artifactId>{name}</artifactId>
+  <version>{version}</version>
+  <packaging>jar</packaging>
+  <description>Synthetic component generated by nexus_migrate_tool loadtest</description>
+</project>
+"""
+
+# 每个进程生成一次的随机数据, 各组件按大小截取, 并以唯一的清单文件区分内容
+_block = b""
+
+
+def parse_sizes(value: str):
+    """
+    解析jar大小分布, 例如 16K:60,1M:30,16M:10 表示按60:30:10的权重选择大小
+    :param value: str 大小分布, 权重可省略(默认为1)
+    :return: list [(字节数, 权重)]
+    """
+    sizes = []
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        size, _, weight = item.partition(":")
+        sizes.append((int(parse_rate(size)), float(weight or 1)))
+    if not sizes:
+        raise ValueError(f"Invalid size distribution: {value}")
+    return sizes
+
+
+def percentile(values: list, p: float):
+    """
+    计算百分位数(最近秩法)
+    :param values: list 已排序的数值
+    :param p: float 百分位, 0 ~ 100
+    :return: float
+    """
+    if not values:
+        return 0.0
+    rank = math.ceil(p / 100 * len(values)) - 1
+    return values[max(0, min(rank, len(values) - 1))]
+
+
+class SyntheticComponent(object):
+    """压测用的合成组件"""
+
+    __slots__ = ["group", "name", "version", "jar_size"]
+
+    def __init__(self, group: str, name: str, version: str, jar_size: int):
+        """
+        初始化
+        :param group: str 组ID
+        :param name: str 名称
+        :param version: str 版本
+        :param jar_size: int jar文件中随机数据的字节数
+        """
+        self.group = group
+        self.name = name
+        self.version = version
+        self.jar_size = jar_size
+
+    def __str__(self):
+        return f"<{self.__doc__} {self.group}:{self.name}:{self.version} Size={self.jar_size}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def gav(self):
+        """
+        返回GAV元组
+        :return: tuple
+        """
+        return self.group, self.name, self.version
+
+    def pom(self):
+        """
+        生成合法的POM文件
+        :return: bytes
+        """
+        return POM_TEMPLATE.format(
+            group=self.group, name=self.name, version=self.version).encode("utf-8")
+
+    def jar(self):
+        """
+        生成合法的jar文件(不压缩的zip), 随机数据在进程内复用
+        :return: io.BytesIO
+        """
+        global _block
+        if len(_block) < self.jar_size:
+            _block = os.urandom(self.jar_size)
+        manifest = f"Manifest-Version: 1.0\nImplementation-Title: {self.name}\n" \
+                   f"Implementation-Version: {self.version}\n"
+        f = io.BytesIO()
+        with zipfile.ZipFile(f, "w", zipfile.ZIP_STORED) as jar:
+            jar.writestr("META-INF/MANIFEST.MF", manifest)
+            jar.writestr("payload.bin", _block[:self.jar_size])
+        f.seek(0)
+        return f
+
+
+class LoadTester(object):
+    """目标存储库写入压测"""
+
+    def __init__(
+            self,
+            sizes: str = DEFAULT_SIZES,
+            count: int = DEFAULT_COUNT,
+            seed: int = None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param sizes: str jar大小分布, 参考parse_sizes
+        :param count: int 每个并发级别上传的组件数
+        :param seed: int 随机种子, 用于复现大小序列
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.sizes = parse_sizes(sizes)
+        self.count = count
+        self.random = random.Random(seed)
+        self.logger = logger if logger else Log().logger
+        # 每次压测使用独立的组ID, 便于识别及清理
+        self.group = f"{GROUP_PREFIX}.run{int(time.time())}"
+        self.results = {}
+        self.uploaded = []
+        self._sequence = 0
+
+    def __str__(self):
+        return f"<{self.__doc__} Group={self.group} Count={self.count}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def generate(self, level: int):
+        """
+        生成一个并发级别的合成组件
+        :param level: int 并发数
+        :return: list SyntheticComponent类
+        """
+        sizes = [size for size, _ in self.sizes]
+        weights = [weight for _, weight in self.sizes]
+        components = []
+        for size in self.random.choices(sizes, weights, k=self.count):
+            self._sequence += 1
+            components.append(SyntheticComponent(
+                f"{self.group}.p{level}", f"artifact{self._sequence % 16}",
+                f"1.0.{self._sequence}", size))
+        return components
+
+    def record(self, level: int, elapsed: float, results: list):
+        """
+        记录一个并发级别的结果
+        :param level: int 并发数
+        :param elapsed: float 总耗时(秒)
+        :param results: list [(gav, 耗时, 字节数, 错误信息或None)]
+        :return: dict 统计结果
+        """
+        latencies = sorted(latency for _, latency, _, error in results if error is None)
+        errors = [error for _, _, _, error in results if error is not None]
+        size = sum(size for _, _, size, error in results if error is None)
+        self.uploaded.extend(gav for gav, _, _, error in results if error is None)
+        result = {
+            "components": len(latencies),
+            "errors": len(errors),
+            "bytes": size,
+            "elapsed": elapsed,
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "bandwidth": size / elapsed if elapsed else 0.0,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+        }
+        self.results[level] = result
+        self.logger.info(
+            f"并发 {level}: 组件 {result['components']}, 失败 {result['errors']}, "
+            f"{result['throughput']:.1f} 组件/s, {human_bytes(result['bandwidth'])}/s, "
+            f"延迟 p50 {result['p50'] * 1000:.0f}ms p90 {result['p90'] * 1000:.0f}ms "
+            f"p99 {result['p99'] * 1000:.0f}ms")
+        for error in sorted(set(errors))[:3]:
+            self.logger.warning(f"  失败原因: {error}")
+        return result
+
+    def recommend(self):
+        """
+        推荐并发数: 吞吐量仍有明显提升(>10%)且p99延迟未超过最低并发三倍的最大并发
+        :return: int or None
+        """
+        levels = sorted(level for level, r in self.results.items() if r["components"])
+        if not levels:
+            return None
+        baseline = self.results[levels[0]]["p99"]
+        best = levels[0]
+        for level in levels[1:]:
+            result = self.results[level]
+            if result["errors"] or result["p99"] > baseline * 3:
+                break
+            if result["throughput"] < self.results[best]["throughput"] * 1.1:
+                break
+            best = level
+        return best
+
+    def report(self):
+        """
+        输出各并发级别的汇总及推荐并发数
+        :return: None
+        """
+        self.logger.info(f"压测汇总 (组ID前缀 {self.group}):")
+        self.logger.info("  并发 | 组件/s | 带宽/s | p50 | p90 | p99 | 失败")
+        for level in sorted(self.results):
+            r = self.results[level]
+            self.logger.info(
+                f"  {level} | {r['throughput']:.1f} | {human_bytes(r['bandwidth'])} | "
+                f"{r['p50'] * 1000:.0f}ms | {r['p90'] * 1000:.0f}ms | "
+                f"{r['p99'] * 1000:.0f}ms | {r['errors']}")
+        best = self.recommend()
+        if best is not None:
+            r = self.results[best]
+            self.logger.info(
+                f"推荐 --pool {best}, 目标写入能力约 {r['throughput']:.1f} 组件/s, "
+                f"{human_bytes(r['bandwidth'])}/s")
+
+    def cleanup(self, repository: Nexus.Repository, threads: int = 8):
+        """
+        删除已上传的合成组件
+        :param repository: Repository类 目标存储库实例
+        :param threads: int 并发删除的线程数
+        :return: int 删除的组件数
+        """
+        def delete(gav):
+            components = repository.find_components(*gav)
+            for component in components:
+                repository.delete_component(component.id)
+            return len(components)
+
+        with ThreadPool(threads) as pool:
+            deleted = sum(pool.map(delete, self.uploaded))
+        self.logger.info(f"已删除{deleted}个合成组件")
+        return deleted
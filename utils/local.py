@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: local.py
+@time: 2026/10/19 9:50 下午
+"""
+
+__version__ = (0, 0, 1)
+__update_str__ = "初始创建, 本地Maven目录作为迁移源"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import logging
+import os
+import re
+import shutil
+import tempfile
+from collections import OrderedDict
+from datetime import datetime, timezone
+from multiprocessing.pool import ThreadPool
+
+from utils.classes import Nexus, File, Log
+from utils.trace import span
+
+DEFAULT_SCAN_THREADS = 8
+# Maven客户端及仓库管理器生成的元数据, 不属于任何组件
+IGNORED_NAMES = ["_remote.repositories", "_maven.repositories", "resolver-status.properties"]
+IGNORED_PREFIXES = ["maven-metadata"]
+IGNORED_SUFFIXES = [".lastUpdated", ".part", ".lock", ".tmp"]
+CHECKSUM_EXTENSIONS = ["sha1", "md5"]
+
+
+class LocalAsset(object):
+    """本地资源类"""
+
+    __slots__ = ["path", "file", "size", "mtime", "checksum"]
+
+    RANGE_THRESHOLD = Nexus.Asset.RANGE_THRESHOLD
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path: str, file: str, size: int, mtime: float, checksum: dict = None):
+        """
+        初始化
+        :param path: str 仓库内的相对路径, 与Nexus资源路径一致
+        :param file: str 文件的绝对路径
+        :param size: int 大小
+        :param mtime: float 修改时间戳
+        :param checksum: dict 可选, 扫描时计算的摘要 {算法: 摘要值}
+        """
+        self.path = path
+        self.file = file
+        self.size = size
+        self.mtime = mtime
+        self.checksum = checksum if checksum else {}
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path} Size={self.size}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def name(self):
+        """
+        返回当前资源的名称
+        :return: str
+        """
+        return os.path.basename(self.path)
+
+    @property
+    def extension(self):
+        """
+        返回当前资源的拓展名
+        :return: str
+        """
+        return self.name.split(".")[-1]
+
+    @property
+    def last_modified(self):
+        """
+        返回当前资源的修改时间
+        :return: datetime
+        """
+        return datetime.fromtimestamp(self.mtime, timezone.utc)
+
+    @property
+    def md5(self):
+        """
+        返回当前资源的md5值, 未计算时为None
+        :return: str
+        """
+        return self.checksum.get("md5")
+
+    @property
+    def sha1(self):
+        """
+        返回当前资源的sha1值, 未计算时为None
+        :return: str
+        """
+        return self.checksum.get("sha1")
+
+    @property
+    def stream(self):
+        """
+        获取当前资源的字节流
+        :return: bytes
+        """
+        with open(self.file, "rb") as f:
+            return f.read()
+
+    def copy_to(self, fileobj):
+        """
+        将当前资源分块写入文件对象
+        :param fileobj: 可写的文件对象
+        :return: int 写入的字节数
+        """
+        with span("read", "download", path=self.path), open(self.file, "rb") as f:
+            written = 0
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                fileobj.write(chunk)
+                written += len(chunk)
+        return written
+
+    def download(self, directory: str = os.getcwd(), parts: int = None):
+        """
+        将当前资源放入指定目录, 同一文件系统时使用硬链接, 不复制数据
+        POM文件会在迁移时被修改, 始终复制, 不影响源文件
+        :param directory: str 目标目录
+        :param parts: int 未使用, 与Nexus.Asset.download保持一致
+        :return: str 文件路径
+        """
+        path = os.path.join(directory, self.name)
+        if os.path.exists(path):
+            os.remove(path)
+        if self.extension != "pom":
+            try:
+                os.link(self.file, path)
+                return path
+            except OSError:
+                pass
+        shutil.copyfile(self.file, path)
+        return path
+
+
+class LocalComponent(object):
+    """本地组件类"""
+
+    __slots__ = ["group", "name", "version", "assets", "_directory"]
+
+    PARALLEL_ASSETS = Nexus.Component.PARALLEL_ASSETS
+
+    def __init__(self, group: str, name: str, version: str, assets: list = None):
+        """
+        初始化
+        :param group: str 组ID
+        :param name: str 名称
+        :param version: str 版本, 快照为带时间戳的版本
+        :param assets: list LocalAsset类
+        """
+        self.group = group
+        self.name = name
+        self.version = version
+        self.assets = assets if assets else []
+        self._directory = None
+
+    def __str__(self):
+        return f"<{self.__doc__} {self.group}:{self.name}:{self.version} Assets={len(self.assets)}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def size(self):
+        """
+        返回当前组件所有资源的总大小
+        :return: int
+        """
+        return sum(asset.size for asset in self.assets)
+
+    @property
+    def last_modified(self):
+        """
+        返回当前组件资源的最后修改时间
+        :return: datetime or None
+        """
+        times = [asset.last_modified for asset in self.assets]
+        return max(times) if times else None
+
+    @property
+    def directory(self):
+        """
+        获取当前组件的下载目录
+        :return: str 下载目录
+        """
+        return self._directory
+
+    def download(self, path: str = os.getcwd(), exclude=None):
+        """
+        将当前组件的所有资源放入临时目录
+        :param path: str 基础路径
+        :param exclude: Iterable 排除的拓展名
+        :return: list 资源的保存路径
+        """
+        exclude = exclude if exclude else []
+        os.makedirs(path, exist_ok=True)
+        self._directory = tempfile.mkdtemp(dir=path)
+        d = os.path.join(self._directory, self.name)
+        os.makedirs(d, exist_ok=True)
+        return [asset.download(d) for asset in self.assets
+                if asset.extension not in exclude]
+
+
+class LocalComponentGetter(object):
+    """本地组件获取器, 对应一个版本目录"""
+
+    def __init__(self, components: list):
+        """
+        初始化
+        :param components: list LocalComponent类
+        """
+        self.components = components
+
+    def __str__(self):
+        return f"<{self.__doc__} Components={len(self.components)}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class LocalRepository(object):
+    """本地Maven目录存储库"""
+
+    type = "hosted"
+    format = "maven2"
+
+    def __init__(
+            self,
+            root: str,
+            maven_version_policy: str = "RELEASE",
+            threads: int = DEFAULT_SCAN_THREADS,
+            verify: bool = True,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param root: str Maven布局的目录, 例如 ~/.m2/repository 或 sonatype-work 导出的存储库目录
+        :param maven_version_policy: str RELEASE或SNAPSHOT, 仅列出对应的版本目录
+        :param threads: int 并行扫描目录及计算摘要的线程数
+        :param verify: bool 是否计算sha1/md5并与同目录下的.sha1/.md5文件比对, 不一致的组件被跳过
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.name = os.path.basename(self.root.rstrip(os.sep))
+        self.maven_version_policy = maven_version_policy
+        self.threads = threads
+        self.verify = verify
+        self.logger = logger if logger else Log().logger
+        self.directories = 0
+        self.corrupted = 0
+
+    def __str__(self):
+        return f"<{self.__doc__} Root={self.root} Policy={self.maven_version_policy}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @staticmethod
+    def _ignored(name: str):
+        """
+        是否为元数据等不属于组件的文件
+        :param name: str 文件名
+        :return: bool
+        """
+        return name in IGNORED_NAMES \
+            or any(name.startswith(prefix) for prefix in IGNORED_PREFIXES) \
+            or any(name.endswith(suffix) for suffix in IGNORED_SUFFIXES)
+
+    def _versions(self, artifact: str, version: str, names: list):
+        """
+        按组件版本对版本目录中的文件分组
+        快照目录中每个时间戳构建为一个组件, 与Nexus一致
+        :param artifact: str 名称(上级目录名)
+        :param version: str 版本目录名
+        :param names: list 文件名
+        :return: dict {组件版本: [文件名]}
+        """
+        if version.endswith("-SNAPSHOT"):
+            base = re.escape(version[:-len("-SNAPSHOT")])
+            pattern = re.compile(
+                rf"{re.escape(artifact)}-({base}-(?:\d{{8}}\.\d{{6}}-\d+|SNAPSHOT))(?=[.-])")
+        else:
+            pattern = re.compile(rf"{re.escape(artifact)}-({re.escape(version)})(?=[.-])")
+        versions = OrderedDict()
+        for name in sorted(names):
+            match = pattern.match(name)
+            if match:
+                versions.setdefault(match.group(1), []).append(name)
+        return versions
+
+    def _checksums(self, directory: str, names: list):
+        """
+        计算文件摘要, 并与同目录的.sha1/.md5文件比对
+        :param directory: str 目录绝对路径
+        :param names: list 文件名
+        :return: tuple ({文件名: 摘要字典}, 校验失败的文件名列表)
+        """
+        present = set(names)
+        checksums = {}
+        mismatched = []
+        for name in names:
+            file = os.path.join(directory, name)
+            checksums[name] = File(file).digests(CHECKSUM_EXTENSIONS)
+            for algorithm in CHECKSUM_EXTENSIONS:
+                sidecar = f"{name}.{algorithm}"
+                if sidecar not in present:
+                    continue
+                with open(os.path.join(directory, sidecar), "r", errors="ignore") as f:
+                    # 部分工具生成的校验文件包含文件名, 仅取第一列
+                    expected = (f.read().split() or [""])[0].lower()
+                if expected and expected != checksums[name][algorithm]:
+                    mismatched.append(name)
+        return checksums, mismatched
+
+    def _scan(self, relative: str):
+        """
+        扫描一个目录, 在线程池中执行
+        :param relative: str 相对于根目录的路径, 以/分隔
+        :return: tuple (子目录列表, 组件列表)
+        """
+        directory = os.path.join(self.root, relative)
+        subdirs, files = [], []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(f"{relative}/{entry.name}" if relative else entry.name)
+                elif entry.is_file() and not self._ignored(entry.name):
+                    files.append(entry)
+        parts = relative.split("/")
+        if not files or len(parts) < 3:
+            return subdirs, []
+        group, artifact, version = ".".join(parts[:-2]), parts[-2], parts[-1]
+        if version.endswith("-SNAPSHOT") != (self.maven_version_policy == "SNAPSHOT"):
+            return subdirs, []
+        stats = {entry.name: entry.stat() for entry in files}
+        components = []
+        for component_version, names in self._versions(artifact, version, list(stats)).items():
+            checksums = {}
+            if self.verify:
+                checksums, mismatched = self._checksums(directory, names)
+                if mismatched:
+                    self.logger.warning(
+                        f"[{group}:{artifact}:{component_version}]校验失败, 已跳过: {mismatched}")
+                    self.corrupted += 1
+                    continue
+            assets = [LocalAsset(f"{relative}/{name}", os.path.join(directory, name),
+                                 stats[name].st_size, stats[name].st_mtime, checksums.get(name))
+                      for name in names]
+            components.append(LocalComponent(group, artifact, component_version, assets))
+        return subdirs, components
+
+    @property
+    def iter_component_getter(self):
+        """
+        并行扫描目录树, 每个版本目录生成一个获取器
+        同一层级的目录并发扫描, 结果按完成顺序返回
+        :return: generator LocalComponentGetter类
+        """
+        self.directories = 0
+        self.corrupted = 0
+        frontier = [""]
+        with ThreadPool(self.threads) as pool:
+            while frontier:
+                next_frontier = []
+                for subdirs, components in pool.imap_unordered(self._scan, frontier):
+                    self.directories += 1
+                    next_frontier.extend(subdirs)
+                    if components:
+                        yield LocalComponentGetter(components)
+                frontier = next_frontier
+        self.logger.info(
+            f"扫描完成[{self.root}]: 目录 {self.directories}, 校验失败 {self.corrupted}")
+
+    def search(self, **params):
+        """
+        与Nexus.Repository.search保持一致, 本地目录不支持服务端过滤, 返回全部组件, 由过滤规则在本地过滤
+        :param params: 搜索参数, 忽略
+        :return: generator LocalComponentGetter类
+        """
+        return self.iter_component_getter
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: mavenenv.py
+@time: 2026/10/20 3:30 上午
+"""
+
+__version__ = (0, 0, 3)
+__update_str__ = "client不再接收未使用的部署地址"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import zipfile
+
+from utils.classes import Log, MavenClient
+
+DEFAULT_ROOT = "maven-env"
+DEFAULT_DEPLOY_PLUGIN = "3.1.1"
+DEPLOY_GOAL = "org.apache.maven.plugins:maven-deploy-plugin:{version}:deploy-file"
+# 预热完成的标记文件, 内容为部署插件版本
+MARKER = ".prepared"
+# maven运行时会原地改写的元数据文件, 复制而不是硬链接, 其他文件硬链接共享
+MUTABLE_SUFFIXES = (".properties", ".lastUpdated", ".xml", ".repositories")
+WARMUP_GROUP = "nexus.migrate.warmup"
+WARMUP_POM = """<?xml version="1.0" encoding="UTF-8"?>
+<project xmlns="http://maven.apache.org/POM/4.0.0">
+  <modelVersion>4.0.0</modelVersion>
+  <groupId>{group}</groupId>
+  <artifactId>warmup</artifactId>
+  <version>0-SNAPSHOT</version>
+  <packaging>jar</packaging>
+</project>
+"""
+
+
+class MavenEnvironment(object):
+    """隔离的maven运行环境"""
+
+    def __init__(
+            self,
+            setting: str,
+            root: str = DEFAULT_ROOT,
+            deploy_plugin: str = DEFAULT_DEPLOY_PLUGIN,
+            binary: str = MavenClient.DEFAULT_BIN,
+            logger: logging.Logger = None):
+        """
+        初始化
+        启动时通过一次本地部署解析部署插件及其依赖, 得到预热的插件库
+        每个工作进程(混合执行器时为每个线程)使用独立的本地仓库, 由插件库硬链接生成, 不再争用同一个~/.m2/repository的文件锁
+        maven-deploy-plugin在离线模式下拒绝部署, 因此不使用-o, 插件均已在本地仓库中, 以-nsu跳过快照更新检查
+        各工作进程的本地仓库位于workers/<主机名>-<主进程号>下, 同一目录中同时运行的多个迁移互不影响
+        :param setting: str maven配置文件路径
+        :param root: str 插件库及各进程本地仓库的根目录
+        :param deploy_plugin: str maven-deploy-plugin的版本
+        :param binary: str 二进制可执行客户端路径
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.setting = setting
+        self.root = os.path.abspath(root)
+        self.deploy_plugin = deploy_plugin
+        self.binary = binary
+        self.logger = logger if logger else Log().logger
+        self.plugins = os.path.join(self.root, "plugins")
+        # 本次运行的标识, 由创建环境的主进程确定, 随环境传入子进程
+        self.run = f"{socket.gethostname()}-{os.getpid()}"
+        self.workers = os.path.join(self.root, "workers", self.run)
+        self._local = threading.local()
+
+    def __str__(self):
+        return f"<{self.__doc__} Root={self.root} DeployPlugin={self.deploy_plugin}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_local")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def goal(self):
+        return DEPLOY_GOAL.format(version=self.deploy_plugin)
+
+    @property
+    def prepared(self):
+        """
+        插件库是否已预热且插件版本一致
+        :return: bool
+        """
+        marker = os.path.join(self.plugins, MARKER)
+        if not os.path.exists(marker):
+            return False
+        with open(marker, "r", encoding="utf-8") as f:
+            return f.read().strip() == self.deploy_plugin
+
+    def prepare(self):
+        """
+        预热插件库: 以快照版本部署一个空组件至本地目录, 解析部署所需的全部插件
+        已预热时直接复用
+        :return: bool 是否可用, 预热失败时返回False, 调用方应退回共用的本地仓库
+        """
+        # 本机上已退出的运行异常退出时残留的本地仓库
+        self.reap()
+        if self.prepared:
+            self.logger.info(f"复用已预热的maven插件库: {self.plugins}")
+            return True
+        start = time.perf_counter()
+        warmup = os.path.join(self.root, f"warmup-{self.run}")
+        shutil.rmtree(warmup, ignore_errors=True)
+        os.makedirs(warmup)
+        os.makedirs(self.plugins, exist_ok=True)
+        pom = os.path.join(warmup, "warmup.pom")
+        jar = os.path.join(warmup, "warmup.jar")
+        with open(pom, "w", encoding="utf-8") as f:
+            f.write(WARMUP_POM.format(group=WARMUP_GROUP))
+        with zipfile.ZipFile(jar, "w") as f:
+            f.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+        command = [self.binary, "-B", "-q", "--settings", self.setting,
+                   f"-Dmaven.repo.local={self.plugins}", self.goal,
+                   f"-Dfile={jar}", f"-DpomFile={pom}", f"-Dsources={jar}",
+                   f"-Durl=file://{os.path.join(warmup, 'repository')}",
+                   "-DrepositoryId=warmup"]
+        try:
+            subprocess.check_output(command, stderr=subprocess.STDOUT)
+        except (OSError, subprocess.CalledProcessError) as e:
+            output = getattr(e, "output", None)
+            self.logger.warning(f"maven插件库预热失败, 使用共用的本地仓库: "
+                                f"{output.decode('utf-8').strip() if output else e}")
+            return False
+        finally:
+            shutil.rmtree(warmup, ignore_errors=True)
+        # 预热组件不应出现在插件库中
+        shutil.rmtree(os.path.join(self.plugins, *WARMUP_GROUP.split(".")), ignore_errors=True)
+        with open(os.path.join(self.plugins, MARKER), "w", encoding="utf-8") as f:
+            f.write(self.deploy_plugin)
+        self.logger.info(f"maven插件库已预热: {self.plugins}, 耗时 {time.perf_counter() - start:.1f}s")
+        return True
+
+    def _seed(self, repository: str):
+        """
+        由插件库生成本地仓库, 不可变的文件硬链接, 元数据文件复制
+        跨文件系统等无法硬链接时复制
+        :param repository: str 本地仓库路径
+        :return: int 文件数
+        """
+        count = 0
+        for directory, _, files in os.walk(self.plugins):
+            target = os.path.join(repository, os.path.relpath(directory, self.plugins))
+            os.makedirs(target, exist_ok=True)
+            for name in files:
+                if name == MARKER:
+                    continue
+                source, destination = os.path.join(directory, name), os.path.join(target, name)
+                if name.endswith(MUTABLE_SUFFIXES):
+                    shutil.copy2(source, destination)
+                else:
+                    try:
+                        os.link(source, destination)
+                    except OSError:
+                        shutil.copy2(source, destination)
+                count += 1
+        return count
+
+    def repository(self):
+        """
+        返回当前进程(线程)的本地仓库, 首次调用时生成
+        :return: str
+        """
+        name = f"{os.getpid()}-{threading.get_ident()}"
+        path = getattr(self._local, "repository", None)
+        # fork时不沿用父进程的本地仓库
+        if path is None or os.path.basename(path) != name or not os.path.isdir(path):
+            path = os.path.join(self.workers, name)
+            shutil.rmtree(path, ignore_errors=True)
+            start = time.perf_counter()
+            count = self._seed(path)
+            self.logger.debug(f"已生成本地仓库: {path}, 文件 {count}, "
+                              f"耗时 {time.perf_counter() - start:.2f}s")
+            self._local.repository = path
+        return path
+
+    def client(self):
+        """
+        返回使用隔离环境的maven客户端, 部署地址由调用方通过-Durl指定
+        :return: MavenClient类
+        """
+        # 插件均从预热的本地仓库解析, 不检查快照更新; 部署插件要求在线模式
+        options = ["-B", "-nsu", "-q", f"-Dmaven.repo.local={self.repository()}"]
+        return MavenClient(
+            binary=self.binary, setting=self.setting, options=options, goal=self.goal,
+            logger=self.logger)
+
+    def clean(self):
+        """
+        删除本次运行中各进程的本地仓库, 保留插件库供下次使用
+        :return: None
+        """
+        shutil.rmtree(self.workers, ignore_errors=True)
+
+    def reap(self):
+        """
+        删除本机上已退出的运行残留的本地仓库, 其他主机(共享目录)及仍在运行的迁移不受影响
+        :return: list 删除的运行标识
+        """
+        parent = os.path.dirname(self.workers)
+        if not os.path.isdir(parent):
+            return []
+        host = socket.gethostname()
+        reaped = []
+        for run in os.listdir(parent):
+            name, _, pid = run.rpartition("-")
+            if name != host or not pid.isdigit() or run == self.run or _alive(int(pid)):
+                continue
+            shutil.rmtree(os.path.join(parent, run), ignore_errors=True)
+            reaped.append(run)
+        if reaped:
+            self.logger.info(f"已删除已退出运行残留的本地仓库: {', '.join(reaped)}")
+        return reaped
+
+
+def _alive(pid: int):
+    """
+    进程是否仍在运行
+    :param pid: int 进程号
+    :return: bool
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 其他用户的进程
+        return True
+    return True
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: offload.py
+@time: 2026/10/20 0:30 上午
+"""
+
+__version__ = (0, 0, 1)
+__update_str__ = "初始创建, 混合执行器: 线程执行网络阶段, 进程池执行CPU阶段"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.pool import ThreadPool
+
+from utils.classes import Log, File, POM
+
+DEFAULT_CPU_PROCESSES = os.cpu_count() or 1
+# process: 每个组件在独立的工作进程中迁移; hybrid: 组件在线程中迁移, CPU阶段交给进程池
+PROCESS = "process"
+HYBRID = "hybrid"
+EXECUTORS = [PROCESS, HYBRID]
+
+
+def _init_offload():
+    """
+    CPU进程池初始化函数, fork时继承了父进程的卸载器, 在子进程中直接计算
+    :return: None
+    """
+    Offloader.install(None)
+
+
+def _digest_file(path: str, algorithms: tuple):
+    """
+    在CPU进程中计算文件摘要, 文件已在磁盘上, 只传递路径
+    :param path: str 文件路径
+    :param algorithms: tuple 算法
+    :return: dict {算法: 摘要值}
+    """
+    return File(path).digests(algorithms)
+
+
+def _digest_shared(name: str, size: int, algorithms: tuple):
+    """
+    在CPU进程中计算共享内存中数据的摘要, 不复制数据
+    :param name: str 共享内存名称
+    :param size: int 数据字节数
+    :param algorithms: tuple 算法
+    :return: dict {算法: 摘要值}
+    """
+    shm = shared_memory.SharedMemory(name)
+    try:
+        view = shm.buf[:size]
+        hashes = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+        for h in hashes.values():
+            h.update(view)
+        view.release()
+        return {algorithm: h.hexdigest() for algorithm, h in hashes.items()}
+    finally:
+        shm.close()
+
+
+def _replace_pom_file(path: str, key: str, mapping: dict):
+    """
+    在CPU进程中替换磁盘上的POM
+    :param path: str 文件路径
+    :param key: str 替换的元素名
+    :param mapping: dict 映射字典
+    :return: None
+    """
+    POM(path).replace(key, mapping)
+
+
+def _replace_pom_shared(name: str, size: int, key: str, mapping: dict):
+    """
+    在CPU进程中解析及替换共享内存中的POM
+    :param name: str 共享内存名称
+    :param size: int 数据字节数
+    :param key: str 替换的元素名
+    :param mapping: dict 映射字典
+    :return: bytes 替换后的POM
+    """
+    shm = shared_memory.SharedMemory(name)
+    try:
+        f = io.BytesIO(shm.buf[:size])
+    finally:
+        shm.close()
+    POM(f).replace(key, mapping)
+    return f.getvalue()
+
+
+class Offloader(object):
+    """CPU密集型任务的进程池"""
+
+    _current = None
+
+    def __init__(self, processes: int = DEFAULT_CPU_PROCESSES, logger: logging.Logger = None):
+        """
+        初始化
+        POM解析替换及摘要计算在进程池中执行, 不受GIL限制; 已在磁盘上的文件只传递路径, 内存中的数据通过共享内存传递
+        :param processes: int 进程数, 默认为CPU核数
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.processes = max(1, processes or DEFAULT_CPU_PROCESSES)
+        self.logger = logger if logger else Log().logger
+        self.tasks = 0
+        self.shared = 0
+        self.elapsed = 0.0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"<{self.__doc__} Processes={self.processes}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def start(self):
+        """
+        启动进程池
+        :return: self
+        """
+        # 子进程共用父进程的资源跟踪器, 否则子进程退出时会删除仍在使用的共享内存
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(self.processes, initializer=_init_offload)
+        return self
+
+    def close(self):
+        """
+        关闭进程池
+        :return: None
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _apply(self, func, args: tuple, shared: int = 0):
+        """
+        在进程池中执行并等待结果, 调用线程阻塞, 不占用GIL
+        :param func: callable 模块级函数
+        :param args: tuple 参数
+        :param shared: int 通过共享内存传递的字节数
+        :return: object
+        """
+        start = time.perf_counter()
+        result = self._pool.apply(func, args)
+        with self._lock:
+            self.tasks += 1
+            self.shared += shared
+            self.elapsed += time.perf_counter() - start
+        return result
+
+    def _with_shared(self, data, func, *args):
+        """
+        将数据复制到共享内存后在进程池中执行
+        :param data: bytes-like 数据
+        :param func: callable 第一个及第二个参数为共享内存名称及数据字节数
+        :param args: 其他参数
+        :return: object
+        """
+        size = len(data)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            shm.buf[:size] = data
+            return self._apply(func, (shm.name, size) + args, size)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def digests(self, source, algorithms=("md5",)):
+        """
+        计算摘要
+        :param source: str 文件路径, 或可读的文件对象
+        :param algorithms: Iterable 算法
+        :return: dict {算法: 摘要值}
+        """
+        algorithms = tuple(algorithms)
+        if isinstance(source, str):
+            return self._apply(_digest_file, (source, algorithms))
+        # 内存中的文件, 例如SpooledTemporaryFile
+        source.seek(0)
+        data = source.read()
+        source.seek(0)
+        return self._with_shared(data, _digest_shared, algorithms)
+
+    def replace_pom(self, fileobj, key: str, mapping: dict):
+        """
+        替换POM中的地址, 与POM(fileobj).replace一致
+        :param fileobj: str or 文件对象 POM文件路径, 或可读写的文件对象
+        :param key: str 替换的元素名
+        :param mapping: dict 映射字典
+        :return: None
+        """
+        if isinstance(fileobj, str):
+            self._apply(_replace_pom_file, (fileobj, key, mapping))
+            return
+        fileobj.seek(0)
+        data = self._with_shared(fileobj.read(), _replace_pom_shared, key, mapping)
+        fileobj.seek(0)
+        fileobj.truncate()
+        fileobj.write(data)
+        fileobj.seek(0)
+
+    def report(self):
+        """
+        输出CPU进程池统计
+        :return: None
+        """
+        self.logger.info(
+            f"CPU进程池[{self.processes}]: 任务 {self.tasks}, "
+            f"共享内存传递 {self.shared} 字节, 累计耗时 {self.elapsed:.1f}s")
+
+    @classmethod
+    def install(cls, offloader):
+        """
+        安装当前进程的卸载器
+        :param offloader: Offloader类 or None
+        :return: None
+        """
+        cls._current = offloader
+        File.offloader = offloader
+
+    @classmethod
+    def current(cls):
+        """
+        返回当前进程的卸载器, 未启用时为None
+        :return: Offloader类 or None
+        """
+        return cls._current
+
+
+def replace_pom(fileobj, key: str, mapping: dict):
+    """
+    替换POM中的地址, 启用混合执行器时在CPU进程池中解析及替换
+    :param fileobj: str or 文件对象 POM文件路径, 或可读写的文件对象
+    :param key: str 替换的元素名
+    :param mapping: dict 映射字典
+    :return: None
+    """
+    offloader = Offloader.current()
+    if offloader is None:
+        POM(fileobj).replace(key, mapping)
+        return
+    offloader.replace_pom(fileobj, key, mapping)
+
+
+class HybridPool(object):
+    """混合执行器: 线程执行组件的网络阶段, CPU阶段交给进程池"""
+
+    def __init__(
+            self,
+            threads: int,
+            cpu_processes: int = DEFAULT_CPU_PROCESSES,
+            logger: logging.Logger = None):
+        """
+        初始化
+        与WorkerPool的apply_async/close/join/report用法一致, 任务在当前进程的线程中执行
+        列表, 下载及上传等待网络时释放GIL, 可使用远大于CPU核数的并发
+        :param threads: int 线程数, 即同时迁移的组件数
+        :param cpu_processes: int CPU进程池的进程数
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.threads = max(1, threads)
+        self.logger = logger if logger else Log().logger
+        self.offloader = Offloader(cpu_processes, logger=self.logger).start()
+        Offloader.install(self.offloader)
+        self._pool = ThreadPool(self.threads)
+
+    def __str__(self):
+        return f"<{self.__doc__} Threads={self.threads} CPU={self.offloader.processes}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def apply_async(self, func, args: tuple = (), callback=None, error_callback=None):
+        """
+        在线程中异步执行任务
+        :param func: callable 函数
+        :param args: tuple 参数
+        :param callback: callable 成功回调
+        :param error_callback: callable 失败回调
+        :return: AsyncResult
+        """
+        return self._pool.apply_async(
+            func, args, callback=callback, error_callback=error_callback)
+
+    def close(self):
+        """
+        不再接收新任务
+        :return: None
+        """
+        self._pool.close()
+
+    def terminate(self):
+        """
+        终止线程池及CPU进程池
+        :return: None
+        """
+        self._pool.terminate()
+        self.offloader._pool.terminate()
+
+    def join(self):
+        """
+        等待所有任务完成, 关闭CPU进程池
+        :return: None
+        """
+        self._pool.join()
+        self.offloader.close()
+        Offloader.install(None)
+
+    def report(self):
+        """
+        输出CPU进程池统计
+        :return: None
+        """
+        self.offloader.report()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: planner.py
+@time: 2026/10/19 11:05 上午
+"""
+
+__version__ = (0, 0, 2)
+__update_str__ = "在多个并发级别探测下载, 预测不超过实测的饱和点"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import logging
+import random
+import time
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
+
+import requests
+
+from utils.classes import Nexus, Log
+from utils.limiter import Limiter
+
+DEFAULT_POOLS = [1, 2, 4, 8, 16, 32, 64]
+DEFAULT_PROBES = 3
+DEFAULT_PROBE_LEVELS = [1, 4]
+
+
+def human_bytes(num: float):
+    """
+    格式化字节数
+    :param num: float 字节数
+    :return: str
+    """
+    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+        if abs(num) < 1024 or unit == "TiB":
+            return f"{num:.1f}{unit}"
+        num /= 1024
+
+
+def human_seconds(seconds: float):
+    """
+    格式化秒数
+    :param seconds: float 秒数
+    :return: str
+    """
+    seconds = int(seconds)
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m{seconds % 60:02d}s"
+
+
+class Planner(object):
+    """迁移规划器"""
+
+    def __init__(
+            self,
+            excludes: list = None,
+            probes: int = DEFAULT_PROBES,
+            levels: list = None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param excludes: list 排除的拓展名, 与迁移时一致
+        :param probes: int 探测下载的组件数量
+        :param levels: list 探测下载的并发级别, 总是包含1; 每个级别的每个连接下载一次全部探测组件
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.excludes = excludes if excludes else []
+        self.probes = probes
+        self.levels = sorted(set(levels if levels else DEFAULT_PROBE_LEVELS) | {1})
+        self.logger = logger if logger else Log().logger
+        self.components = 0
+        self.assets = 0
+        self.bytes = 0
+        self.groups = defaultdict(lambda: [0, 0, 0])
+        self.extensions = defaultdict(lambda: [0, 0])
+        # 每个组件的 (请求数, 字节数), 用于预测
+        self.costs = []
+        self.samples = []
+        self.latency = None
+        self.download_rate = None
+        self.upload_latency = None
+        self.upload_rate = None
+        # 并发级别 -> 相对单连接的加速比
+        self.speedups = {}
+
+    def __str__(self):
+        return f"<{self.__doc__} Components={self.components} Bytes={self.bytes}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @staticmethod
+    def _head_size(asset: Nexus.Asset):
+        """
+        列表接口未返回大小时, 通过HEAD请求获取
+        :param asset: Asset类
+        :return: int
+        """
+        Limiter.get(asset.download_url).request()
+        response = requests.head(
+            asset.download_url, auth=asset.auth, allow_redirects=True)
+        return int(response.headers.get("Content-Length", 0))
+
+    def inventory(self, components):
+        """
+        盘点组件, 不下载任何资源
+        :param components: Iterable 组件可迭代对象
+        :return: None
+        """
+        for component in components:
+            size = 0
+            count = 0
+            for asset in component.assets:
+                if asset.extension in self.excludes:
+                    continue
+                asset_size = asset.size
+                if asset_size is None:
+                    asset_size = self._head_size(asset)
+                count += 1
+                size += asset_size
+                self.extensions[asset.extension][0] += 1
+                self.extensions[asset.extension][1] += asset_size
+            group = self.groups[component.group]
+            group[0] += 1
+            group[1] += count
+            group[2] += size
+            self.components += 1
+            self.assets += count
+            self.bytes += size
+            # 每个资源一次下载, 每个组件一次上传
+            self.costs.append((count + 1, size))
+            # 蓄水池抽样, 用于带宽探测
+            if size > 0:
+                if len(self.samples) < self.probes:
+                    self.samples.append(component)
+                else:
+                    index = random.randrange(self.components)
+                    if index < self.probes:
+                        self.samples[index] = component
+            if self.components % 1000 == 0:
+                self.logger.info(
+                    f"已盘点{self.components}个组件, {human_bytes(self.bytes)}")
+
+    def _download(self, component: Nexus.Component):
+        """
+        下载组件的资源并丢弃内容
+        :param component: Component类
+        :return: list 每个资源的 (首字节延迟, 传输耗时, 字节数)
+        """
+        results = []
+        for asset in component.assets:
+            if asset.extension in self.excludes:
+                continue
+            limiter = Limiter.get(asset.download_url)
+            limiter.request()
+            start = time.monotonic()
+            with requests.get(asset.download_url, auth=asset.auth, stream=True) as response:
+                response.raise_for_status()
+                first = time.monotonic()
+                size = 0
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    limiter.transfer(len(chunk))
+                    size += len(chunk)
+            results.append((first - start, time.monotonic() - first, size))
+        return results
+
+    def _stream(self, _=None):
+        """
+        单个连接依次下载所有探测组件
+        :return: list 每个资源的 (首字节延迟, 传输耗时, 字节数)
+        """
+        results = []
+        for component in self.samples:
+            results.extend(self._download(component))
+        return results
+
+    @staticmethod
+    def _fit(points: list):
+        """
+        按 耗时 = 延迟 + 字节数 / 带宽 拟合最小二乘直线
+        样本大小相同或带宽不可测(斜率不为正)时, 视为仅受延迟限制
+        :param points: list (字节数, 耗时)
+        :return: tuple (延迟, 带宽或None)
+        """
+        count = len(points)
+        mean_size = sum(size for size, _ in points) / count
+        mean_time = sum(seconds for _, seconds in points) / count
+        variance = sum((size - mean_size) ** 2 for size, _ in points)
+        slope = sum((size - mean_size) * (seconds - mean_time) for size, seconds in points) / variance \
+            if variance else 0.0
+        if slope <= 0:
+            return mean_time, None
+        return max(mean_time - slope * mean_size, 0.0), 1 / slope
+
+    def probe(self, upload=None):
+        """
+        探测下载(及上传)的请求延迟与单连接带宽, 并在各并发级别测量下载的加速比
+        :param upload: function 可选, 接收组件并执行上传的函数, 例如迁移函数
+        :return: None
+        """
+        if not self.samples:
+            return
+        walls = {}
+        for level in self.levels:
+            start = time.monotonic()
+            with ThreadPool(level) as pool:
+                streams = pool.map(self._stream, range(level))
+            walls[level] = time.monotonic() - start
+            if level == 1:
+                results = streams[0]
+                self.latency = sorted(r[0] for r in results)[len(results) // 2]
+                transfer = sum(r[1] for r in results)
+                # 传输耗时不可测时视为带宽不受限
+                self.download_rate = sum(r[2] for r in results) / transfer if transfer > 0 else None
+        self.speedups = {level: min(level * walls[1] / wall, level) if wall > 0 else float(level)
+                         for level, wall in walls.items()}
+        if upload is None:
+            return
+        points = []
+        for component in self.samples:
+            start = time.monotonic()
+            upload(component)
+            points.append((component.size, time.monotonic() - start))
+        self.upload_latency, self.upload_rate = self._fit(points)
+
+    def speedup(self, pool: int):
+        """
+        返回指定并发相对单连接的加速比
+        在探测的并发级别之间线性插值, 超过最高级别时使用实测的最大值, 不再线性外推
+        :param pool: int 并发数
+        :return: float
+        """
+        if not self.speedups:
+            return float(pool)
+        levels = sorted(self.speedups)
+        if pool >= levels[-1]:
+            return max(self.speedups.values())
+        for low, high in zip(levels, levels[1:]):
+            if low <= pool <= high:
+                ratio = (pool - low) / (high - low)
+                return self.speedups[low] + ratio * (self.speedups[high] - self.speedups[low])
+        return float(pool)
+
+    def predict(self, pool: int):
+        """
+        预测指定并发下的耗时
+        :param pool: int 并发数
+        :return: float 秒
+        """
+        latency = self.latency or 0.0
+        download_rate = self.download_rate or float("inf")
+        # 未探测上传时, 假设上传与下载相同
+        upload_latency = self.upload_latency if self.upload_latency is not None else latency
+        upload_rate = self.upload_rate or download_rate
+        times = [
+            (requests_count - 1) * latency + upload_latency
+            + size / download_rate + size / upload_rate
+            for requests_count, size in self.costs]
+        if not times:
+            return 0.0
+        # 完成时间不小于按实测加速比分摊的总耗时, 也不小于最大的单个组件
+        return max(sum(times) / max(self.speedup(pool), 1.0), max(times))
+
+    @staticmethod
+    def _rate(rate: float):
+        return f"{human_bytes(rate)}/s" if rate else "不受限(传输耗时不可测)"
+
+    def report(self, pools: list = None, top: int = 20):
+        """
+        输出盘点及预测结果
+        :param pools: list 需要预测的并发数列表
+        :param top: int 展示字节数最多的前N个组
+        :return: None
+        """
+        pools = pools if pools else DEFAULT_POOLS
+        self.logger.info(
+            f"组件: {self.components}, 资源: {self.assets}, "
+            f"总大小: {human_bytes(self.bytes)}")
+        self.logger.info(f"按组统计 (前{top}个, 按大小排序):")
+        groups = sorted(self.groups.items(), key=lambda x: x[1][2], reverse=True)
+        for group, (components, assets, size) in groups[:top]:
+            self.logger.info(
+                f"  {group}: 组件 {components}, 资源 {assets}, {human_bytes(size)}")
+        self.logger.info("按拓展名统计:")
+        extensions = sorted(
+            self.extensions.items(), key=lambda x: x[1][1], reverse=True)
+        for extension, (assets, size) in extensions:
+            self.logger.info(f"  {extension}: 资源 {assets}, {human_bytes(size)}")
+        if self.latency is None:
+            self.logger.warning("未进行探测, 无法预测耗时")
+            return
+        self.logger.info(
+            f"探测结果: 请求延迟 {self.latency * 1000:.0f}ms, 下载带宽 {self._rate(self.download_rate)}")
+        if self.upload_latency is not None:
+            self.logger.info(
+                f"探测结果: 上传延迟 {self.upload_latency * 1000:.0f}ms, "
+                f"上传带宽 {self._rate(self.upload_rate)}")
+        else:
+            self.logger.info("未探测上传, 假设上传与下载相同")
+        self.logger.info("下载加速比: " + ", ".join(
+            f"并发{level} {speedup:.1f}x" for level, speedup in sorted(self.speedups.items())))
+        self.logger.info(
+            f"预测耗时 (超过并发{max(self.speedups)}时按实测的最大加速比计算, "
+            f"上传的并发扩展可使用loadtest命令测量):")
+        for pool in sorted(set(pools)):
+            self.logger.info(f"  --pool {pool}: {human_seconds(self.predict(pool))}")
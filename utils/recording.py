@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: recording.py
+@time: 2026/10/20 2:40 上午
+"""
+
+__version__ = (0, 0, 1)
+__update_str__ = "初始创建, 源Nexus请求的录制及离线回放"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+
+from utils.classes import Log
+from utils.exceptions import RecordingFormatError
+from utils.planner import human_bytes
+
+RECORDING_VERSION = 1
+# 录制的JSON中源地址替换为该占位符, 回放时替换为回放服务的地址
+BASE_PLACEHOLDER = "{base}"
+RECORDED_HEADERS = ["Content-Type", "Accept-Ranges", "Last-Modified", "ETag"]
+CHUNK_SIZE = 64 * 1024
+# 占位内容: 固定的伪随机块循环填充, 不可压缩, 与原始内容等长
+BLOCK = b"".join(hashlib.sha256(i.to_bytes(4, "big")).digest() for i in range(CHUNK_SIZE // 32))
+XML_EXTENSIONS = (".pom", ".xml")
+XML_HEAD = b'<?xml version="1.0" encoding="UTF-8"?>\n' \
+           b'<project xmlns="http://maven.apache.org/POM/4.0.0"><!--'
+XML_TAIL = b"--></project>\n"
+XML_MAXIMUM = 1024 * 1024
+SESSION_API = "/service/rapture/session"
+LISTING_APIS = ("/service/rest/v1/components", "/service/rest/v1/assets", "/service/rest/v1/search")
+REPOSITORIES_API = "/service/rest/v1/repositories"
+UPLOAD_API = "/service/rest/v1/components"
+
+
+def request_key(method: str, path: str):
+    """
+    请求的匹配键, 查询参数按名称排序
+    :param method: str 请求方法
+    :param path: str 路径及查询参数
+    :return: str
+    """
+    parts = urlsplit(path)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method} {parts.path}?{query}" if query else f"{method} {parts.path}"
+
+
+def is_xml(path: str, size: int):
+    return path.endswith(XML_EXTENSIONS) and len(XML_HEAD) + len(XML_TAIL) <= size <= XML_MAXIMUM
+
+
+def placeholder(path: str, size: int, start: int = 0, end: int = None):
+    """
+    生成与原始内容等长的占位内容, pom及xml为合法的XML, 其他为循环填充的伪随机数据
+    :param path: str 资源路径
+    :param size: int 原始内容的字节数
+    :param start: int 起始偏移
+    :param end: int 结束偏移(包含), 默认为末尾
+    :return: generator 分块的bytes
+    """
+    end = size - 1 if end is None else min(end, size - 1)
+    if is_xml(path, size):
+        padding = size - len(XML_HEAD) - len(XML_TAIL)
+        yield (XML_HEAD + b" " * padding + XML_TAIL)[start:end + 1]
+        return
+    position = start
+    while position <= end:
+        offset = position % len(BLOCK)
+        chunk = BLOCK[offset:] + BLOCK[:offset]
+        chunk = chunk[:end + 1 - position]
+        position += len(chunk)
+        yield chunk
+
+
+def placeholder_digests(resources: set, algorithms: tuple):
+    """
+    计算占位内容的摘要, 循环填充的内容按大小排序后单次计算, 耗时与最大的资源成正比
+    :param resources: set {(路径, 字节数)}
+    :param algorithms: tuple 算法
+    :return: dict {(路径, 字节数): {算法: 摘要值}}
+    """
+    digests = {}
+    filler = {}
+    for path, size in resources:
+        if is_xml(path, size):
+            hashes = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+            for chunk in placeholder(path, size):
+                for h in hashes.values():
+                    h.update(chunk)
+            digests[(path, size)] = {algorithm: h.hexdigest() for algorithm, h in hashes.items()}
+        else:
+            filler.setdefault(size, []).append(path)
+    hashes = {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+    position = 0
+    for size in sorted(filler):
+        for chunk in placeholder("", size, position):
+            for h in hashes.values():
+                h.update(chunk)
+        position = size
+        result = {algorithm: h.copy().hexdigest() for algorithm, h in hashes.items()}
+        for path in filler[size]:
+            digests[(path, size)] = result
+    return digests
+
+
+class Recorder(object):
+    """源Nexus请求录制"""
+
+    def __init__(self, path: str, upstream: str, logger: logging.Logger = None):
+        """
+        初始化
+        在本机启动反向代理, 源Nexus的请求经代理转发并记录方法, 路径, 状态码, 首字节及完成耗时
+        JSON响应完整记录(源地址替换为占位符), 其他内容只记录大小, 不记录认证信息及请求体
+        :param path: str 录制文件路径(gzip压缩的JSON Lines)
+        :param upstream: str 源Nexus地址, 例如 http://nexus:8081
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.path = path
+        self.upstream = upstream.rstrip("/")
+        self.logger = logger if logger else Log().logger
+        self.exchanges = 0
+        self.bytes = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._server = None
+        self._start = None
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path} Upstream={self.upstream}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _upstreams(self):
+        """
+        源Nexus在JSON中可能出现的地址, 默认端口可能被省略
+        :return: list
+        """
+        upstreams = [self.upstream]
+        parts = urlsplit(self.upstream)
+        if (parts.scheme, parts.port) in [("http", 80), ("https", 443)]:
+            upstreams.append(f"{parts.scheme}://{parts.hostname}")
+        return upstreams
+
+    def write(self, entry: dict):
+        """
+        写入一条记录
+        :param entry: dict 记录
+        :return: None
+        """
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line.encode("utf-8"))
+            self.exchanges += 1
+            self.bytes += entry.get("size", 0)
+
+    def forward(self, handler: BaseHTTPRequestHandler):
+        """
+        转发一个请求至源Nexus, 返回响应并记录
+        :param handler: BaseHTTPRequestHandler 请求处理器
+        :return: None
+        """
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else None
+        headers = {key: value for key, value in handler.headers.items()
+                   if key.lower() not in ("host", "connection", "accept-encoding", "content-length")}
+        headers["Accept-Encoding"] = "identity"
+        entry = {"t": round(time.perf_counter() - self._start, 6),
+                 "method": handler.command, "path": handler.path}
+        start = time.perf_counter()
+        try:
+            response = requests.request(
+                handler.command, self.upstream + handler.path, headers=headers, data=body,
+                stream=True, allow_redirects=False)
+        except requests.exceptions.RequestException as e:
+            entry.update({"status": 502, "ttfb": round(time.perf_counter() - start, 6),
+                          "elapsed": round(time.perf_counter() - start, 6), "size": 0,
+                          "kind": "blob", "headers": {}})
+            self.write(entry)
+            handler.send_error(502, str(e))
+            return
+        entry["ttfb"] = round(time.perf_counter() - start, 6)
+        entry["status"] = response.status_code
+        entry["headers"] = {key: response.headers[key] for key in RECORDED_HEADERS
+                            if key in response.headers}
+        with response:
+            handler.send_response(response.status_code)
+            for key in RECORDED_HEADERS + ["Content-Range", "Set-Cookie"]:
+                if key in response.headers:
+                    handler.send_header(key, response.headers[key])
+            if "Location" in response.headers:
+                handler.send_header("Location", self._rewrite(response.headers["Location"]))
+            if "json" in response.headers.get("Content-Type", ""):
+                text = response.content.decode("utf-8")
+                data = self._rewrite(text).encode("utf-8")
+                handler.send_header("Content-Length", str(len(data)))
+                handler.end_headers()
+                if handler.command != "HEAD":
+                    handler.wfile.write(data)
+                entry.update({"kind": "json", "size": len(data),
+                              "body": self._rewrite(text, BASE_PLACEHOLDER)})
+            else:
+                size = self._stream(handler, response)
+                entry.update({"kind": "blob", "size": size, "total": self._total(response, size)})
+        entry["elapsed"] = round(time.perf_counter() - start, 6)
+        self.write(entry)
+
+    def _rewrite(self, text: str, base: str = None):
+        """
+        替换源Nexus的地址
+        :param text: str 文本
+        :param base: str 替换为的地址, 默认为代理地址
+        :return: str
+        """
+        for upstream in self._upstreams():
+            text = text.replace(upstream, base if base else self.url)
+        return text
+
+    @staticmethod
+    def _stream(handler: BaseHTTPRequestHandler, response: requests.Response):
+        """
+        将非JSON的响应体流式返回客户端, 不缓存内容
+        :param handler: BaseHTTPRequestHandler 请求处理器
+        :param response: Response 源Nexus的响应
+        :return: int 字节数
+        """
+        length = response.headers.get("Content-Length")
+        if length is None:
+            # 长度未知时以关闭连接结束响应
+            handler.send_header("Connection", "close")
+            handler.close_connection = True
+        else:
+            handler.send_header("Content-Length", length)
+        handler.end_headers()
+        size = 0
+        if handler.command == "HEAD":
+            return int(length or 0)
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            handler.wfile.write(chunk)
+            size += len(chunk)
+        return size
+
+    @staticmethod
+    def _total(response: requests.Response, size: int):
+        """
+        资源的完整大小, Range请求取Content-Range中的总长度
+        :param response: Response 源Nexus的响应
+        :param size: int 本次传输的字节数
+        :return: int
+        """
+        match = re.match(r"bytes \d+-\d+/(\d+)", response.headers.get("Content-Range", ""))
+        return int(match.group(1)) if match else size
+
+    def start(self):
+        """
+        在后台线程中启动录制代理, 监听本机随机端口
+        :return: self
+        """
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """录制代理请求处理器"""
+            protocol_version = "HTTP/1.1"
+
+            def handle_one_request(self):
+                self.raw_requestline = self.rfile.readline(65537)
+                if not self.raw_requestline or not self.parse_request():
+                    self.close_connection = True
+                    return
+                recorder.forward(self)
+                self.wfile.flush()
+
+            def log_message(self, fmt, *args):
+                recorder.logger.debug(fmt % args)
+
+        self._file = gzip.open(self.path, "wb", compresslevel=6)
+        header = {"version": RECORDING_VERSION, "upstream": self.upstream,
+                  "created": datetime.now().isoformat(timespec="seconds")}
+        self._file.write((json.dumps(header) + "\n").encode("utf-8"))
+        self._start = time.perf_counter()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.logger.info(f"录制代理已启动: {self.url} -> {self.upstream}, 录制文件: {self.path}")
+        return self
+
+    def close(self):
+        """
+        停止代理并关闭录制文件
+        :return: None
+        """
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        with self._lock:
+            self._file.close()
+        self.logger.info(f"录制完成: 请求 {self.exchanges}, 内容 {human_bytes(self.bytes)}, "
+                         f"录制文件: {self.path}")
+
+
+class Replayer(object):
+    """录制回放服务"""
+
+    def __init__(
+            self,
+            path: str,
+            latency: float = 1.0,
+            sinks: list = None,
+            results: str = None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        按录制的顺序返回相同请求的响应, 资源内容为等长的占位内容, 列表中的校验和替换为占位内容的摘要
+        :param path: str 录制文件路径
+        :param latency: float 延迟倍数, 1为录制时的首字节及传输耗时, 0为不延迟
+        :param sinks: list 作为目标的存储库名称, 接收上传但不保存, 使回放不依赖任何Nexus
+        :param results: str 可选, 每次回放的统计追加写入该文件(JSON Lines), 并与上一次比较
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.path = path
+        self.latency = max(0.0, latency)
+        self.sinks = sinks if sinks else []
+        self.results = results
+        self.logger = logger if logger else Log().logger
+        self.header = {}
+        self.counts = {"requests": 0, "misses": 0, "bytes": 0, "uploads": 0, "uploaded": 0}
+        self._exchanges = {}
+        self._blobs = {}
+        self._served = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._start = None
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path} Latency={self.latency}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def load(self):
+        """
+        读取录制文件, 并将JSON中的校验和替换为占位内容的摘要
+        :return: None
+        """
+        entries = []
+        with gzip.open(self.path, "rb") as f:
+            self.header = json.loads(f.readline())
+            if self.header.get("version") != RECORDING_VERSION:
+                raise RecordingFormatError(
+                    f"{self.path} version {self.header.get('version')} is NOT supported")
+            for line in f:
+                entries.append(json.loads(line))
+        for entry in entries:
+            if entry["kind"] == "blob" and entry["status"] in (200, 206) \
+                    and entry["method"] in ("GET", "HEAD"):
+                path = urlsplit(entry["path"]).path
+                if path not in self._blobs or self._blobs[path]["method"] == "HEAD":
+                    self._blobs[path] = entry
+            else:
+                self._exchanges.setdefault(request_key(entry["method"], entry["path"]), []).append(entry)
+        bodies = [(entry, json.loads(entry["body"])) for entry in entries if entry["kind"] == "json"]
+        assets = []
+        for _, data in bodies:
+            self._collect(data, assets)
+        resources, algorithms = set(), set()
+        for asset in assets:
+            size = self._size(asset)
+            if size is not None:
+                resources.add((asset.get("path") or "", size))
+                algorithms.update(asset["checksum"])
+        start = time.perf_counter()
+        digests = placeholder_digests(resources, tuple(sorted(algorithms)))
+        for asset in assets:
+            size = self._size(asset)
+            if size is not None:
+                digest = digests[(asset.get("path") or "", size)]
+                asset["checksum"] = {key: digest[key] for key in asset["checksum"]}
+        for entry, data in bodies:
+            entry["body"] = json.dumps(data)
+        self.logger.info(
+            f"已读取录制文件: {self.path}, 请求 {len(entries)}, 资源 {len(self._blobs)}, "
+            f"占位摘要耗时 {time.perf_counter() - start:.1f}s")
+
+    def _collect(self, data, assets: list):
+        """
+        递归查找带有校验和的资源
+        :param data: dict or list JSON数据
+        :param assets: list 结果
+        :return: None
+        """
+        if isinstance(data, list):
+            for item in data:
+                self._collect(item, assets)
+        elif isinstance(data, dict):
+            if isinstance(data.get("checksum"), dict) and "path" in data:
+                assets.append(data)
+            for value in data.values():
+                if isinstance(value, (list, dict)):
+                    self._collect(value, assets)
+
+    def _size(self, asset: dict):
+        """
+        资源的大小, 优先使用列表中的fileSize, 其次为录制时下载的大小
+        :param asset: dict 资源
+        :return: int or None
+        """
+        if asset.get("fileSize") is not None:
+            return int(asset["fileSize"])
+        url = asset.get("downloadUrl") or ""
+        blob = self._blobs.get(urlsplit(url.replace(BASE_PLACEHOLDER, "")).path)
+        return blob["total"] if blob else None
+
+    def _next(self, key: str):
+        """
+        按录制顺序返回匹配的记录, 用尽后重复最后一条
+        :param key: str 匹配键
+        :return: dict or None
+        """
+        entries = self._exchanges.get(key)
+        if not entries:
+            return None
+        with self._lock:
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+
+    def _sleep(self, seconds: float):
+        if self.latency and seconds > 0:
+            time.sleep(seconds * self.latency)
+
+    def _count(self, key: str, value: int = 1):
+        with self._lock:
+            self.counts[key] += value
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        """
+        回放一个请求
+        :param handler: BaseHTTPRequestHandler 请求处理器
+        :return: None
+        """
+        self._count("requests")
+        length = int(handler.headers.get("Content-Length") or 0)
+        if length:
+            handler.rfile.read(length)
+        method = handler.command
+        parts = urlsplit(handler.path)
+        if method == "POST" and parts.path == SESSION_API:
+            cookie = hashlib.sha1(str(time.time()).encode("utf-8")).hexdigest()
+            return self._reply(handler, 204, headers={"Set-Cookie": f"NXSESSIONID={cookie}; Path=/"})
+        if method in ("GET", "HEAD") and parts.path in self._blobs:
+            return self._blob(handler, self._blobs[parts.path])
+        entry = self._next(request_key(method, handler.path))
+        if entry is None and method == "HEAD":
+            entry = self._next(request_key("GET", handler.path))
+        if entry is not None:
+            return self._entry(handler, entry)
+        sink = self._sink(handler, parts, length)
+        if sink is not None:
+            return sink
+        self._count("misses")
+        self.logger.debug(f"回放未匹配: {method} {handler.path}")
+        return self._reply(handler, 404, b"not recorded", "text/plain")
+
+    def _reply(self, handler: BaseHTTPRequestHandler, status: int, body: bytes = b"",
+               content_type: str = "application/json", headers: dict = None):
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(body)
+
+    def _entry(self, handler: BaseHTTPRequestHandler, entry: dict):
+        """
+        返回录制的非资源响应
+        :param handler: BaseHTTPRequestHandler 请求处理器
+        :param entry: dict 记录
+        :return: None
+        """
+        self._sleep(entry["elapsed"])
+        if entry["kind"] == "json":
+            text = entry["body"].replace(BASE_PLACEHOLDER, self.url)
+            if urlsplit(entry["path"]).path == REPOSITORIES_API and self.sinks:
+                text = self._with_sinks(text)
+            body = text.encode("utf-8")
+        else:
+            body = b"".join(placeholder(entry["path"], entry["size"]))
+        self._count("bytes", len(body))
+        return self._reply(handler, entry["status"], body,
+                           entry["headers"].get("Content-Type", "application/octet-stream"))
+
+    def _blob(self, handler: BaseHTTPRequestHandler, entry: dict):
+        """
+        返回资源的占位内容, 支持Range请求, 按录制时的传输速率限速
+        :param handler: BaseHTTPRequestHandler 请求处理器
+        :param entry: dict 记录
+        :return: None
+        """
+        path, total = urlsplit(entry["path"]).path, entry["total"]
+        start, end, status = 0, total - 1, 200
+        match = re.match(r"bytes=(\d+)-(\d*)", handler.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), total - 1) if match.group(2) else total - 1
+            status = 206
+        self._sleep(entry["ttfb"])
+        handler.send_response(status)
+        for key, value in entry["headers"].items():
+            handler.send_header(key, value)
+        if status == 206:
+            handler.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        handler.send_header("Content-Length", str(max(0, end - start + 1)))
+        handler.end_headers()
+        if handler.command == "HEAD":
+            return
+        transfer = max(0.0, entry["elapsed"] - entry["ttfb"])
+        rate = entry["size"] / transfer if transfer and entry["size"] else 0
+        for chunk in placeholder(path, total, start, end):
+            handler.wfile.write(chunk)
+            self._count("bytes", len(chunk))
+            if rate:
+                self._sleep(len(chunk) / rate)
+
+    def _with_sinks(self, text: str):
+        """
+        在存储库列表中加入作为目标的存储库
+        :param text: str 录制的存储库列表
+        :return: str
+        """
+        repositories = json.loads(text)
+        names = {repository.get("name") for repository in repositories}
+        template = next((repository for repository in repositories
+                         if repository.get("type") == "hosted"), {"format": "maven2"})
+        for sink in self.sinks:
+            if sink not in names:
+                repositories.append({**template, "name": sink, "type": "hosted",
+                                     "url": f"{self.url}/repository/{sink}"})
+        return json.dumps(repositories)
+
+    def _sink(self, handler: BaseHTTPRequestHandler, parts, length: int):
+        """
+        作为目标的存储库: 接收上传, 列表为空, 存储库信息与录制的源存储库一致
+        :param handler: BaseHTTPRequestHandler 请求处理器
+        :param parts: SplitResult 请求地址
+        :param length: int 请求体字节数
+        :return: bool 已处理时为True, 未匹配时为None
+        """
+        query = dict(parse_qsl(parts.query))
+        if query.get("repository") in self.sinks:
+            if handler.command == "POST" and parts.path == UPLOAD_API:
+                self._count("uploads")
+                self._count("uploaded", length)
+                self._reply(handler, 204)
+                return True
+            if handler.command == "GET" and parts.path in LISTING_APIS:
+                self._reply(handler, 200, json.dumps({"items": [], "continuationToken": None}).encode())
+                return True
+        name = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        if name in self.sinks and parts.path.startswith(REPOSITORIES_API + "/"):
+            source = next((key for key in self._exchanges
+                           if key.startswith("GET " + parts.path.rsplit("/", 1)[0] + "/")), None)
+            if source is not None:
+                entry = self._exchanges[source][0]
+                data = json.loads(entry["body"].replace(BASE_PLACEHOLDER, self.url))
+                data.update({"name": name, "url": f"{self.url}/repository/{name}"})
+                self._reply(handler, 200, json.dumps(data).encode("utf-8"))
+                return True
+        if handler.command == "DELETE" and self.sinks:
+            self._reply(handler, 204)
+            return True
+        return None
+
+    def start(self):
+        """
+        读取录制文件并在后台线程中启动回放服务, 监听本机随机端口
+        :return: self
+        """
+        replayer = self
+        self.load()
+
+        class Handler(BaseHTTPRequestHandler):
+            """回放请求处理器"""
+            protocol_version = "HTTP/1.1"
+
+            def handle_one_request(self):
+                self.raw_requestline = self.rfile.readline(65537)
+                if not self.raw_requestline or not self.parse_request():
+                    self.close_connection = True
+                    return
+                replayer.handle(self)
+                self.wfile.flush()
+
+            def log_message(self, fmt, *args):
+                replayer.logger.debug(fmt % args)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._start = time.perf_counter()
+        self.logger.info(f"回放服务已启动: {self.url}, 延迟倍数 {self.latency}, "
+                         f"录制于 {self.header.get('created')}")
+        return self
+
+    def close(self):
+        """
+        停止回放服务, 输出统计并与上一次回放比较
+        :return: dict 本次统计
+        """
+        if self._server is None:
+            return None
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        elapsed = time.perf_counter() - self._start
+        result = {"created": datetime.now().isoformat(timespec="seconds"),
+                  "recording": os.path.abspath(self.path), "latency": self.latency,
+                  "elapsed": round(elapsed, 3), **self.counts}
+        self.logger.info(
+            f"回放统计: 请求 {result['requests']}, 未匹配 {result['misses']}, "
+            f"返回 {human_bytes(result['bytes'])}, 接收上传 {result['uploads']} "
+            f"({human_bytes(result['uploaded'])}), 耗时 {elapsed:.1f}s, "
+            f"{result['requests'] / elapsed if elapsed else 0:.1f} req/s")
+        if self.results:
+            self._compare(result)
+            with open(self.results, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result) + "\n")
+        return result
+
+    def _compare(self, result: dict):
+        """
+        与结果文件中同一录制及延迟倍数的上一次回放比较
+        :param result: dict 本次统计
+        :return: None
+        """
+        if not os.path.exists(self.results):
+            return
+        previous = None
+        with open(self.results, "r", encoding="utf-8") as f:
+            for line in f:
+                item = json.loads(line)
+                if item.get("recording") == result["recording"] and item.get("latency") == result["latency"]:
+                    previous = item
+        if previous is None:
+            return
+        changes = []
+        for key in ["elapsed", "requests", "misses", "uploads"]:
+            before, after = previous.get(key, 0), result[key]
+            ratio = f" ({(after - before) / before * 100:+.1f}%)" if before else ""
+            changes.append(f"{key} {before} -> {after}{ratio}")
+        self.logger.info(f"与上一次回放({previous['created']})比较: " + ", ".join(changes))
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: replicator.py
+@time: 2026/10/19 6:40 下午
+"""
+
+__version__ = (0, 0, 2)
+__update_str__ = "事件及对账应用过滤规则及快照保留策略; 快照按基础版本对账; 对账使用分区临时文件"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import hmac
+import json
+import logging
+import tempfile
+import threading
+import time
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from shutil import rmtree
+
+from utils.audit import DEFAULT_PARTITIONS, SOURCE, TARGET, Spill
+from utils.classes import Nexus, Log
+from utils.filters import ComponentFilter, SnapshotPolicy
+
+DEFAULT_DEBOUNCE = 5.0
+DEFAULT_RECONCILE_INTERVAL = 3600
+DEFAULT_RECONCILE_DELAY = 1.0
+SIGNATURE_HEADER = "X-Nexus-Webhook-Signature"
+
+
+class Replicator(object):
+    """持续同步器"""
+
+    UPSERT = "upsert"
+    DELETE = "delete"
+
+    def __init__(
+            self,
+            src_repo: Nexus.Repository,
+            dst_repo: Nexus.Repository,
+            submit,
+            debounce: float = DEFAULT_DEBOUNCE,
+            reconcile_interval: float = DEFAULT_RECONCILE_INTERVAL,
+            reconcile_delay: float = DEFAULT_RECONCILE_DELAY,
+            secret: str = None,
+            filters: dict = None,
+            snapshot_policy: dict = None,
+            partitions: int = DEFAULT_PARTITIONS,
+            tmp_dir: str = None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        事件及对账与迁移使用相同的过滤规则及快照保留策略
+        :param src_repo: Repository类 源存储库实例
+        :param dst_repo: Repository类 目标存储库实例
+        :param submit: function 接收组件并派发迁移的函数
+        :param debounce: float 同一组件最后一次事件后等待的秒数, 期间的重复事件合并为一次
+        :param reconcile_interval: float 对账扫描间隔(秒), 0为不扫描
+        :param reconcile_delay: float 对账扫描时每页之间的等待秒数, 用于降低对源的压力
+        :param secret: str 可选, Webhook密钥, 用于校验签名
+        :param filters: dict 可选, 组件过滤规则, 参考ComponentFilter
+        :param snapshot_policy: dict 可选, 快照保留策略, 参考SnapshotPolicy, 仅对SNAPSHOT源存储库生效
+        :param partitions: int 对账时的分区数, 决定内存占用
+        :param tmp_dir: str 对账时分区文件的临时目录
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.src_repo = src_repo
+        self.dst_repo = dst_repo
+        self.submit = submit
+        self.debounce = debounce
+        self.reconcile_interval = reconcile_interval
+        self.reconcile_delay = reconcile_delay
+        self.secret = secret.encode("utf-8") if secret else None
+        self.logger = logger if logger else Log().logger
+        self.filters = filters if filters else {}
+        self.snapshot_policy = snapshot_policy if snapshot_policy else {}
+        self.partitions = partitions
+        self.tmp_dir = tmp_dir
+        # 事件使用的规则, 启动时即校验配置
+        self.rules = ComponentFilter(**self.filters, logger=self.logger)
+        self.policy = SnapshotPolicy(**self.snapshot_policy, logger=self.logger) \
+            if src_repo.maven_version_policy == "SNAPSHOT" else None
+        # (group, name, version) -> [到期时间, 动作, 组件ID或组件实例]
+        self._pending = {}
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self.received = 0
+        self.coalesced = 0
+        self.replicated = 0
+        self.skipped = 0
+        self.deleted = 0
+
+    def __str__(self):
+        return f"<{self.__doc__} Source={self.src_repo.name} Target={self.dst_repo.name}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def verify(self, body: bytes, signature: str):
+        """
+        校验Webhook签名 (HMAC-SHA1)
+        :param body: bytes 请求体
+        :param signature: str 请求头中的签名
+        :return: bool
+        """
+        if not self.secret:
+            return True
+        expected = hmac.new(self.secret, body, sha1).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
+
+    def receive(self, event: dict):
+        """
+        处理一个Webhook事件, 仅记录待同步的组件, 由派发线程在防抖时间后处理
+        :param event: dict Webhook请求体
+        :return: bool 是否为需要同步的组件事件
+        """
+        component = event.get("component")
+        if not component or event.get("repositoryName") != self.src_repo.name:
+            return False
+        key = (component.get("group"), component.get("name"), component.get("version"))
+        action = self.DELETE if event.get("action") == "DELETED" else self.UPSERT
+        # REST接口使用componentId, 旧版本仅有id
+        self.enqueue(key, action, component.get("componentId") or component.get("id"))
+        self.received += 1
+        return True
+
+    def enqueue(self, key: tuple, action: str, payload):
+        """
+        记录待同步的组件, 已存在时合并并重新计时
+        :param key: tuple (group, name, version)
+        :param action: str UPSERT或DELETE
+        :param payload: str or Component类 组件ID或组件实例
+        :return: None
+        """
+        with self._condition:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = [time.monotonic() + self.debounce, action, payload]
+            self._condition.notify()
+
+    def _due(self):
+        """
+        取出已到期的组件, 未到期时等待
+        :return: list [(key, 动作, 组件ID或组件实例)]
+        """
+        with self._condition:
+            while not self._stopped.is_set():
+                now = time.monotonic()
+                due = [key for key, (deadline, _, _) in self._pending.items()
+                       if deadline <= now]
+                if due:
+                    return [(key, *self._pending.pop(key)[1:]) for key in due]
+                deadlines = [item[0] for item in self._pending.values()]
+                self._condition.wait(
+                    min(deadlines) - now if deadlines else None)
+            return []
+
+    def dispatch(self):
+        """
+        派发线程, 将到期的组件交给迁移函数或在目标删除
+        :return: None
+        """
+        while not self._stopped.is_set():
+            for key, action, payload in self._due():
+                try:
+                    if action == self.DELETE:
+                        for component in self.dst_repo.find_components(*key):
+                            self.dst_repo.delete_component(component.id)
+                        self.deleted += 1
+                        self.logger.info(f"已在目标删除[{':'.join(key)}]")
+                        continue
+                    component = payload
+                    if isinstance(payload, str):
+                        component = self.src_repo.component(payload)
+                    if not self.accepts(component):
+                        self.skipped += 1
+                        self.logger.debug(f"[{':'.join(key)}]不在同步范围内, 跳过")
+                        continue
+                    self.submit(component)
+                    self.replicated += 1
+                except Exception as e:
+                    self.logger.error(f"同步[{':'.join(str(k) for k in key)}]失败: {e}")
+
+    def accepts(self, component):
+        """
+        判断事件中的组件是否在同步范围内
+        :param component: Component类
+        :return: bool
+        """
+        if not self.rules.match(component):
+            return False
+        return self.policy is None or self.policy.match(component)
+
+    def select(self, components):
+        """
+        对账时筛选源组件, 与迁移时相同, 每次对账使用新的统计
+        :param components: Iterable 组件可迭代对象
+        :return: generator
+        """
+        rules = ComponentFilter(**self.filters, logger=self.logger)
+        if rules.enabled:
+            components = rules.apply(components)
+        if self.policy is not None:
+            components = SnapshotPolicy(**self.snapshot_policy, logger=self.logger).apply(components)
+        return components
+
+    def _iter(self, repository: Nexus.Repository):
+        """
+        低速列出存储库的组件, 每页之间等待
+        :param repository: Repository类 存储库实例
+        :return: generator
+        """
+        for getter in repository.iter_component_getter:
+            yield from getter.components
+            time.sleep(self.reconcile_delay)
+
+    @staticmethod
+    def _row(component):
+        """
+        返回对账时比对的列: 组ID, 名称, 基础版本, 构建时间, 版本, 组件ID
+        非时间戳版本的基础版本即版本, 构建时间为空
+        :param component: Component类
+        :return: list
+        """
+        version = component.version or ""
+        match = SnapshotPolicy.TIMESTAMP_PATTERN.match(version)
+        base, timestamp = (match.group("base"), match.group("timestamp")) if match else (version, "")
+        return [component.group or "", component.name or "", base, timestamp, version,
+                getattr(component, "id", None) or ""]
+
+    def reconcile(self):
+        """
+        对账扫描, 低速列出源及目标, 将目标缺少的组件加入待同步队列, 用于补偿丢失的事件
+        两侧按分区写入临时文件后逐个分区比对, 内存占用与单个分区成正比
+        快照由Maven客户端重新部署, 目标的时间戳及构建号与源不同, 因此按基础版本比对:
+        源构建晚于目标中该基础版本的最新构建时才视为缺失
+        :return: int 加入队列的组件数
+        """
+        directory = tempfile.mkdtemp(prefix="reconcile-", dir=self.tmp_dir)
+        try:
+            spills = {}
+            for side, components in [(TARGET, self._iter(self.dst_repo)),
+                                     (SOURCE, self.select(self._iter(self.src_repo)))]:
+                with Spill(directory, side, self.partitions, width=3) as spill:
+                    for component in components:
+                        spill.write(self._row(component))
+                spills[side] = spill
+            missing = 0
+            for i in range(self.partitions):
+                # 目标中每个基础版本的最新构建时间, 时间戳格式固定, 可按字符串比较
+                latest = {}
+                for key, row in spills[TARGET].read(i):
+                    latest[key] = max(latest.get(key, ""), row[3])
+                for key, row in spills[SOURCE].read(i):
+                    if key in latest and row[3] <= latest[key]:
+                        continue
+                    missing += 1
+                    self.enqueue((row[0], row[1], row[4]), self.UPSERT, row[5])
+        finally:
+            rmtree(directory, ignore_errors=True)
+        self.logger.info(f"对账完成: 目标缺少{missing}个组件, 已加入同步队列")
+        return missing
+
+    def _reconcile_loop(self):
+        """
+        定期对账线程
+        :return: None
+        """
+        while not self._stopped.wait(self.reconcile_interval):
+            try:
+                self.reconcile()
+            except Exception as e:
+                self.logger.error(f"对账失败: {e}")
+
+    def serve(self, host: str = "0.0.0.0", port: int = 8766):
+        """
+        启动Webhook接收服务, 直到进程被终止
+        :param host: str 监听地址
+        :param port: int 监听端口
+        :return: None
+        """
+        replicator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Webhook请求处理器"""
+
+            def _reply(self, data, status: int = 200):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/status":
+                    self._reply(replicator.status())
+                else:
+                    self._reply({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                if not replicator.verify(body, self.headers.get(SIGNATURE_HEADER)):
+                    self._reply({"error": "invalid signature"}, 403)
+                    return
+                try:
+                    event = json.loads(body or b"{}")
+                except ValueError:
+                    self._reply({"error": "invalid json"}, 400)
+                    return
+                self._reply({"accepted": replicator.receive(event)})
+
+            def log_message(self, fmt, *args):
+                replicator.logger.debug(fmt % args)
+
+        threads = [threading.Thread(target=self.dispatch, daemon=True)]
+        if self.reconcile_interval:
+            threads.append(threading.Thread(target=self._reconcile_loop, daemon=True))
+        for thread in threads:
+            thread.start()
+        server = ThreadingHTTPServer((host, port), Handler)
+        self.logger.info(
+            f"同步服务已启动: http://{host}:{port} [{self.src_repo.name}] -> [{self.dst_repo.name}]")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.stop()
+
+    def stop(self):
+        """
+        停止派发及对账线程
+        :return: None
+        """
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def status(self):
+        """
+        返回同步统计
+        :return: dict
+        """
+        with self._condition:
+            pending = len(self._pending)
+        return {"received": self.received, "coalesced": self.coalesced,
+                "pending": pending, "replicated": self.replicated,
+                "skipped": self.skipped, "deleted": self.deleted}
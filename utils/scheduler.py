@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: scheduler.py
+@time: 2026/10/19 9:30 上午
+"""
+
+__version__ = (0, 0, 3)
+__update_str__ = "版本排序与Maven的ComparableVersion一致"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import time
+import logging
+from datetime import datetime, timezone
+from functools import total_ordering
+
+from utils.classes import Log
+
+# Maven版本限定符排序, 与Maven的ComparableVersion一致, 未列出的限定符按字符串排在sp之后
+QUALIFIERS = ["alpha", "beta", "milestone", "rc", "snapshot", "", "sp"]
+# 限定符别名, 其中a/b/m仅在后接数字时生效, 例如 1a1 即 1-alpha-1
+ALIASES = {"ga": "", "final": "", "release": "", "cr": "rc"}
+SHORT_ALIASES = {"a": "alpha", "b": "beta", "m": "milestone"}
+RELEASE = str(QUALIFIERS.index(""))
+
+
+def _qualifier(value: str, followed_by_digit: bool = False):
+    """
+    返回限定符的可比较字符串, 已知限定符为其序号, 未知限定符为 序号上限-限定符
+    :param value: str 限定符
+    :param followed_by_digit: bool 是否后接数字
+    :return: str
+    """
+    if followed_by_digit and len(value) == 1:
+        value = SHORT_ALIASES.get(value, value)
+    value = ALIASES.get(value, value)
+    if value in QUALIFIERS:
+        return str(QUALIFIERS.index(value))
+    return f"{len(QUALIFIERS)}-{value}"
+
+
+def _is_null(item):
+    """
+    判断版本项是否为空: 数字0, 正式版限定符或空列表
+    :param item: int or str or list 版本项
+    :return: bool
+    """
+    if isinstance(item, int):
+        return item == 0
+    if isinstance(item, str):
+        return item == RELEASE
+    return not item
+
+
+def _compare(left, right):
+    """
+    比较两个版本项: 数字为int, 限定符为str(可比较字符串), 子列表为list
+    :param left: int or str or list 左侧项
+    :param right: int or str or list or None 右侧项, None表示右侧已结束
+    :return: int -1, 0 或 1
+    """
+    if isinstance(left, int):
+        if right is None:
+            return 0 if left == 0 else 1
+        if isinstance(right, int):
+            return (left > right) - (left < right)
+        return 1
+    if isinstance(left, str):
+        if right is None:
+            return (left > RELEASE) - (left < RELEASE)
+        if isinstance(right, int):
+            return -1
+        if isinstance(right, str):
+            return (left > right) - (left < right)
+        return -1
+    if right is None:
+        return _compare(left[0], None) if left else 0
+    if isinstance(right, int):
+        return -1
+    if isinstance(right, str):
+        return 1
+    for i in range(max(len(left), len(right))):
+        l, r = left[i] if i < len(left) else None, right[i] if i < len(right) else None
+        result = -_compare(r, None) if l is None else _compare(l, r)
+        if result:
+            return result
+    return 0
+
+
+@total_ordering
+class ComparableVersion(object):
+    """Maven版本"""
+
+    def __init__(self, version: str):
+        """
+        初始化, 按Maven的ComparableVersion解析
+        . 分隔同一层级的项, - 及数字与字母的交界开始新的子列表, 各列表去掉结尾的0及正式版限定符
+        :param version: str 版本号, 例如 1.2.0-rc1
+        """
+        self.value = version or ""
+        self.items = self._parse(self.value.lower())
+
+    def __str__(self):
+        return f"<{self.__doc__} Version={self.value}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other):
+        return _compare(self.items, other.items) == 0
+
+    def __lt__(self, other):
+        return _compare(self.items, other.items) < 0
+
+    @staticmethod
+    def _parse(version: str):
+        """
+        解析版本号
+        :param version: str 小写的版本号
+        :return: list
+        """
+        items = current = []
+        stack = [items]
+        is_digit = False
+        start = 0
+
+        def parse(token, digit):
+            return int(token) if digit else _qualifier(token)
+
+        def child():
+            nonlocal current
+            current.append([])
+            current = current[-1]
+            stack.append(current)
+
+        for i, c in enumerate(version):
+            if c in ".-":
+                current.append(0 if i == start else parse(version[start:i], is_digit))
+                start = i + 1
+                if c == "-":
+                    child()
+            elif c.isdigit():
+                if not is_digit and i > start:
+                    current.append(_qualifier(version[start:i], followed_by_digit=True))
+                    start = i
+                    child()
+                is_digit = True
+            else:
+                if is_digit and i > start:
+                    current.append(parse(version[start:i], True))
+                    start = i
+                    child()
+                is_digit = False
+        if len(version) > start:
+            current.append(parse(version[start:], is_digit))
+        # 由内向外去掉各列表结尾的空项, 遇到非空的数字或限定符时停止
+        while stack:
+            level = stack.pop()
+            for i in range(len(level) - 1, -1, -1):
+                if _is_null(level[i]):
+                    del level[i]
+                elif not isinstance(level[i], list):
+                    break
+        return items
+
+
+def maven_version_key(version: str):
+    """
+    生成可比较的Maven版本排序键
+    :param version: str 版本号, 例如 1.2.0-rc1
+    :return: ComparableVersion类
+    """
+    return ComparableVersion(version)
+
+
+class Scheduler(object):
+    """组件调度器"""
+
+    LISTING = "listing"
+    LARGEST = "largest"
+    NEWEST = "newest"
+    POLICIES = [LISTING, LARGEST, NEWEST]
+    EPOCH = datetime.fromtimestamp(0, timezone.utc)
+
+    def __init__(
+            self,
+            policy: str = LISTING,
+            processes: int = 1,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param policy: str 调度策略:
+         - listing: 按列表接口返回顺序流式派发 (默认)
+         - largest: 先派发体积最大的组件, 缩短整体完成时间
+         - newest: 先派发最新修改/最高版本的组件, 尽快提供可用版本
+        :param processes: int 并发数, 用于统计尾部空闲
+        :param logger: logging.Logger类 日志记录器
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown schedule policy: {policy}")
+        self.policy = policy
+        self.processes = processes
+        self.logger = logger if logger else Log().logger
+        self.submitted = 0
+        self.finished = 0
+        self.failed = 0
+        self.bytes = 0
+        self.closed = False
+        self._start = None
+        self._end = None
+        self._tail = None
+
+    def __str__(self):
+        return f"<{self.__doc__} Policy={self.policy}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def _newest_key(cls, component):
+        """
+        newest策略排序键
+        :param component: Component类
+        :return: tuple
+        """
+        return (component.last_modified or cls.EPOCH,
+                maven_version_key(component.version))
+
+    def order(self, components):
+        """
+        按照策略排列组件
+        :param components: Iterable 组件可迭代对象
+        :return: generator
+        """
+        if self.policy == self.LISTING:
+            yield from components
+            return
+        # 非流式策略需要完整列表才能排序
+        components = list(components)
+        self.logger.info(
+            f"调度策略[{self.policy}]: 已获取{len(components)}个组件, 开始排序")
+        if self.policy == self.LARGEST:
+            components.sort(key=lambda c: c.size, reverse=True)
+        else:
+            components.sort(key=self._newest_key, reverse=True)
+        yield from components
+
+    def submit(self, component):
+        """
+        记录派发的组件
+        :param component: Component类
+        :return: None
+        """
+        if self._start is None:
+            self._start = time.monotonic()
+        self.submitted += 1
+        self.bytes += component.size
+
+    def done(self, result=None):
+        """
+        组件完成(成功或失败)回调
+        :param result: 迁移函数的返回值, 失败时为异常
+        :return: None
+        """
+        self.finished += 1
+        if isinstance(result, BaseException):
+            self.failed += 1
+        self._end = time.monotonic()
+        # 记录首次出现空闲进程的时间, 即长尾开始
+        if self._tail is None and self.closed \
+                and self.submitted - self.finished < self.processes:
+            self._tail = self._end
+
+    def close(self):
+        """
+        标记已派发全部组件
+        :return: None
+        """
+        self.closed = True
+        if self._tail is None and self.submitted - self.finished < self.processes:
+            self._tail = time.monotonic()
+
+    @property
+    def makespan(self):
+        """
+        返回实际完成时间(秒)
+        :return: float
+        """
+        if self._start is None or self._end is None:
+            return 0.0
+        return self._end - self._start
+
+    @property
+    def tail(self):
+        """
+        返回长尾时间(秒), 即出现空闲进程到全部完成的时间
+        :return: float
+        """
+        if self._tail is None or self._end is None:
+            return 0.0
+        return max(self._end - self._tail, 0.0)
+
+    def report(self):
+        """
+        输出调度统计信息
+        :return: None
+        """
+        self.logger.info(
+            f"调度策略[{self.policy}]: "
+            f"组件 {self.finished}/{self.submitted}, "
+            f"失败 {self.failed}, "
+            f"字节 {self.bytes}, "
+            f"完成时间 {self.makespan:.1f}s, "
+            f"长尾 {self.tail:.1f}s")
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: shard.py
+@time: 2026/10/19 10:20 上午
+"""
+
+__version__ = (0, 0, 3)
+__update_str__ = "续约间隔跟随协调器租约有效期, 租约失效时停止派发, 上报失败组件"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin, urlparse, parse_qs
+
+import requests
+
+from utils.classes import Log
+
+DEFAULT_LEASE_TTL = 60
+# 分片含失败组件时重新分配的次数上限, 超过后标记为失败
+DEFAULT_ATTEMPTS = 3
+
+
+class Shard(object):
+    """分片类"""
+
+    def __init__(self, index: int, total: int):
+        """
+        初始化
+        :param index: int 分片序号, 从0开始
+        :param total: int 分片总数
+        """
+        if total < 1 or not 0 <= index < total:
+            raise ValueError(f"Invalid shard {index}/{total}")
+        self.index = index
+        self.total = total
+
+    def __str__(self):
+        return f"<{self.__doc__} {self.index}/{self.total}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def parse(cls, value: str):
+        """
+        解析 i/N 格式的分片参数
+        :param value: str 例如 0/4
+        :return: Shard类
+        """
+        try:
+            index, total = (int(x) for x in value.split("/"))
+        except ValueError:
+            raise ValueError(f"Invalid shard '{value}', expect i/N")
+        return cls(index, total)
+
+    @staticmethod
+    def key(component):
+        """
+        返回组件的唯一键 group:name:version
+        :param component: Component类
+        :return: str
+        """
+        return f"{component.group}:{component.name}:{component.version}"
+
+    @classmethod
+    def bucket(cls, component, total: int):
+        """
+        计算组件所属分片, 与进程及机器无关
+        :param component: Component类
+        :param total: int 分片总数
+        :return: int
+        """
+        digest = sha1(cls.key(component).encode("utf-8")).hexdigest()
+        return int(digest[:16], 16) % total
+
+    def owns(self, component):
+        """
+        判断组件是否属于当前分片
+        :param component: Component类
+        :return: bool
+        """
+        return self.bucket(component, self.total) == self.index
+
+    def filter(self, components):
+        """
+        过滤出属于当前分片的组件
+        :param components: Iterable 组件可迭代对象
+        :return: generator
+        """
+        for component in components:
+            if self.owns(component):
+                yield component
+
+
+class Coordinator(object):
+    """分片协调器, 基于SQLite记录租约及进度"""
+
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(
+            self,
+            path: str,
+            total: int = None,
+            ttl: int = DEFAULT_LEASE_TTL,
+            attempts: int = DEFAULT_ATTEMPTS,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param path: str SQLite文件路径
+        :param total: int 分片总数, 首次创建时必须指定
+        :param ttl: int 租约有效期(秒), 超时未续约的分片会被重新分配
+        :param attempts: int 分片含失败组件时最多分配的次数, 之后标记为失败
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.path = path
+        self.ttl = ttl
+        self.attempts = attempts
+        self.logger = logger if logger else Log().logger
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "shard INTEGER PRIMARY KEY, total INTEGER, owner TEXT, "
+                "expires REAL, state TEXT, attempts INTEGER DEFAULT 0)")
+            # 旧版本创建的数据库没有attempts列
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(leases)")]
+            if "attempts" not in columns:
+                conn.execute("ALTER TABLE leases ADD COLUMN attempts INTEGER DEFAULT 0")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS progress ("
+                "shard INTEGER, component TEXT, owner TEXT, finished REAL, "
+                "PRIMARY KEY (shard, component))")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS failures ("
+                "shard INTEGER, component TEXT, owner TEXT, error TEXT, finished REAL, "
+                "PRIMARY KEY (shard, component))")
+            row = conn.execute("SELECT MAX(total) FROM leases").fetchone()
+            if row[0] is None:
+                if not total:
+                    raise ValueError("The number of shards is required")
+                conn.executemany(
+                    "INSERT INTO leases VALUES (?, ?, NULL, 0, ?, 0)",
+                    [(i, total, self.PENDING) for i in range(total)])
+            elif total and total != row[0]:
+                raise ValueError(
+                    f"{self.path} was created with {row[0]} shards")
+            self.total = total or row[0]
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path} Shards={self.total}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _connect(self):
+        """
+        创建数据库连接, 每个线程独立连接
+        :return: sqlite3.Connection
+        """
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def acquire(self, owner: str):
+        """
+        申请一个待处理或租约已过期的分片
+        :param owner: str 申请者标识
+        :return: int or None 分片序号
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT shard, owner, state FROM leases WHERE state = ? "
+                "OR (state = ? AND expires < ?) ORDER BY shard LIMIT 1",
+                (self.PENDING, self.LEASED, now)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE leases SET owner = ?, expires = ?, state = ? "
+                "WHERE shard = ?",
+                (owner, now + self.ttl, self.LEASED, row[0]))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        if row[2] == self.LEASED:
+            self.logger.warning(
+                f"分片[{row[0]}/{self.total}]租约已过期, 由[{row[1]}]转交[{owner}]")
+        else:
+            self.logger.info(f"分片[{row[0]}/{self.total}]分配给[{owner}]")
+        return row[0]
+
+    def heartbeat(self, shard: int, owner: str, components: list = None):
+        """
+        续约并上报已完成组件
+        :param shard: int 分片序号
+        :param owner: str 申请者标识
+        :param components: list 已完成的组件键
+        :return: bool 租约是否仍属于申请者
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE leases SET expires = ? "
+                "WHERE shard = ? AND owner = ? AND state = ?",
+                (now + self.ttl, shard, owner, self.LEASED))
+            conn.executemany(
+                "INSERT OR IGNORE INTO progress VALUES (?, ?, ?, ?)",
+                [(shard, key, owner, now) for key in components or []])
+            return cursor.rowcount == 1
+
+    def release(self, shard: int, owner: str, failed: dict = None):
+        """
+        释放分片, 全部组件成功时标记为已完成
+        含失败组件时记录失败原因并重新置为待处理, 由任意节点重试(已完成的组件跳过), 超过分配次数上限后标记为失败
+        :param shard: int 分片序号
+        :param owner: str 申请者标识
+        :param failed: dict 可选, 失败的组件键 -> 失败原因
+        :return: bool
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT attempts FROM leases WHERE shard = ? AND owner = ? AND state = ?",
+                (shard, owner, self.LEASED)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return False
+            if failed:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?, ?)",
+                    [(shard, key, owner, error, now) for key, error in failed.items()])
+                attempts = (row[0] or 0) + 1
+                state = self.PENDING if attempts < self.attempts else self.FAILED
+            else:
+                attempts, state = row[0] or 0, self.DONE
+            conn.execute(
+                "UPDATE leases SET state = ?, expires = 0, attempts = ?, "
+                "owner = CASE WHEN ? = ? THEN NULL ELSE owner END WHERE shard = ?",
+                (state, attempts, state, self.PENDING, shard))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        if state == self.DONE:
+            self.logger.info(f"分片[{shard}/{self.total}]已由[{owner}]完成")
+        elif state == self.PENDING:
+            self.logger.warning(
+                f"分片[{shard}/{self.total}]在[{owner}]有{len(failed)}个组件失败, "
+                f"重新分配({attempts}/{self.attempts})")
+        else:
+            self.logger.error(
+                f"分片[{shard}/{self.total}]已分配{attempts}次仍有{len(failed)}个组件失败, 标记为失败")
+        return True
+
+    def completed(self, shard: int):
+        """
+        返回分片中已完成的组件键
+        :param shard: int 分片序号
+        :return: list
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT component FROM progress WHERE shard = ?",
+                (shard,)).fetchall()
+        return [row[0] for row in rows]
+
+    def failures(self, shard: int):
+        """
+        返回分片中失败且尚未完成的组件
+        :param shard: int 分片序号
+        :return: dict 组件键 -> 失败原因
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT f.component, f.error FROM failures f WHERE f.shard = ? "
+                "AND NOT EXISTS (SELECT 1 FROM progress p "
+                "WHERE p.shard = f.shard AND p.component = f.component)",
+                (shard,)).fetchall()
+        return dict(rows)
+
+    def status(self):
+        """
+        返回各分片状态
+        :return: list
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT l.shard, l.state, l.owner, l.expires, "
+                "(SELECT COUNT(*) FROM progress p WHERE p.shard = l.shard), "
+                "(SELECT COUNT(*) FROM failures f WHERE f.shard = l.shard "
+                "AND NOT EXISTS (SELECT 1 FROM progress p "
+                "WHERE p.shard = f.shard AND p.component = f.component)), "
+                "l.attempts "
+                "FROM leases l ORDER BY l.shard").fetchall()
+        keys = ["shard", "state", "owner", "expires", "completed", "failed", "attempts"]
+        return [dict(zip(keys, row)) for row in rows]
+
+    def serve(self, host: str = "0.0.0.0", port: int = 8765):
+        """
+        启动HTTP服务, 供各节点申请租约及上报进度
+        :param host: str 监听地址
+        :param port: int 监听端口
+        :return: None
+        """
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """协调器请求处理器"""
+
+            def _reply(self, data, status: int = 200):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/status":
+                    self._reply(coordinator.status())
+                elif url.path == "/completed":
+                    self._reply(coordinator.completed(int(query["shard"][0])))
+                elif url.path == "/failures":
+                    self._reply(coordinator.failures(int(query["shard"][0])))
+                else:
+                    self._reply({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                data = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/acquire":
+                    self._reply({"shard": coordinator.acquire(data["owner"]),
+                                 "total": coordinator.total,
+                                 "ttl": coordinator.ttl})
+                elif self.path == "/heartbeat":
+                    self._reply({"valid": coordinator.heartbeat(
+                        data["shard"], data["owner"], data.get("components"))})
+                elif self.path == "/release":
+                    self._reply({"valid": coordinator.release(
+                        data["shard"], data["owner"], data.get("failed"))})
+                else:
+                    self._reply({"error": "not found"}, 404)
+
+            def log_message(self, fmt, *args):
+                coordinator.logger.debug(fmt % args)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        self.logger.info(
+            f"协调器已启动: http://{host}:{port} 分片数: {self.total} 租约有效期: {self.ttl}s")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
+
+class CoordinatorClient(object):
+    """协调器客户端"""
+
+    def __init__(
+            self,
+            url: str,
+            owner: str = None,
+            interval: float = None,
+            logger: logging.Logger = None):
+        """
+        初始化
+        :param url: str 协调器地址, 例如 http://10.0.0.1:8765/
+        :param owner: str 当前节点标识, 默认为 主机名-进程号
+        :param interval: float 可选, 续约间隔(秒), 默认为协调器租约有效期的1/3, 不小于有效期时同样使用默认值
+        :param logger: logging.Logger类 日志记录器
+        """
+        self.url = url if url.endswith("/") else url + "/"
+        self.owner = owner if owner else f"{socket.gethostname()}-{os.getpid()}"
+        self.interval = interval
+        self.logger = logger if logger else Log().logger
+        self.shard = None
+        self.ttl = None
+        self._pending = []
+        self._failed = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._lost = threading.Event()
+        self._thread = None
+
+    def __str__(self):
+        return f"<{self.__doc__} URL={self.url} Owner={self.owner}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _post(self, api: str, **data):
+        response = requests.post(
+            urljoin(self.url, api), json=dict(owner=self.owner, **data))
+        response.raise_for_status()
+        return response.json()
+
+    def acquire(self):
+        """
+        申请分片租约并开始后台续约
+        :return: Shard类 or None
+        """
+        data = self._post("acquire")
+        if data["shard"] is None:
+            return None
+        self.shard = Shard(data["shard"], data["total"])
+        # 旧版本协调器不返回有效期
+        self.ttl = data.get("ttl", DEFAULT_LEASE_TTL)
+        if self.interval is not None and self.interval >= self.ttl:
+            self.logger.warning(f"续约间隔{self.interval}s不小于租约有效期{self.ttl}s, 使用{self.ttl / 3:.1f}s")
+            self.interval = None
+        self._stop.clear()
+        self._lost.clear()
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self._thread.start()
+        return self.shard
+
+    def completed(self):
+        """
+        返回当前分片已完成的组件键, 用于接管过期分片时跳过
+        :return: set
+        """
+        response = requests.get(
+            urljoin(self.url, "completed"),
+            params={"shard": self.shard.index})
+        response.raise_for_status()
+        return set(response.json())
+
+    @property
+    def heartbeat_interval(self):
+        """
+        返回续约间隔(秒)
+        :return: float
+        """
+        return self.interval if self.interval is not None else (self.ttl or DEFAULT_LEASE_TTL) / 3
+
+    @property
+    def lost(self):
+        """
+        返回当前分片的租约是否已失效(已转交其他节点), 失效后不应继续派发该分片的组件
+        :return: bool
+        """
+        return self._lost.is_set()
+
+    def complete(self, key: str):
+        """
+        记录已完成组件, 随下一次续约批量上报
+        :param key: str 组件键
+        :return: None
+        """
+        with self._lock:
+            self._pending.append(key)
+            self._failed.pop(key, None)
+
+    def fail(self, key: str, error: str):
+        """
+        记录失败组件, 释放分片时上报, 由协调器重新分配该分片
+        :param key: str 组件键
+        :param error: str 失败原因
+        :return: None
+        """
+        with self._lock:
+            self._failed[key] = error
+
+    def flush(self):
+        """
+        续约并上报已完成组件
+        :return: bool 租约是否仍有效
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        try:
+            valid = self._post(
+                "heartbeat",
+                shard=self.shard.index,
+                components=pending)["valid"]
+        except requests.RequestException as e:
+            # 上报失败时保留进度, 下次续约重试
+            with self._lock:
+                self._pending = pending + self._pending
+            self.logger.warning(f"协调器续约失败: {e}")
+            return True
+        if not valid and not self._lost.is_set():
+            self.logger.error(f"分片[{self.shard.index}]租约已失效, 可能已转交其他节点, 停止派发该分片")
+            self._lost.set()
+            self._stop.set()
+        return valid
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            self.flush()
+
+    def release(self, completed: bool = True):
+        """
+        停止续约, 上报剩余进度并释放分片
+        :param completed: bool 是否已派发全部组件, 为False时(例如排空)仅停止续约,
+         租约过期后由其他节点接手并跳过已上报的组件. 含失败组件时分片重新置为待处理
+        :return: None
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+        with self._lock:
+            failed, self._failed = self._failed, {}
+        if completed and not self.lost:
+            self._post("release", shard=self.shard.index, failed=failed)
+        self.shard = None
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: spool.py
+@time: 2026/10/19 3:10 下午
+"""
+
+__version__ = (0, 0, 2)
+__update_str__ = "会话支持打开已下载的文件"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import atexit
+import multiprocessing
+import os
+import tempfile
+import threading
+from shutil import rmtree
+
+from utils.limiter import parse_rate
+
+DEFAULT_MEMORY_THRESHOLD = 1024 * 1024
+
+
+class Spool(object):
+    """临时存储管理器"""
+
+    _current = None
+
+    def __init__(
+            self,
+            directory: str = None,
+            tmpfs: str = None,
+            memory_threshold=DEFAULT_MEMORY_THRESHOLD,
+            quota=0):
+        """
+        初始化
+        :param directory: str 临时目录, 默认为系统临时目录
+        :param tmpfs: str 可选, 内存文件系统目录(如/dev/shm), 存在时优先使用
+        :param memory_threshold: int or str 小于该大小的文件仅保存在内存中, 支持K/M/G后缀
+        :param quota: int or str 所有进程共用的临时存储字节上限, 已满时阻塞写入方, 0为不限制
+        """
+        base = directory if directory else tempfile.gettempdir()
+        if tmpfs and os.path.isdir(tmpfs):
+            base = tmpfs
+        os.makedirs(base, exist_ok=True)
+        self.root = tempfile.mkdtemp(prefix="spool-", dir=base)
+        self.memory_threshold = int(parse_rate(memory_threshold))
+        self.quota = int(parse_rate(quota))
+        self._used = multiprocessing.Value("q", 0, lock=False)
+        self._condition = multiprocessing.Condition()
+        self._pid = os.getpid()
+        atexit.register(self.cleanup)
+
+    def __str__(self):
+        return f"<{self.__doc__} Root={self.root} Quota={self.quota}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def used(self):
+        """
+        返回已占用的字节数
+        :return: int
+        """
+        return self._used.value
+
+    def reserve(self, size: int, block: bool = True):
+        """
+        预留空间, 超过配额时阻塞直到其他写入方释放
+        单次预留大于配额时, 等待其他写入方全部释放后放行, 避免永久阻塞
+        每个会话应一次性预留所需空间, 分多次阻塞预留可能互相等待
+        :param size: int 字节数
+        :param block: bool 是否阻塞, 为False时直接计入(用于事后补记未知大小的文件)
+        :return: None
+        """
+        if size <= 0:
+            return
+        with self._condition:
+            while block and self.quota and self._used.value > 0 \
+                    and self._used.value + size > self.quota:
+                self._condition.wait()
+            self._used.value += size
+
+    def release(self, size: int):
+        """
+        释放预留的空间
+        :param size: int 字节数
+        :return: None
+        """
+        if size <= 0:
+            return
+        with self._condition:
+            self._used.value -= size
+            self._condition.notify_all()
+
+    def session(self):
+        """
+        创建临时存储会话, 通常每个组件一个
+        :return: SpoolSession类
+        """
+        return SpoolSession(self)
+
+    def cleanup(self):
+        """
+        删除所有临时文件, 仅创建该实例的进程执行
+        :return: None
+        """
+        if os.getpid() == self._pid and os.path.exists(self.root):
+            rmtree(self.root, ignore_errors=True)
+
+    @classmethod
+    def install(cls, spool):
+        """
+        在子进程中安装父进程的临时存储管理器
+        :param spool: Spool类 or None
+        :return: None
+        """
+        cls._current = spool
+
+    @classmethod
+    def current(cls, directory: str = None):
+        """
+        返回当前进程的临时存储管理器, 未安装时按目录创建默认实例
+        :param directory: str 临时目录
+        :return: Spool类
+        """
+        if cls._current is None:
+            cls._current = cls(directory)
+        return cls._current
+
+
+class SpoolSession(object):
+    """临时存储会话"""
+
+    def __init__(self, spool: Spool):
+        """
+        初始化
+        :param spool: Spool类 所属的临时存储管理器
+        """
+        self.spool = spool
+        self.path = tempfile.mkdtemp(dir=spool.root)
+        self.reserved = 0
+        self._files = []
+        self._references = 1
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path} Reserved={self.reserved}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # 无论成功或失败均释放
+        self.release()
+
+    def reserve(self, size: int, block: bool = True):
+        """
+        为本会话预留空间, 应在写入前一次性预留
+        :param size: int 字节数
+        :param block: bool 是否阻塞, 参考Spool.reserve
+        :return: None
+        """
+        self.spool.reserve(size, block)
+        with self._lock:
+            self.reserved += size
+
+    def file(self):
+        """
+        创建临时文件, 小文件保存在内存中, 超过阈值时写入磁盘
+        :return: tempfile.SpooledTemporaryFile
+        """
+        f = tempfile.SpooledTemporaryFile(
+            max_size=self.spool.memory_threshold, dir=self.path)
+        with self._lock:
+            self._files.append(f)
+        return f
+
+    def open(self, path: str, mode: str = "rb"):
+        """
+        打开会话目录中的文件, 会话释放时关闭
+        :param path: str 文件路径
+        :param mode: str 打开模式
+        :return: 文件对象
+        """
+        f = open(path, mode)
+        with self._lock:
+            self._files.append(f)
+        return f
+
+    def retain(self):
+        """
+        增加引用, 供多个阶段共享同一会话
+        :return: self
+        """
+        with self._lock:
+            self._references += 1
+        return self
+
+    def release(self):
+        """
+        减少引用, 引用归零时关闭文件, 删除目录并释放配额
+        :return: None
+        """
+        with self._lock:
+            self._references -= 1
+            if self._references > 0:
+                return
+            files, self._files = self._files, []
+            reserved, self.reserved = self.reserved, 0
+        for f in files:
+            f.close()
+        rmtree(self.path, ignore_errors=True)
+        self.spool.release(reserved)
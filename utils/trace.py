@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+@author: ChowRex
+@contact: zrx879582094@gmail.com
+@license: None
+@file: trace.py
+@time: 2026/10/19 8:20 下午
+"""
+
+__version__ = (0, 0, 2)
+__update_str__ = "采样结果保存在上下文变量中, hybrid执行器的各线程互不影响"
+__version_str__ = "当前版本:" + \
+    ".".join([str(x) for x in __version__]) + " 更新内容:" + __update_str__
+
+import contextlib
+import contextvars
+import glob
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from multiprocessing.util import Finalize
+
+DEFAULT_BUFFER_SIZE = 1000
+_NULL_SPAN = contextlib.nullcontext()
+# 当前上下文中的组件是否被采样, 组件之外默认记录
+_sampled = contextvars.ContextVar("trace_sampled", default=True)
+
+
+class Span(object):
+    """时间线中的一段"""
+
+    __slots__ = ["tracer", "name", "category", "args", "start"]
+
+    def __init__(self, tracer, name: str, category: str, args: dict):
+        """
+        初始化
+        :param tracer: Tracer类 所属的记录器
+        :param name: str 名称
+        :param category: str 分类
+        :param args: dict 附加信息, 在时间线中点击时显示
+        """
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.category, self.start, end, self.args)
+
+
+class Tracer(object):
+    """时间线记录器"""
+
+    _current = None
+
+    def __init__(
+            self,
+            path: str,
+            sample: float = 1.0,
+            buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        初始化
+        每个进程在内存中缓存事件, 达到buffer_size时批量追加到各自的临时文件, 结束时由主进程合并
+        :param path: str 输出的Chrome trace文件路径, 可在chrome://tracing或Perfetto中查看
+        :param sample: float 采样率(0 ~ 1), 按组件采样, 列表分页等非组件请求始终记录
+        :param buffer_size: int 每个进程缓存的事件数
+        """
+        self.path = os.path.abspath(path)
+        self.sample = max(0.0, min(float(sample), 1.0))
+        self.buffer_size = buffer_size
+        self._reset()
+
+    def __str__(self):
+        return f"<{self.__doc__} Path={self.path} Sample={self.sample}>"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __getstate__(self):
+        # 缓存的事件及锁不跨进程
+        return {"path": self.path, "sample": self.sample,
+                "buffer_size": self.buffer_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _reset(self):
+        """
+        初始化当前进程的缓存, fork出的子进程需要重新执行
+        :return: None
+        """
+        self._pid = os.getpid()
+        self._events = []
+        self._lock = threading.Lock()
+        self._closed = False
+        # perf_counter计算耗时, 加上偏移量换算为各进程一致的时间戳
+        self._origin = time.time() - time.perf_counter()
+
+    @property
+    def part_path(self):
+        """
+        返回当前进程的临时文件路径
+        :return: str
+        """
+        return f"{self.path}.{self._pid}.part"
+
+    def span(self, name: str, category: str, **args):
+        """
+        返回记录一段耗时的上下文管理器
+        :param name: str 名称
+        :param category: str 分类
+        :param args: 附加信息
+        :return: Span类 or 空上下文管理器(当前组件未被采样时)
+        """
+        if not _sampled.get():
+            return _NULL_SPAN
+        return Span(self, name, category, args)
+
+    @contextlib.contextmanager
+    def task(self, name: str, **args):
+        """
+        记录一个组件的完整处理过程, 并决定该组件是否被采样
+        采样结果仅对当前线程(上下文)生效, hybrid执行器中同一进程的多个组件互不影响;
+        组件内部创建的线程需在复制的上下文中执行, 参考Asset._download_ranges
+        :param name: str 名称
+        :param args: 附加信息
+        :return: None
+        """
+        token = _sampled.set(self.sample >= 1 or random.random() < self.sample)
+        try:
+            with self.span(name, "component", **args):
+                yield
+        finally:
+            _sampled.reset(token)
+
+    def record(self, name: str, category: str, start: float, end: float, args: dict):
+        """
+        缓存一个完整事件, 达到缓存上限时批量写入
+        :param name: str 名称
+        :param category: str 分类
+        :param start: float 开始时间(perf_counter)
+        :param end: float 结束时间(perf_counter)
+        :param args: dict 附加信息
+        :return: None
+        """
+        self._events.append(
+            (name, category, start, end, threading.get_ident(), args))
+        if len(self._events) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        将缓存的事件追加到当前进程的临时文件
+        :return: int 写入的事件数
+        """
+        with self._lock:
+            events, self._events = self._events, []
+        if not events or self._closed:
+            return 0
+        lines = []
+        for name, category, start, end, tid, args in events:
+            event = {"name": name, "cat": category, "ph": "X",
+                     "ts": round((self._origin + start) * 1e6),
+                     "dur": round((end - start) * 1e6),
+                     "pid": self._pid, "tid": tid}
+            if args:
+                event["args"] = args
+            lines.append(json.dumps(event, separators=(",", ":"), default=str))
+        with self._lock, open(self.part_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return len(lines)
+
+    def start(self):
+        """
+        在主进程开始记录, 删除同一路径上次遗留的临时文件
+        :return: self
+        """
+        for part in glob.glob(f"{glob.escape(self.path)}.*.part"):
+            os.remove(part)
+        return self
+
+    def close(self):
+        """
+        写入主进程的缓存, 合并所有进程的临时文件为Chrome trace文件
+        :return: int 事件总数
+        """
+        if self._closed:
+            return 0
+        self.flush()
+        self._closed = True
+        count = 0
+        pids = set()
+        with open(self.path, "w", encoding="utf-8") as out:
+            out.write('{"displayTimeUnit":"ms","traceEvents":[\n')
+            for part in sorted(glob.glob(f"{glob.escape(self.path)}.*.part")):
+                pid = int(part.rsplit(".", 2)[-2])
+                with open(part, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            out.write(("," if count else "") + line.strip() + "\n")
+                            count += 1
+                            pids.add(pid)
+                os.remove(part)
+            for pid in sorted(pids):
+                name = "main" if pid == self._pid else f"worker-{pid}"
+                meta = {"name": "process_name", "ph": "M", "pid": pid,
+                        "args": {"name": name}}
+                out.write(("," if count else "") + json.dumps(meta) + "\n")
+            out.write("]}\n")
+        return count
+
+    @classmethod
+    def install(cls, tracer):
+        """
+        安装当前进程的记录器, 子进程退出时写入剩余的缓存
+        :param tracer: Tracer类 or None
+        :return: None
+        """
+        if tracer is not None and tracer._pid != os.getpid():
+            # fork时复制了父进程的缓存
+            tracer._reset()
+        if tracer is not None and multiprocessing.current_process().name != "MainProcess":
+            Finalize(tracer, tracer.flush, exitpriority=10)
+        cls._current = tracer
+
+    @classmethod
+    def current(cls):
+        """
+        返回当前进程的记录器, 未启用时为None
+        :return: Tracer类 or None
+        """
+        return cls._current
+
+
+def span(name: str, category: str, **args):
+    """
+    记录一段耗时, 未启用记录器时几乎没有开销
+    例如: with span("upload", "upload", repository=name): ...
+    :param name: str 名称
+    :param category: str 分类
+    :param args: 附加信息
+    :return: 上下文管理器
+    """
+    tracer = Tracer._current
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, category, **args)